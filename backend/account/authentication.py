@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from account.tokens import PRINCIPAL_CLAIMS, PROFILE_CLAIMS
+
+User = get_user_model()
+
+
+def _loaded(model, values):
+    """A ``model`` instance as if read from the database with only ``values`` selected."""
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(None, names, [values[name] for name in names])
+
+
+def principal_from_token(token):
+    """
+    A User built from the claims of ``token`` without touching the database.
+    Only the claimed fields are loaded; any other field is deferred and read
+    on first access. The user's profile (``user.director`` and friends) is
+    primed with its id and institute, and the profiles it does not have are
+    cached as missing, so ``hasattr(user, 'director')`` costs no query either.
+    """
+    user = _loaded(User, {
+        'id': token[api_settings.USER_ID_CLAIM], 'email': token['email'], 'role': token['role'],
+        'is_superuser': token['is_superuser'], 'is_staff': token['is_staff'], 'is_active': token['is_active'],
+    })
+    for accessor, model, claim in PROFILE_CLAIMS:
+        profile = None
+        if token[claim] is not None:
+            profile = _loaded(model, {'id': token[claim], 'user_id': user.pk, 'institute_id': token['institute_id']})
+            profile._state.fields_cache['user'] = user
+        user._state.fields_cache[accessor] = profile
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds the user of a read (GET, HEAD, OPTIONS) from
+    the access token's principal claims (see ``account.tokens``) instead of
+    loading it, so reads make no authentication queries. Writes, and tokens
+    issued without the claims, load the user as before, so they act on its
+    current state, including a deactivation.
+
+    The claims are read from the database whenever an access token is issued,
+    including on every refresh, so role or profile changes reach reads with
+    the next access token; access tokens are short-lived.
+    """
+    def authenticate(self, request):
+        self.read = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if not (self.read and all(claim in validated_token for claim in PRINCIPAL_CLAIMS)):
+            return super().get_user(validated_token)
+        user = principal_from_token(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
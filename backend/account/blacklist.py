@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# How often a process reads tokens blacklisted by other processes.
+BLACKLIST_POLL_SECONDS = 1
+# How often entries of expired tokens are dropped from memory.
+BLACKLIST_COMPACT_SECONDS = 300
+# Blacklist rows below the highest id seen that each poll reads again, so rows
+# committed out of id order by concurrent logouts are not missed.
+BLACKLIST_FEED_OVERLAP = 100
+
+
+class BlacklistCache:
+    """
+    The JTIs of blacklisted, unexpired refresh tokens, held in memory so that
+    checking a token is a dict lookup instead of a join over the blacklist
+    tables.
+
+    The first check in a process loads every unexpired blacklisted token; after
+    that the cache follows ``BlacklistedToken`` by its id, reading only rows
+    past the highest id seen, at most once every BLACKLIST_POLL_SECONDS. Tokens
+    blacklisted through ``add`` (this process's logouts) are known at once;
+    those blacklisted by other processes within a poll interval, far less than
+    an access token's lifetime. Expired tokens are rejected by their ``exp``
+    anyway, so their entries are dropped every BLACKLIST_COMPACT_SECONDS and
+    memory stays bounded by the logouts of one refresh token lifetime. The
+    rows themselves are removed with ``manage.py flushexpiredtokens``.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Forgets everything; the next check reloads the blacklist."""
+        with self._lock:
+            self._expiries = {}
+            self._watermark = 0
+            self._polled_at = None
+            self._compacted_at = time.monotonic()
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self._expiries
+
+    def __len__(self):
+        return len(self._expiries)
+
+    def add(self, jti, exp):
+        """Records that the token ``jti``, expiring at epoch ``exp``, was blacklisted."""
+        with self._lock:
+            self._expiries[jti] = exp
+
+    def sync(self):
+        """Reads tokens blacklisted since the last poll, if BLACKLIST_POLL_SECONDS have passed."""
+        now = time.monotonic()
+        if self._polled_at is not None and now - self._polled_at < BLACKLIST_POLL_SECONDS:
+            return
+        with self._lock:
+            if self._polled_at is not None and now - self._polled_at < BLACKLIST_POLL_SECONDS:
+                return
+            self._poll()
+            self._polled_at = now
+            if now - self._compacted_at >= BLACKLIST_COMPACT_SECONDS:
+                self._compact()
+                self._compacted_at = now
+
+    def _poll(self):
+        rows = BlacklistedToken.objects.filter(
+            pk__gt=max(self._watermark - BLACKLIST_FEED_OVERLAP, 0),
+            token__expires_at__gt=timezone.now(),
+        ).values_list('pk', 'token__jti', 'token__expires_at')
+        for pk, jti, expires_at in rows:
+            self._expiries[jti] = expires_at.timestamp()
+            self._watermark = max(self._watermark, pk)
+
+    def _compact(self):
+        now = time.time()
+        self._expiries = {jti: exp for jti, exp in self._expiries.items() if exp > now}
+
+
+blacklist_cache = BlacklistCache()
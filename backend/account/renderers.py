@@ -1,15 +1,26 @@
-import json
-from rest_framework import renderers
+from rest_framework.exceptions import ErrorDetail
 
-class UserRenderer(renderers.JSONRenderer):
-    charset = 'utf-8'
+from backend.renderers import FastJSONRenderer
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        response = {}
 
-        if 'ErrorDetail' in str(data):
-            response = {'error': data}
-        else:
-            response = data
+def has_error_detail(data):
+    """Whether a validation error (an ErrorDetail) appears anywhere in ``data``."""
+    if isinstance(data, ErrorDetail):
+        return True
+    if isinstance(data, dict):
+        return any(has_error_detail(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_error_detail(value) for value in data)
+    return False
+
 
-        return super().render(response, accepted_media_type, renderer_context)
\ No newline at end of file
+class UserRenderer(FastJSONRenderer):
+    """Wraps error payloads as ``{"error": ...}``."""
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        # Errors only come with error statuses, so successful pages are never walked.
+        if (response is None or response.status_code >= 400) and has_error_detail(data):
+            data = {'error': data}
+        return super().render(data, accepted_media_type, renderer_context)
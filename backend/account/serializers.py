@@ -9,19 +9,31 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.sessions.models import Session
 from .models import UserRole
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .tokens import CachedBlacklistRefreshToken, add_principal_claims
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 User = get_user_model()
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        # Add custom claims
-        token["email"] = user.email
-        token["username"] = user.username
-        token["role"] = user.role if hasattr(user, 'role') else 'user'
-        return token
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # User has no username; the principal claims carry the email and role.
+        data['access'] = str(add_principal_claims(AccessToken(data['access']), self.user))
+        return data
+
+class CachedBlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    # Blacklist checks read the in-memory blacklist; see account.blacklist.
+    token_class = CachedBlacklistRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # The principal claims are read afresh, so role or profile changes reach the new access token.
+        access = AccessToken(data['access'])
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]})
+        data['access'] = str(add_principal_claims(access, user))
+        return data
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
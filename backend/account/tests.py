@@ -1,3 +1,112 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from account.authentication import ClaimsJWTAuthentication
+from account.blacklist import blacklist_cache
+from account.models import User, UserRole
+from account.renderers import UserRenderer
+from account.tokens import get_tokens_for_user
+from director.models import Director, Institute
+from hostel.models import Hostel, Room
+
+
+class UserRendererTests(SimpleTestCase):
+    def test_wraps_errors(self):
+        errors = {'email': [ErrorDetail("This field is required.", code='required')]}
+        rendered = UserRenderer().render(errors, renderer_context={'response': Response(errors, status=400)})
+        self.assertEqual(rendered, b'{"error":{"email":["This field is required."]}}')
+        self.assertEqual(UserRenderer().render({'email': "a@example.com"}), b'{"email":"a@example.com"}')
+
+
+class DirectorTestCase(TestCase):
+    """An active director running one hostel with one room."""
+    def setUp(self):
+        institute = Institute.objects.create(
+            name="Auth Institute", address="Address", city="City", state="State", pincode="000000"
+        )
+        user = User.objects.create_user(email="auth-director@example.com", role=UserRole.DIRECTOR)
+        User.objects.filter(pk=user.pk).update(is_active=True)
+        user.refresh_from_db()
+        self.director = Director.objects.create(
+            user=user, institute=institute, first_name="Dee", last_name="Rector"
+        )
+        hostel = Hostel.objects.create(
+            name="Auth Hostel", institute=institute, director=self.director, hostel_type='mixed',
+            address_line1="Address", city="City", state="State", pincode="000000",
+            rent_per_month=5000, security_deposit=1000,
+        )
+        Room.objects.create(hostel=hostel, room_number="1", room_type='single', capacity=1, rent_per_bed=5000)
+
+
+class ClaimsAuthenticationTests(DirectorTestCase):
+    def test_claims_authentication_skips_user_lookup_on_reads(self):
+        director = self.director
+        access = get_tokens_for_user(director.user)['access']
+        factory = RequestFactory()
+
+        with self.assertNumQueries(0):
+            user, _ = ClaimsJWTAuthentication().authenticate(
+                Request(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {access}'))
+            )
+            self.assertEqual((user.pk, user.role, user.is_superuser), (director.user.pk, UserRole.DIRECTOR, False))
+            self.assertEqual((user.director.pk, user.director.institute_id), (director.pk, director.institute_id))
+            self.assertFalse(hasattr(user, 'student') or hasattr(user, 'hostelmanager'))
+        self.assertEqual(user.director.first_name, "Dee")
+
+        with self.assertNumQueries(1):
+            user, _ = ClaimsJWTAuthentication().authenticate(
+                Request(factory.post('/', HTTP_AUTHORIZATION=f'Bearer {access}'))
+            )
+        self.assertEqual(user.created_at, director.user.created_at)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = client.get('/api/hostel/create-room/')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([room['room_number'] for room in response.data['results']], ["1"])
+
+    def test_refresh_reads_claims_again(self):
+        # Refresh tokens carry no claims; each refresh reads them again.
+        refresh = get_tokens_for_user(self.director.user)['refresh']
+        self.assertNotIn('role', RefreshToken(refresh))
+        User.objects.filter(pk=self.director.user_id).update(is_staff=True)
+        response = APIClient().post('/api/user/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(AccessToken(response.data['access'])['is_staff'])
+
+
+class RefreshBlacklistTests(DirectorTestCase):
+    def test_refresh_checks_blacklist_in_memory(self):
+        blacklist_cache.clear()
+        user = self.director.user
+        tokens, other = get_tokens_for_user(user), get_tokens_for_user(user)
+        client = APIClient()
+
+        self.assertEqual(client.post('/api/user/token/refresh/', {'refresh': tokens['refresh']}).status_code, 200)
+        with self.assertNumQueries(3):  # The user's is_active, then its principal claims; no blacklist query.
+            self.assertEqual(client.post('/api/user/token/refresh/', {'refresh': tokens['refresh']}).status_code, 200)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(client.post('/api/user/logout/', {'refresh': tokens['refresh']}).status_code, 200)
+        client.credentials()
+        with self.assertNumQueries(0):
+            self.assertEqual(client.post('/api/user/token/refresh/', {'refresh': tokens['refresh']}).status_code, 401)
+
+        # Blacklisted elsewhere: picked up by the next poll.
+        RefreshToken(other['refresh']).blacklist()
+        with mock.patch('account.blacklist.BLACKLIST_POLL_SECONDS', 0):
+            self.assertEqual(client.post('/api/user/token/refresh/', {'refresh': other['refresh']}).status_code, 401)
+        self.assertEqual(len(blacklist_cache), 2)
+
+        with mock.patch('account.blacklist.time.time', return_value=time.time() + 86400), \
+                mock.patch('account.blacklist.BLACKLIST_POLL_SECONDS', 0), \
+                mock.patch('account.blacklist.BLACKLIST_COMPACT_SECONDS', 0):
+            blacklist_cache.sync()
+        self.assertEqual(len(blacklist_cache), 0)
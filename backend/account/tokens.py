@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.blacklist import blacklist_cache
+from director.models import Director
+from hostel.models import HostelManager, Student
+
+# The profiles a principal carries: (User reverse accessor, profile model, claim holding its id).
+PROFILE_CLAIMS = (
+    ('director', Director, 'director_id'),
+    ('hostelmanager', HostelManager, 'manager_id'),
+    ('student', Student, 'student_id'),
+)
+# What ``user_profile`` returns: the profile ids, their institute and a manager's hostel.
+PROFILE_FIELDS = (*(claim for _, _, claim in PROFILE_CLAIMS), 'institute_id', 'hostel_id')
+# Claims the access token must carry to be turned into a principal without the database.
+PRINCIPAL_CLAIMS = ('email', 'role', 'is_active', 'is_superuser', 'is_staff', *PROFILE_FIELDS)
+
+
+def user_profile(user_id):
+    """
+    The ``PROFILE_FIELDS`` of a user, read with one query. A user has at most
+    one profile; the others are null.
+    """
+    row = get_user_model().objects.filter(pk=user_id).values(
+        'director__id', 'director__institute_id',
+        'hostelmanager__id', 'hostelmanager__institute_id', 'hostelmanager__managed_hostel__id',
+        'student__id', 'student__institute_id',
+    ).get()
+    return {
+        'director_id': row['director__id'],
+        'manager_id': row['hostelmanager__id'],
+        'student_id': row['student__id'],
+        'institute_id': (
+            row['director__institute_id'] or row['hostelmanager__institute_id'] or row['student__institute_id']
+        ),
+        'hostel_id': row['hostelmanager__managed_hostel__id'],
+    }
+
+
+def add_principal_claims(token, user):
+    """
+    Adds the user's role, flags and ``user_profile`` to the access ``token``,
+    so ``ClaimsJWTAuthentication`` can rebuild the principal from the token
+    alone. Refresh tokens never carry them: every access token gets claims
+    read when it is issued, not when its refresh token was.
+    """
+    token['email'] = user.email
+    token['role'] = user.role
+    token['is_active'] = user.is_active
+    token['is_superuser'] = user.is_superuser
+    token['is_staff'] = user.is_staff
+    for claim, value in user_profile(user.pk).items():
+        token[claim] = value
+    return token
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """
+    RefreshToken checked against the process's ``blacklist_cache`` instead of
+    the blacklist tables, so refreshing a token that is not blacklisted makes
+    no blacklist query however long the blacklist grows.
+    """
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in blacklist_cache:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return blacklisted
+
+
+def get_tokens_for_user(user):
+    """A refresh/access token pair for ``user``; the access token carries the principal claims."""
+    refresh = CachedBlacklistRefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(add_principal_claims(refresh.access_token, user)),
+    }
@@ -15,7 +15,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import APIException, ValidationError, AuthenticationFailed, ParseError
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
@@ -33,16 +33,10 @@ from account.serializers import (
 )
 
 from .models import UserRole
+from .tokens import CachedBlacklistRefreshToken, get_tokens_for_user
 
 User = get_user_model()
 
-def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
-    return {
-        'refresh': str(refresh),
-        'access': str(refresh.access_token),
-    }
-
 class EmailSendError(APIException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     default_detail = 'Email could not be sent. Please contact support or try again later.'
@@ -60,7 +54,7 @@ class GetSessionView(APIView):
 
     def _decode_token_expiration(self, token_string, token_type="access"):
         try:
-            token_cls = AccessToken if token_type == "access" else RefreshToken
+            token_cls = AccessToken if token_type == "access" else CachedBlacklistRefreshToken
             token_obj = token_cls(token_string)
             return timezone.datetime.fromtimestamp(token_obj["exp"], tz=timezone.utc)
         except Exception as e:
@@ -275,7 +269,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = CachedBlacklistRefreshToken(refresh_token)
             token.blacklist()
 
             return Response({"msg": "Logged out successfully"}, status=status.HTTP_200_OK)
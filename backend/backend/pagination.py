@@ -0,0 +1,160 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import and_, or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering.
+
+    The cursor carries the ordering values of the last (or first) row of the
+    page, and the next page is fetched with a row-value comparison such as
+    ``submitted_at < x OR (submitted_at = x AND id > y)``. Every page is an
+    index seek plus ``page_size + 1`` rows, there is no ``COUNT(*)`` and no
+    OFFSET, so the cost does not grow with the table or the page number.
+
+    Views set ``ordering`` to a tuple of non-null fields ending in a unique one;
+    ``id`` is appended when it is missing. Use ``<fk>_id`` rather than the
+    relation name, which Django would order by the related model's ordering.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        results = list(self.window(queryset, request, view))
+        cursor = self.decode_cursor(request)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if cursor and cursor['r']:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = results
+        return results
+
+    def window(self, queryset, request, view=None):
+        """
+        ``queryset`` ordered and cut to the rows of the requested page plus one
+        more, which tells whether there is another page in that direction;
+        None when the request is not paginated. Nothing is evaluated.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.ordering = self.get_ordering(view)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+
+        ordering = [self._invert(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(ordering, cursor['v']))
+        return queryset[:page_size + 1]
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                value = int(request.query_params[self.page_size_query_param])
+                if value > 0:
+                    return min(value, self.max_page_size) if self.max_page_size else value
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, view):
+        ordering = tuple(getattr(view, 'ordering', None) or self.ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('id',)
+        return ordering
+
+    def get_next_link(self):
+        if not (self.page and self.has_next):
+            return None
+        return self.encode_cursor(self._values(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not (self.page and self.has_previous):
+            return None
+        return self.encode_cursor(self._values(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            return {'v': cursor['v'], 'r': bool(cursor.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, default=str, separators=(',', ':'))
+        encoded = b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _values(self, row):
+        values = []
+        for field in self.ordering:
+            path = field.lstrip('-')
+            if isinstance(row, dict):
+                values.append(row[path])
+                continue
+            value = row
+            for attribute in path.split('__'):
+                value = value.pk if attribute == 'pk' else getattr(value, attribute)
+            values.append(value)
+        return values
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _after(ordering, values):
+        """Rows strictly after ``values`` in ``ordering``."""
+        clauses = []
+        for i, field in enumerate(ordering):
+            equal = [Q(**{f.lstrip('-'): v}) for f, v in zip(ordering[:i], values[:i])]
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clauses.append(reduce(and_, equal + [Q(**{f'{field.lstrip("-")}__{lookup}': values[i]})]))
+        return reduce(or_, clauses)
@@ -141,19 +141,47 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# The browsable API renders every response a second time, as HTML; turn it on for local debugging only.
+BROWSABLE_API = False
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Reads are authenticated from the access token's claims, without loading the user.
+        'account.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
-    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer','rest_framework.renderers.BrowsableAPIRenderer',]
+    'DEFAULT_RENDERER_CLASSES': ['backend.renderers.FastJSONRenderer'] + (
+        ['rest_framework.renderers.BrowsableAPIRenderer'] if BROWSABLE_API else []
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+
+# The payment report cache is invalidated by bumping a version key, so every process
+# must share one cache; use Redis or Memcached when running more than one worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
 }
 
+# Seconds of head start in the hostel waitlist per unit of an application attribute,
+# e.g. {'student__year_of_study': 86400}. Empty means first come, first served.
+HOSTEL_WAITLIST_WEIGHTS = {}
+
+# Day of the month on which generated rent charges fall due.
+HOSTEL_RENT_DUE_DAY = 10
 
+# Late fee slabs for hostels without a LateFeePolicy, e.g.
+# {'grace_days': 5, 'slabs': [{'after_days': 0, 'percent': 2, 'flat': 0},
+#                             {'after_days': 30, 'percent': 5, 'flat': 100}], 'max_fee': 1000}.
+# No slabs means no late fees.
+HOSTEL_LATE_FEE_POLICY = {'grace_days': 0, 'slabs': [], 'max_fee': None}
 
 from datetime import timedelta
 
@@ -189,8 +217,8 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 
-    "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "account.serializers.MyTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "account.serializers.CachedBlacklistTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
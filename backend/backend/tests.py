@@ -0,0 +1,22 @@
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.renderers import JSONRenderer
+
+from backend.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            'amount': Decimal('12.50'), 'when': datetime(2026, 1, 2, 3, 4, 5, 6000, tzinfo=dt_timezone.utc),
+            'day': date(2026, 1, 2), 'id': uuid.UUID(int=7), 'phone': PhoneNumber.from_string("+919876543210"),
+            'label': gettext_lazy("Pending Review"), 'text': "line\u2028break é", 1: [None, True, 1.5],
+        }
+        renderer = FastJSONRenderer()
+        self.assertEqual(renderer.render(data), JSONRenderer.render(renderer, data))
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
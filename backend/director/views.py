@@ -1,24 +1,20 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from account.tokens import get_tokens_for_user
 from director.models import Director, Institute, Course, Branch
 from director.serializers import (
     DirectorRegistrationSerializer, CourseSerializer, BranchSerializer, InstituteSerializer
 )
 from hostel.models import Hostel 
 from hostel.serializers import HostelSerializer
+from hostel.conditional import ConditionalGetMixin
+from hostel.fieldsets import SparseFieldsMixin
+from hostel.readers import HostelReader, ReaderListMixin
 
 # from director.permissions import IsDirectorOwnerOrReadOnly
 
-def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
-    return {
-        'refresh': str(refresh),
-        'access': str(refresh.access_token),
-    }
-
 # Create your Views here
 
 
@@ -53,18 +49,21 @@ class DirectorDetailView(generics.RetrieveUpdateDestroyAPIView):
     #     return [permissions.IsAuthenticated(), IsDirectorOwnerOrReadOnly()]
 
 
-class InstituteListView(generics.ListAPIView):
+class InstituteListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = Institute.objects.all()
     serializer_class = InstituteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ('name', 'id')
 
 class InstituteDetailView(generics.RetrieveAPIView):
     queryset = Institute.objects.all()
     serializer_class = InstituteSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = CourseSerializer
+    ordering = ('institute_id', 'name', 'id')
+    freshness_fields = ('updated_at', 'institute__updated_at', 'branches__updated_at')
     # permission_classes = [permissions.IsAuthenticated] 
 
     def get_queryset(self):
@@ -122,9 +121,10 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
 class BranchListCreateView(generics.ListCreateAPIView):
     serializer_class = BranchSerializer
     # permission_classes = [permissions.IsAuthenticated]
+    ordering = ('course_id', 'name', 'id')
 
     def get_queryset(self):
-        Branch.objects.select_related('course__institute').all()
+        return Branch.objects.select_related('course__institute').all()
 
         # user = self.request.user
         # course_id = self.request.query_params.get('course_id')
@@ -210,13 +210,15 @@ class BranchDetailView(generics.RetrieveUpdateDestroyAPIView):
 #         return context
 
 
-class DirectorHostelListCreateView(generics.ListCreateAPIView):
+class DirectorHostelListCreateView(ReaderListMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = HostelSerializer
+    list_reader = HostelReader
     # permission_classes = [permissions.IsAuthenticated]
+    ordering = ('name', 'id')
 
     def get_queryset(self):
 
-        Hostel.objects.all()
+        return Hostel.objects.all()
 
         # user = self.request.user
         # if hasattr(user, 'director_profile'):
@@ -252,9 +254,13 @@ class DirectorHostelListCreateView(generics.ListCreateAPIView):
     #     context['request'] = self.request
     #     return context
 
-class DirectorHostelDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DirectorHostelDetailView(ConditionalGetMixin, SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Hostel.objects.all().select_related('institute', 'director', 'manager__user')
     serializer_class = HostelSerializer
+    freshness_fields = (
+        'updated_at', 'institute__updated_at', 'director__user__updated_at', 'manager__user__updated_at',
+        'images__updated_at',
+    )
     # permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -1,4 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+
+from .occupancy import RoomFullError
 from .models import (
     Hostel, 
     Room, 
@@ -7,7 +10,11 @@ from .models import (
     Student, 
     HostelImage,
     RoomAllocation, 
-    Payment
+    Payment,
+    WaitlistEntry,
+    StudentLedger,
+    AllocationLedger,
+    LateFeePolicy
 )
 
 #Register your models here.
@@ -17,6 +24,20 @@ admin.site.register(HostelManager)
 admin.site.register(HostelApplication)
 admin.site.register(Student)
 admin.site.register(HostelImage)
-admin.site.register(RoomAllocation)
 admin.site.register(Payment)
+admin.site.register(WaitlistEntry)
+admin.site.register(StudentLedger)
+admin.site.register(AllocationLedger)
+admin.site.register(LateFeePolicy)
+
 
+@admin.register(RoomAllocation)
+class RoomAllocationAdmin(admin.ModelAdmin):
+    def changeform_view(self, request, *args, **kwargs):
+        # The form checks capacity, but the bed is claimed on save and another
+        # allocation may have taken it in between.
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except RoomFullError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
@@ -0,0 +1,171 @@
+import random
+import time
+from collections import deque
+
+from django.db import OperationalError, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from hostel.models import (
+    Room, HostelApplication, RoomAllocation, ApplicationStatus, Student
+)
+from hostel.occupancy import refresh_hostel_availability
+
+ALLOCATION_BATCH_SIZE = 1000
+RESERVE_MAX_ATTEMPTS = 5
+RESERVE_BACKOFF_SECONDS = 0.02
+
+
+def _open_applications(institute):
+    """Approved applications of the institute that have no allocation yet."""
+    return (
+        HostelApplication.objects
+        .filter(institute=institute, status=ApplicationStatus.APPROVED, allocation__isnull=True)
+        .exclude(Exists(RoomAllocation.objects.filter(student=OuterRef('student'), end_date__isnull=True)))
+        .order_by('submitted_at', 'id')
+        .values('id', 'student_id', 'preferred_hostel_id', 'preferred_room_type')
+    )
+
+
+def _free_rooms(institute):
+    """Open rooms of the institute's active hostels with their live occupant count."""
+    return (
+        Room.objects
+        .filter(hostel__institute=institute, hostel__is_active=True, is_available=True)
+        .annotate(occupants=Count('allocations', filter=Q(allocations__end_date__isnull=True)))
+        .order_by('hostel__name', 'room_number')
+        .values('id', 'hostel_id', 'room_type', 'capacity', 'occupants')
+    )
+
+
+class _BedPool:
+    """
+    In-memory index of free beds keyed by hostel and room type.
+    Rooms are filled one after another so partially occupied rooms fill up first.
+    """
+    def __init__(self, rooms):
+        self.rooms = {}
+        self.hostels = {}
+        for room in rooms:
+            room['free'] = room['capacity'] - room['occupants']
+            self.rooms[room['id']] = room
+            by_type = self.hostels.setdefault(room['hostel_id'], {})
+            if room['free'] > 0:
+                by_type.setdefault(room['room_type'], deque()).append(room)
+
+    def take(self, hostel_id=None, room_type='any'):
+        hostel_ids = [hostel_id] if hostel_id else list(self.hostels)
+        for h_id in hostel_ids:
+            by_type = self.hostels.get(h_id, {})
+            room_types = [room_type] if room_type and room_type != 'any' else list(by_type)
+            for r_type in room_types:
+                bucket = by_type.get(r_type)
+                if not bucket:
+                    continue
+                room = bucket[0]
+                room['free'] -= 1
+                room['occupants'] += 1
+                room['touched'] = True
+                if room['free'] <= 0:
+                    bucket.popleft()
+                return room
+        return None
+
+
+def run_allocation(institute, dry_run=False, start_date=None):
+    """
+    Places every approved, unallocated application of ``institute`` into a free
+    bed, honouring ``preferred_hostel`` and ``preferred_room_type``.
+
+    Allocations and occupancy updates are written with bulk queries inside a
+    single transaction. Returns a summary with placed and unplaced counts.
+    """
+    start_date = start_date or timezone.now().date()
+
+    with transaction.atomic():
+        # Lock the rooms up front; aggregates cannot be combined with FOR UPDATE.
+        list(
+            Room.objects.filter(hostel__institute=institute, hostel__is_active=True)
+            .select_for_update(of=('self',)).values_list('id', flat=True)
+        )
+        pool = _BedPool(list(_free_rooms(institute)))
+
+        allocations = []
+        unplaced = []
+        seen_students = set()
+        for application in _open_applications(institute).iterator(chunk_size=ALLOCATION_BATCH_SIZE):
+            if application['student_id'] in seen_students:
+                unplaced.append(application['id'])
+                continue
+            room = pool.take(application['preferred_hostel_id'], application['preferred_room_type'])
+            if room is None:
+                unplaced.append(application['id'])
+                continue
+            seen_students.add(application['student_id'])
+            allocations.append(RoomAllocation(
+                student_id=application['student_id'],
+                room_id=room['id'],
+                application_id=application['id'],
+                start_date=start_date,
+            ))
+
+        if not dry_run and allocations:
+            RoomAllocation.objects.bulk_create(allocations, batch_size=ALLOCATION_BATCH_SIZE)
+            _write_occupancy([room for room in pool.rooms.values() if room.get('touched')])
+            # Likewise the hosteller flags the allocation signals would have set.
+            Student.objects.filter(pk__in=seen_students, is_currently_hosteller=False).update(
+                is_currently_hosteller=True, updated_at=timezone.now()
+            )
+
+    return {
+        'institute': institute.pk,
+        'dry_run': dry_run,
+        'placed': len(allocations),
+        'unplaced': len(unplaced),
+        'unplaced_applications': unplaced,
+    }
+
+
+def _write_occupancy(rooms):
+    # bulk_create bypasses the occupancy signals, so write the counters computed
+    # under the room locks and recount the touched hostels once. Rooms that
+    # filled up are closed; ``is_available`` is never set back to True here, so
+    # a room closed by hand stays closed.
+    now = timezone.now()
+    updated_rooms = [
+        Room(pk=room['id'], current_occupancy=room['occupants'], updated_at=now)
+        for room in rooms
+    ]
+    Room.objects.bulk_update(
+        updated_rooms, ['current_occupancy', 'updated_at'], batch_size=ALLOCATION_BATCH_SIZE
+    )
+    Room.objects.filter(
+        pk__in=[room['id'] for room in rooms if room['occupants'] >= room['capacity']]
+    ).update(is_available=False)
+    refresh_hostel_availability({room['hostel_id'] for room in rooms})
+
+
+def reserve_bed(room, student, application=None, start_date=None, notes=None,
+                max_attempts=RESERVE_MAX_ATTEMPTS):
+    """
+    Atomically claims a bed in ``room`` and creates the matching RoomAllocation.
+    The bed itself is claimed by the allocation's pre_save occupancy signal.
+
+    Raises RoomFullError when the room has no free bed. Transient lock errors
+    (e.g. SQLite "database is locked", deadlocks) are retried up to
+    ``max_attempts`` times with jittered exponential backoff.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with transaction.atomic():
+                return RoomAllocation.objects.create(
+                    student=student,
+                    room=room,
+                    application=application,
+                    start_date=start_date or timezone.now().date(),
+                    notes=notes,
+                )
+        except OperationalError:
+            if attempt == max_attempts:
+                raise
+            time.sleep(RESERVE_BACKOFF_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class HostelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hostel'
+
+    def ready(self):
+        from hostel import signals  # noqa: F401
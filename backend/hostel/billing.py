@@ -0,0 +1,130 @@
+import calendar
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from hostel.ledger import LedgerChanges
+from hostel.models import Payment, RoomAllocation
+
+BILLING_BATCH_SIZE = 2000
+CENTS = Decimal('0.01')
+
+
+def billing_period(day):
+    """First day of the month containing ``day``; rent is billed per calendar month."""
+    return day.replace(day=1)
+
+
+def period_end(period):
+    return period.replace(day=calendar.monthrange(period.year, period.month)[1])
+
+
+def prorated_rent(monthly_rent, period, start_date, end_date=None):
+    """
+    Rent owed for ``period`` by an allocation running from ``start_date`` to
+    ``end_date`` (inclusive, open-ended when None): the monthly rent scaled by
+    the share of the month's days the bed was held. Returns (amount, days).
+    """
+    last = period_end(period)
+    first_day = max(start_date, period)
+    last_day = min(end_date or last, last)
+    days = (last_day - first_day).days + 1
+    if days <= 0:
+        return Decimal('0.00'), 0
+    if days == last.day:
+        return Decimal(monthly_rent).quantize(CENTS), days
+    amount = Decimal(monthly_rent) * days / last.day
+    return amount.quantize(CENTS, rounding=ROUND_HALF_UP), days
+
+
+def billable_allocations(period, institute=None, hostel=None):
+    """
+    Allocations that held a bed during ``period`` and have no rent charge for it
+    yet, joined to their room and hostel rent in one query. The "already billed"
+    check is an EXISTS probe on the (room_allocation, payment_type,
+    billing_period) unique index.
+    """
+    allocations = RoomAllocation.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=period),
+        start_date__lte=period_end(period),
+    ).exclude(Exists(Payment.objects.filter(
+        room_allocation=OuterRef('pk'), payment_type='rent', billing_period=period
+    )))
+    if institute is not None:
+        allocations = allocations.filter(room__hostel__institute=institute)
+    if hostel is not None:
+        allocations = allocations.filter(room__hostel=hostel)
+    return allocations.order_by('id').values(
+        'id', 'student_id', 'start_date', 'end_date', 'room__rent_per_bed', 'room__hostel__rent_per_month'
+    )
+
+
+def run_rent_billing(period, institute=None, hostel=None, due_date=None, dry_run=False):
+    """
+    Creates the monthly rent Payment of every allocation that held a bed during
+    ``period`` (any day of the month). Partial months are prorated by day. The
+    bed's ``rent_per_bed`` is the monthly rent, falling back to the hostel's
+    ``rent_per_month`` when the room has none.
+
+    Allocations are streamed and charges are inserted with ``bulk_create`` in
+    chunks of BILLING_BATCH_SIZE, so memory stays flat. Allocations that are
+    already billed for the period are skipped, which makes the run idempotent;
+    a concurrent run for the same month fails on the billing period's unique
+    constraint and rolls back as a whole.
+
+    Returns a summary of the charges created.
+    """
+    period = billing_period(period)
+    due_date = due_date or period + timedelta(days=getattr(settings, 'HOSTEL_RENT_DUE_DAY', 10) - 1)
+    label = period.strftime('%B %Y')
+    month_days = period_end(period).day
+
+    billed, prorated, total = 0, 0, Decimal('0.00')
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            Payment.objects.bulk_create(batch, batch_size=BILLING_BATCH_SIZE)
+            # bulk_create skips the Payment signals, so the ledgers are posted here.
+            ledgers = LedgerChanges()
+            for payment in batch:
+                ledgers.post_payment(payment)
+            ledgers.save()
+        batch.clear()
+
+    with transaction.atomic():
+        for allocation in billable_allocations(period, institute, hostel).iterator(chunk_size=BILLING_BATCH_SIZE):
+            monthly_rent = allocation['room__rent_per_bed'] or allocation['room__hostel__rent_per_month']
+            amount, days = prorated_rent(monthly_rent, period, allocation['start_date'], allocation['end_date'])
+            if amount <= 0:
+                continue
+            notes = f"Rent for {label}"
+            if days < month_days:
+                notes += f" ({days}/{month_days} days)"
+                prorated += 1
+            batch.append(Payment(
+                room_allocation_id=allocation['id'],
+                student_id=allocation['student_id'],
+                payment_type='rent',
+                billing_period=period,
+                amount=amount,
+                due_date=due_date,
+                notes=notes,
+            ))
+            billed += 1
+            total += amount
+            if len(batch) >= BILLING_BATCH_SIZE:
+                flush()
+        flush()
+
+    return {
+        'period': period,
+        'due_date': due_date,
+        'dry_run': dry_run,
+        'billed': billed,
+        'prorated': prorated,
+        'total_amount': total,
+    }
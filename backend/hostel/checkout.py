@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.utils import timezone
+
+from hostel.models import Room, RoomAllocation
+from hostel.occupancy import reconcile_occupancy
+from hostel.waitlist import promote_waitlist_for_hostels
+
+
+def filter_allocations(institute=None, hostel=None, room_type=None, year_of_study=None, students=None):
+    """Open allocations narrowed by the usual bulk checkout filters."""
+    allocations = RoomAllocation.objects.filter(end_date__isnull=True)
+    if institute is not None:
+        allocations = allocations.filter(room__hostel__institute=institute)
+    if hostel is not None:
+        allocations = allocations.filter(room__hostel=hostel)
+    if room_type:
+        allocations = allocations.filter(room__room_type=room_type)
+    if year_of_study is not None:
+        allocations = allocations.filter(student__year_of_study=year_of_study)
+    if students:
+        allocations = allocations.filter(student__in=students)
+    return allocations
+
+
+def bulk_checkout(allocations, end_date=None, promote=True):
+    """
+    Closes every open allocation in ``allocations`` with one UPDATE, then
+    recomputes room and hostel occupancy for the affected hostels with a single
+    GROUP BY. No allocation rows are loaded into memory. With ``promote`` the
+    freed beds are then offered to the waitlist.
+
+    Returns a summary of what was closed.
+    """
+    end_date = end_date or timezone.now().date()
+    allocations = allocations.filter(end_date__isnull=True)
+
+    with transaction.atomic():
+        hostel_ids = set(allocations.order_by().values_list('room__hostel_id', flat=True).distinct())
+        students = allocations.order_by().values('student_id').distinct().count()
+        # QuerySet.update() skips the per-row occupancy signals; counters are rebuilt below.
+        closed = allocations.order_by().update(end_date=end_date, updated_at=timezone.now())
+        report = reconcile_occupancy(Room.objects.filter(hostel_id__in=hostel_ids)) if closed else None
+
+    promoted = promote_waitlist_for_hostels(hostel_ids) if promote and closed else 0
+
+    return {
+        'closed': closed,
+        'students': students,
+        'end_date': end_date,
+        'hostels': len(hostel_ids),
+        'rooms_updated': report['rooms_drifted'] if report else 0,
+        'promoted_from_waitlist': promoted,
+    }
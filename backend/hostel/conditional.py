@@ -0,0 +1,93 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def _crosses_many(model, path):
+    """Whether the lookup ``path`` follows a reverse foreign key or a many-to-many relation."""
+    for name in path.split('__')[:-1]:
+        field = model._meta.get_field(name)
+        if field.one_to_many or field.many_to_many:
+            return True
+        model = field.related_model
+    return False
+
+
+def freshness(queryset, fields):
+    """
+    (etag source, last modified) of ``queryset`` from one aggregate query: its
+    row count and the latest of each ``fields`` timestamp. Relations reached
+    through a to-many path are counted too, so removing a related row (which
+    touches no remaining ``updated_at``) still changes the result.
+    """
+    many = [path for path in fields if _crosses_many(queryset.model, path)]
+    aggregates = {'rows': Count('pk', distinct=bool(many))}
+    for i, path in enumerate(fields):
+        aggregates[f'latest_{i}'] = Max(path)
+    for i, path in enumerate(many):
+        aggregates[f'related_{i}'] = Count(path.rsplit('__', 1)[0], distinct=True)
+    state = queryset.order_by().aggregate(**aggregates)
+    latest = [value for key, value in state.items() if key.startswith('latest_') and value is not None]
+    return state, max(latest, default=None)
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GETs of a generic view's list and retrieve actions.
+
+    The ETag and Last-Modified of a read are derived from ``freshness`` of the
+    rows it covers, without building the body: for a paginated list, the ids
+    of the page's window (see ``KeysetPagination.window``) are read with one
+    index-ordered query and only those rows are aggregated, so the check
+    costs the same on any page of any table; an unpaginated list covers the
+    whole filtered queryset and a detail the object; a request whose ``If-None-Match`` or
+    ``If-Modified-Since`` still matches gets ``304 Not Modified`` and nothing is
+    serialized. ``freshness_fields`` lists the ``updated_at`` columns the
+    representation depends on, including those of nested or named relations.
+
+    Last-Modified only has a resolution of one second and cannot see deletes;
+    clients should revalidate with the ETag.
+    """
+    freshness_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        window = getattr(self.paginator, 'window', None)
+        window = window(queryset, request, self) if window is not None else None
+        if window is None:
+            return self.conditional(queryset, super().list, request, *args, **kwargs)
+        # The window's ids, in order, also cover rows entering or leaving the page.
+        ids = list(window.values_list('pk', flat=True))
+        return self.conditional(
+            queryset.model._default_manager.filter(pk__in=ids), super().list, request, *args, page=ids, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        def render(request, *args, **kwargs):
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional(self.get_queryset().filter(pk=instance.pk), render, request, *args, **kwargs)
+
+    def conditional(self, queryset, respond, request, *args, page=None, **kwargs):
+        state, last_modified = freshness(queryset, self.freshness_fields)
+        digest = hashlib.md5(usedforsecurity=False)
+        # The same rows render differently per media type (e.g. the browsable API).
+        digest.update(repr((request.accepted_media_type, sorted(state.items()), page)).encode())
+        etag = quote_etag(digest.hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond(request, *args, **kwargs)
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response.headers.setdefault('ETag', etag)
+            if timestamp is not None:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+            # Never reuse a stored copy without asking; the 304s make that cheap.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,167 @@
+import csv
+import io
+import re
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.negotiation import BaseContentNegotiation
+
+from backend.renderers import FastJSONRenderer
+from hostel.readers import datetime_renderer, render_date, render_decimal
+
+EXPORT_BATCH_SIZE = 2000
+# Streamed output is handed to the server in pieces of about this many bytes.
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+# Spreadsheets run cells starting with these as formulas; numbers such as phone numbers are left alone.
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+_NUMBER = re.compile(r'[+-]?[\d.]+')
+
+
+class Export:
+    """
+    A flat roster of model rows: ``columns`` are (header, lookup path,
+    render) triples read with ``values_list()``, so every relation is joined
+    in the same query and no model instances are built. ``render`` is skipped
+    for nulls. Rows are streamed from the database cursor and written out as
+    they come, so memory stays flat however many rows are exported.
+    """
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+
+    @property
+    def headers(self):
+        return [header for header, _, _ in self.columns]
+
+    def rows(self, queryset):
+        """The rendered rows of ``queryset``, read EXPORT_BATCH_SIZE at a time."""
+        # datetime_renderer binds the current time zone, so it is built per export.
+        renders = [datetime_renderer() if render is datetime_renderer else render for _, _, render in self.columns]
+        values = queryset.order_by('pk').values_list(*[path for _, path, _ in self.columns])
+        for row in values.iterator(chunk_size=EXPORT_BATCH_SIZE):
+            yield [
+                value if value is None or render is None else render(value)
+                for render, value in zip(renders, row)
+            ]
+
+    def csv(self, queryset):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.headers).encode()
+        for row in self.rows(queryset):
+            yield writer.writerow([_spreadsheet_safe(value) for value in row]).encode()
+
+    def jsonl(self, queryset):
+        renderer = FastJSONRenderer()
+        headers = self.headers
+        for row in self.rows(queryset):
+            yield renderer.render(dict(zip(headers, row))) + b'\n'
+
+    def response(self, queryset, export_format):
+        """A StreamingHttpResponse downloading ``queryset`` as ``export_format`` ('csv' or 'jsonl')."""
+        content_type, extension = EXPORT_FORMATS[export_format]
+        lines = self.csv(queryset) if export_format == 'csv' else self.jsonl(queryset)
+        response = StreamingHttpResponse(_chunked(lines), content_type=content_type)
+        filename = f"{self.name}-{timezone.localdate():%Y%m%d}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class _Echo:
+    """A file for csv.writer that hands each written line back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def _chunked(lines):
+    """
+    ``lines`` joined into pieces of about EXPORT_FLUSH_BYTES. The first line (the
+    CSV header, or the first JSON row) goes out on its own so a download starts
+    at once.
+    """
+    lines = iter(lines)
+    yield next(lines, b'')
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield b''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+def _spreadsheet_safe(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Exports choose their format with ``?export_format=``, so ``Accept: text/csv``
+    must not be turned away with a 406; errors are rendered as JSON.
+    """
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+STUDENT_EXPORT = Export('students', [
+    ('id', 'id', None),
+    ('enroll_number', 'enroll_number', None),
+    ('registration_number', 'registration_number', None),
+    ('email', 'user__email', None),
+    ('institute', 'institute__name', None),
+    ('course', 'course__name', None),
+    ('branch', 'branch__name', None),
+    ('year_of_study', 'year_of_study', None),
+    ('gender', 'gender', None),
+    ('date_of_birth', 'date_of_birth', render_date),
+    ('phone_number', 'phone_number', str),
+    ('admission_date', 'admission_date', render_date),
+    ('leaving_date', 'leaving_date', render_date),
+    ('is_active_student', 'is_active_student', None),
+    ('is_currently_hosteller', 'is_currently_hosteller', None),
+    ('emergency_contact_name', 'emergency_contact_name', None),
+    ('emergency_contact_phone', 'emergency_contact_phone', str),
+    ('city', 'city', None),
+    ('state', 'state', None),
+])
+
+ALLOCATION_EXPORT = Export('allocations', [
+    ('id', 'id', None),
+    ('student', 'student_id', None),
+    ('enroll_number', 'student__enroll_number', None),
+    ('email', 'student__user__email', None),
+    ('hostel', 'room__hostel__name', None),
+    ('room_number', 'room__room_number', None),
+    ('room_type', 'room__room_type', None),
+    ('start_date', 'start_date', render_date),
+    ('end_date', 'end_date', render_date),
+    ('notes', 'notes', None),
+])
+
+PAYMENT_EXPORT = Export('payments', [
+    ('id', 'id', None),
+    ('student', 'student_id', None),
+    ('enroll_number', 'student__enroll_number', None),
+    ('email', 'student__user__email', None),
+    ('hostel', 'room_allocation__room__hostel__name', None),
+    ('room_number', 'room_allocation__room__room_number', None),
+    ('payment_type', 'payment_type', None),
+    ('amount', 'amount', render_decimal),
+    ('status', 'status', None),
+    ('due_date', 'due_date', render_date),
+    ('billing_period', 'billing_period', render_date),
+    ('payment_date', 'payment_date', datetime_renderer),
+    ('transaction_id', 'transaction_id', None),
+    ('payment_method', 'payment_method', None),
+])
@@ -0,0 +1,108 @@
+from functools import cache
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(serializer_class, query_params):
+    """
+    The fields of ``serializer_class`` a read asks for, or None for all of them.
+
+    ``?fields=a,b`` keeps only the named fields. ``?expand=x,y`` names the
+    ``Meta.expandable_fields`` (nested relations) to include; once either
+    parameter is given, expandable fields are left out unless they are named
+    in one of them. Without both parameters the full representation is kept.
+    """
+    fields, expand = query_params.get('fields'), query_params.get('expand')
+    if fields is None and expand is None:
+        return None
+    declared = serializer_class.Meta.fields
+    expandable = set(getattr(serializer_class.Meta, 'expandable_fields', ()))
+
+    wanted = set(_names(fields)) if fields is not None else set(declared) - expandable
+    expanded = set(_names(expand or ''))
+    unknown = (wanted - set(declared)) | (expanded - expandable)
+    if unknown:
+        raise ValidationError({'fields': f"Unknown or non-expandable fields: {', '.join(sorted(unknown))}."})
+    return frozenset(wanted | expanded)
+
+
+@cache
+def _field_lookups(serializer_class, name):
+    """(column paths, prefetch paths) the field ``name`` of ``serializer_class`` reads."""
+    overrides = getattr(serializer_class.Meta, 'field_paths', {})
+    if name in overrides:
+        return tuple(overrides[name]), ()
+    field = serializer_class().fields[name]
+    source = field.source.replace('.', '__')
+    if isinstance(field, serializers.ListSerializer):
+        return (), (source,)
+    if isinstance(field, serializers.BaseSerializer):
+        paths, prefetch = [], []
+        for child in field.Meta.fields:
+            child_paths, child_prefetch = _field_lookups(type(field), child)
+            paths += [f'{source}__{path}' for path in child_paths]
+            prefetch += [f'{source}__{path}' for path in child_prefetch]
+        return tuple(paths), tuple(prefetch)
+    return (source,), ()
+
+
+def sparse_queryset(serializer_class, queryset, fields, extra=()):
+    """
+    ``queryset`` loading only what ``fields`` of ``serializer_class`` read:
+    ``only()`` the needed columns, ``select_related`` the relations they cross
+    and ``prefetch_related`` the nested lists. ``extra`` columns (e.g. the
+    pagination ordering) are always loaded.
+    """
+    paths, prefetch = set(extra), set()
+    for name in fields:
+        field_paths, field_prefetch = _field_lookups(serializer_class, name)
+        paths.update(field_paths)
+        prefetch.update(field_prefetch)
+    relations = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+    for relation in list(relations):
+        # The foreign keys a select_related chain crosses cannot be deferred.
+        parts = relation.split('__')
+        paths.update('__'.join(parts[:i]) for i in range(1, len(parts) + 1))
+    return (
+        queryset.select_related(None).select_related(*relations)
+        .prefetch_related(None).prefetch_related(*prefetch)
+        .only(*paths or ['pk'])
+    )
+
+
+class SparseFieldsSerializerMixin:
+    """Drops the fields a read did not ask for; see ``requested_fields``."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        fields = requested_fields(type(self), request.query_params)
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """
+    Prunes the queryset of a generic view to the fields a read asks for, so
+    ``?fields=``/``?expand=`` shrink the queries and not just the payload.
+    """
+    def get_requested_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        return requested_fields(self.get_serializer_class(), self.request.query_params)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        ordering = [field.lstrip('-') for field in getattr(self, 'ordering', None) or ()]
+        return sparse_queryset(self.get_serializer_class(), queryset, fields, extra=ordering)
@@ -0,0 +1,16 @@
+def violates_constraint(exc, model, name):
+    """
+    True when the IntegrityError ``exc`` was raised by the unique constraint
+    ``name`` of ``model``. PostgreSQL and MySQL report the constraint name;
+    SQLite only lists the constrained columns, so those are matched instead.
+    """
+    message = str(exc)
+    if name in message:
+        return True
+    constraint = next((c for c in model._meta.constraints if c.name == name), None)
+    if constraint is None:
+        return False
+    columns = ', '.join(
+        f"{model._meta.db_table}.{model._meta.get_field(field).column}" for field in constraint.fields
+    )
+    return message.rstrip().endswith(f"constraint failed: {columns}")
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from hostel.models import AllocationLedger, Payment, RoomAllocation, StudentLedger
+
+LEDGER_BATCH_SIZE = 1000
+LEDGER_FIELDS = ('billed', 'paid', 'waived', 'refunded')
+STATUS_FIELDS = {'paid': 'paid', 'waived': 'waived', 'refunded': 'refunded'}
+CENTS = Decimal('0.01')
+
+
+def _sum(status=None):
+    condition = Q(status=status) if status else Q()
+    return Coalesce(Sum('amount', filter=condition), Value(Decimal('0.00')))
+
+
+LEDGER_AGGREGATES = {
+    'billed': _sum(),
+    'paid': _sum('paid'),
+    'waived': _sum('waived'),
+    'refunded': _sum('refunded'),
+}
+
+
+class LedgerChanges:
+    """
+    Collects the ledger deltas of any number of payment changes and writes them
+    with batched queries per ledger table. The signals post one change at
+    a time; bulk paths that skip the signals post all of theirs and save once.
+    """
+    def __init__(self):
+        self.students = defaultdict(lambda: defaultdict(Decimal))
+        self.allocations = defaultdict(lambda: defaultdict(Decimal))
+
+    def post(self, student_id, room_allocation_id, status, amount, sign=1):
+        amount = Decimal(amount) * sign
+        targets = [self.students[student_id]]
+        if room_allocation_id is not None:
+            targets.append(self.allocations[room_allocation_id])
+        for totals in targets:
+            totals['billed'] += amount
+            if status in STATUS_FIELDS:
+                totals[STATUS_FIELDS[status]] += amount
+
+    def reverse(self, student_id, room_allocation_id, status, amount):
+        self.post(student_id, room_allocation_id, status, amount, sign=-1)
+
+    def post_payment(self, payment, sign=1):
+        self.post(payment.student_id, payment.room_allocation_id, payment.status, payment.amount, sign)
+
+    def save(self, create_missing=True):
+        """
+        Applies the collected deltas. ``create_missing=False`` only touches ledger
+        rows that already exist, which is what deletes need: a cascade may be
+        removing the ledger's student or allocation in the same operation.
+        """
+        with transaction.atomic():
+            _write(StudentLedger, 'student_id', self.students, create_missing and _new_student_ledgers)
+            _write(AllocationLedger, 'room_allocation_id', self.allocations, create_missing and _new_allocation_ledgers)
+        self.students.clear()
+        self.allocations.clear()
+
+
+def _new_student_ledgers(student_ids):
+    return [StudentLedger(student_id=student_id) for student_id in student_ids]
+
+
+def _new_allocation_ledgers(allocation_ids):
+    return [
+        AllocationLedger(room_allocation_id=row['id'], student_id=row['student_id'], hostel_id=row['room__hostel_id'])
+        for row in RoomAllocation.objects.filter(pk__in=allocation_ids).values('id', 'student_id', 'room__hostel_id')
+    ]
+
+
+def _write(model, key, deltas, build_missing):
+    """
+    Owners without a ledger get one created with their totals; existing ledgers
+    are bumped with F-expression UPDATEs. Owners with the same deltas (e.g. every
+    resident billed the same rent) share one UPDATE, so a billing run costs a
+    handful of queries per distinct amount rather than one per student.
+    """
+    deltas = {
+        owner: tuple(totals[field] for field in LEDGER_FIELDS)
+        for owner, totals in deltas.items() if any(totals.values())
+    }
+    owners = list(deltas)
+    now = timezone.now()
+    by_delta = defaultdict(list)
+    for start in range(0, len(owners), LEDGER_BATCH_SIZE):
+        chunk = owners[start:start + LEDGER_BATCH_SIZE]
+        existing = set(model.objects.filter(**{f'{key}__in': chunk}).values_list(key, flat=True))
+        missing = [owner for owner in chunk if owner not in existing] if build_missing else []
+        if missing:
+            ledgers = build_missing(missing)
+            for ledger in ledgers:
+                for field, amount in zip(LEDGER_FIELDS, deltas[getattr(ledger, key)]):
+                    setattr(ledger, field, amount)
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(ledgers)
+            except IntegrityError:
+                # Created concurrently; fall back to bumping the rows that now exist.
+                existing.update(missing)
+        for owner in existing:
+            by_delta[deltas[owner]].append(owner)
+
+    for delta, owners in by_delta.items():
+        for start in range(0, len(owners), LEDGER_BATCH_SIZE):
+            model.objects.filter(**{f'{key}__in': owners[start:start + LEDGER_BATCH_SIZE]}).update(
+                updated_at=now,
+                **{field: F(field) + amount for field, amount in zip(LEDGER_FIELDS, delta) if amount},
+            )
+
+
+def rebuild_ledgers():
+    """
+    Recomputes every ledger from the payments with one GROUP BY query per ledger
+    table and replaces the stored rows. Returns the number of ledgers written.
+    """
+    with transaction.atomic():
+        StudentLedger.objects.all().delete()
+        AllocationLedger.objects.all().delete()
+
+        student_rows = Payment.objects.order_by().values('student_id').annotate(**LEDGER_AGGREGATES)
+        students = StudentLedger.objects.bulk_create(
+            (StudentLedger(**row) for row in student_rows.iterator(chunk_size=LEDGER_BATCH_SIZE)),
+            batch_size=LEDGER_BATCH_SIZE,
+        )
+        allocation_rows = (
+            Payment.objects.filter(room_allocation__isnull=False).order_by()
+            .values('room_allocation_id', 'room_allocation__student_id', 'room_allocation__room__hostel_id')
+            .annotate(**LEDGER_AGGREGATES)
+        )
+        allocations = AllocationLedger.objects.bulk_create(
+            (
+                AllocationLedger(
+                    room_allocation_id=row.pop('room_allocation_id'),
+                    student_id=row.pop('room_allocation__student_id'),
+                    hostel_id=row.pop('room_allocation__room__hostel_id'),
+                    **row,
+                )
+                for row in allocation_rows.iterator(chunk_size=LEDGER_BATCH_SIZE)
+            ),
+            batch_size=LEDGER_BATCH_SIZE,
+        )
+    return {'students': len(students), 'allocations': len(allocations)}
+
+
+def hostel_dues(hostel_id):
+    """Ledger totals of every allocation in the hostel, read from the ledger's hostel index."""
+    sums = AllocationLedger.objects.filter(hostel_id=hostel_id).aggregate(
+        **{f'total_{field}': Coalesce(Sum(field), Value(Decimal('0.00'))) for field in LEDGER_FIELDS}
+    )
+    totals = {'hostel': hostel_id, **{field: sums[f'total_{field}'].quantize(CENTS) for field in LEDGER_FIELDS}}
+    totals['outstanding'] = totals['billed'] - totals['paid'] - totals['waived'] - totals['refunded']
+    return totals
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from hostel.models import Hostel, HostelApplication, HostelImage, Room
+from hostel.readers import HostelApplicationReader, HostelReader, RoomReader
+from hostel.serializers import HostelApplicationSerializer, HostelSerializer, RoomSerializer
+
+CASES = {
+    'applications': (
+        HostelApplicationSerializer, HostelApplicationReader,
+        lambda: HostelApplication.objects.select_related(
+            'student__user', 'student__institute', 'student__course', 'student__branch',
+            'institute', 'preferred_hostel', 'reviewed_by',
+        ).order_by('-submitted_at', 'id'),
+    ),
+    'rooms': (
+        RoomSerializer, RoomReader,
+        lambda: Room.objects.select_related('hostel').order_by('hostel_id', 'room_number', 'id'),
+    ),
+    'hostels': (
+        HostelSerializer, HostelReader,
+        lambda: Hostel.objects.select_related('institute', 'director__user', 'director__institute', 'manager__user')
+        .prefetch_related(Prefetch('images', HostelImage.objects.all())).order_by('name', 'id'),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Compare the serializer and the values() reader of the list endpoints on the rows in the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Rows per case (default 1000).")
+        parser.add_argument('--repeat', type=int, default=3, help="Best of this many runs (default 3).")
+        parser.add_argument('cases', nargs='*', help=f"Any of {', '.join(CASES)}; all by default.")
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/'))
+        context = {'request': request}
+        renderer = JSONRenderer()
+
+        unknown = set(options['cases']) - set(CASES)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+        for name in options['cases'] or CASES:
+            serializer_class, reader_class, queryset = CASES[name]
+
+            def serializer_path():
+                return renderer.render(serializer_class(queryset()[:options['rows']], many=True, context=context).data)
+
+            def reader_path():
+                reader = reader_class(context)
+                return renderer.render(reader.rows(reader.values(queryset())[:options['rows']]))
+
+            expected, serializer_time = self.best(serializer_path, options['repeat'])
+            output, reader_time = self.best(reader_path, options['repeat'])
+            rows = min(options['rows'], queryset().count())
+            if not rows:
+                self.stdout.write(f"{name}: no rows to read.")
+                continue
+            self.stdout.write(
+                f"{name}: {rows} rows, serializer {serializer_time * 1e6 / rows:.1f} us/row, "
+                f"reader {reader_time * 1e6 / rows:.1f} us/row, {serializer_time / reader_time:.1f}x faster, "
+                f"output {'identical' if output == expected else 'DIFFERENT'}"
+            )
+
+    @staticmethod
+    def best(run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            result = run()
+            timings.append(time.process_time() - started)
+        return result, min(timings)
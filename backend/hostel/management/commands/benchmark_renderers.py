@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from account.renderers import UserRenderer
+from backend.renderers import FastJSONRenderer
+from hostel.models import HostelApplication
+from hostel.readers import HostelApplicationReader
+
+
+class StrSniffingRenderer(JSONRenderer):
+    """What UserRenderer used to do: look for 'ErrorDetail' in str() of the whole payload."""
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if 'ErrorDetail' in str(data):
+            data = {'error': data}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'json+str-sniffing': StrSniffingRenderer,
+    'fast': FastJSONRenderer,
+    'fast+error-detection': UserRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = "Time the JSON renderers on a page of application rows from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Rows in the payload (default 10000).")
+        parser.add_argument('--repeat', type=int, default=5, help="Best of this many runs (default 5).")
+
+    def handle(self, *args, **options):
+        reader = HostelApplicationReader({'request': Request(RequestFactory().get('/'))})
+        rows = reader.rows(reader.values(
+            HostelApplication.objects.order_by('-submitted_at', 'id')[:options['rows']]
+        ))
+        if not rows:
+            self.stdout.write("No applications to render.")
+            return
+        payload = {'next': None, 'previous': None, 'results': rows}
+        context = {'response': Response(payload)}
+
+        expected = None
+        baseline = None
+        for name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            output, elapsed = self.best(lambda: renderer.render(payload, renderer_context=context), options['repeat'])
+            expected = output if expected is None else expected
+            baseline = elapsed if baseline is None else baseline
+            self.stdout.write(
+                f"{name}: {len(rows)} rows, {elapsed * 1e3:.1f} ms, {baseline / elapsed:.1f}x, "
+                f"output {'identical' if output == expected else 'DIFFERENT'}"
+            )
+
+    @staticmethod
+    def best(run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            result = run()
+            timings.append(time.process_time() - started)
+        return result, min(timings)
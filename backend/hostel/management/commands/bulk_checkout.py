@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel.checkout import bulk_checkout, filter_allocations
+from hostel.models import Room
+
+
+class Command(BaseCommand):
+    help = "Close every open room allocation matching the filters (end-of-term checkout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institute', type=int)
+        parser.add_argument('--hostel', type=int)
+        parser.add_argument('--room-type', choices=[choice for choice, _ in Room.ROOM_TYPES])
+        parser.add_argument('--year-of-study', type=int)
+        parser.add_argument('--students', type=int, nargs='+', help="Student profile ids.")
+        parser.add_argument('--end-date', type=date.fromisoformat, help="YYYY-MM-DD, defaults to today.")
+        parser.add_argument('--no-promote', action='store_true', help="Do not fill freed beds from the waitlist.")
+
+    def handle(self, *args, **options):
+        if not (options['institute'] or options['hostel'] or options['students']):
+            raise CommandError("Pass --institute, --hostel or --students.")
+
+        allocations = filter_allocations(
+            institute=options['institute'],
+            hostel=options['hostel'],
+            room_type=options['room_type'],
+            year_of_study=options['year_of_study'],
+            students=options['students'],
+        )
+        result = bulk_checkout(allocations, end_date=options['end_date'], promote=not options['no_promote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed {result['closed']} allocations for {result['students']} students in "
+            f"{result['hostels']} hostels; {result['rooms_updated']} rooms updated, "
+            f"{result['promoted_from_waitlist']} students promoted from the waitlist."
+        ))
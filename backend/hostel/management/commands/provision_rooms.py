@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel.models import Hostel, Room
+from hostel.provisioning import provision_rooms, rooms_from_block, rooms_from_csv, ProvisioningError
+
+
+class Command(BaseCommand):
+    help = "Create a hostel's rooms in bulk from a floors x rooms-per-floor spec or a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('hostel_id', type=int)
+        parser.add_argument('--csv', help="CSV with room_number,room_type,capacity,rent_per_bed columns.")
+        parser.add_argument('--floors', type=int)
+        parser.add_argument('--rooms-per-floor', type=int)
+        parser.add_argument('--room-type', choices=[choice for choice, _ in Room.ROOM_TYPES])
+        parser.add_argument('--capacity', type=int)
+        parser.add_argument('--rent-per-bed', type=Decimal)
+        parser.add_argument('--start-floor', type=int, default=1)
+        parser.add_argument('--prefix', default='')
+
+    def handle(self, *args, **options):
+        try:
+            hostel = Hostel.objects.get(pk=options['hostel_id'])
+        except Hostel.DoesNotExist:
+            raise CommandError(f"Hostel {options['hostel_id']} does not exist.")
+
+        block_options = ('floors', 'rooms_per_floor', 'room_type', 'capacity', 'rent_per_bed')
+        try:
+            if options['csv']:
+                with open(options['csv'], newline='', encoding='utf-8-sig') as csv_file:
+                    rows = rooms_from_csv(csv_file)
+            elif all(options[name] is not None for name in block_options):
+                rows = rooms_from_block(
+                    start_floor=options['start_floor'], prefix=options['prefix'],
+                    **{name: options[name] for name in block_options}
+                )
+            else:
+                raise CommandError("Pass --csv or all of --floors, --rooms-per-floor, --room-type, --capacity and --rent-per-bed.")
+            result = provision_rooms(hostel, rows)
+        except ProvisioningError as exc:
+            raise CommandError(exc.errors)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {result['created']} rooms in {hostel.name}."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from hostel.ledger import rebuild_ledgers
+
+
+class Command(BaseCommand):
+    help = "Recompute every student and allocation ledger from the payments table."
+
+    def handle(self, *args, **options):
+        result = rebuild_ledgers()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {result['students']} student ledgers and {result['allocations']} allocation ledgers."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from hostel.waitlist import rebuild_waitlist
+
+
+class Command(BaseCommand):
+    help = "Recreate waitlist queue entries for all waitlisted applications (e.g. after changing HOSTEL_WAITLIST_WEIGHTS)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institute', type=int, help="Only rebuild the queues of this institute.")
+
+    def handle(self, *args, **options):
+        created = rebuild_waitlist(institute=options['institute'])
+        self.stdout.write(self.style.SUCCESS(f"Queued {created} waitlisted applications."))
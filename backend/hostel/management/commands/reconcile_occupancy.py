@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from hostel.models import Room
+from hostel.occupancy import reconcile_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute room and hostel occupancy counters and student hosteller flags from active "
+        "allocations and report drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institute', type=int, help="Only reconcile rooms of this institute.")
+        parser.add_argument('--hostel', type=int, help="Only reconcile rooms of this hostel.")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.all()
+        if options['institute']:
+            rooms = rooms.filter(hostel__institute_id=options['institute'])
+        if options['hostel']:
+            rooms = rooms.filter(hostel_id=options['hostel'])
+
+        report = reconcile_occupancy(rooms, dry_run=options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if report['dry_run'] else ''}Checked {report['rooms_checked']} rooms in "
+            f"{report['hostels_checked']} hostels: {report['rooms_drifted']} rooms and "
+            f"{report['hostels_drifted']} hostels drifted, {report['students_drifted']} hosteller flags were stale."
+        ))
@@ -0,0 +1,38 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel.reconciliation import reconcile_statement, StatementError, EXCEPTION_COLUMNS, DEFAULT_PAYMENT_METHOD
+
+
+class Command(BaseCommand):
+    help = "Match a bank or gateway statement CSV to payable payments and mark the matches paid."
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help="Path to the statement CSV.")
+        parser.add_argument('--exceptions', help="Where to write unmatched lines as CSV (defaults to stderr).")
+        parser.add_argument('--institute', type=int, help="Only match payments of this institute.")
+        parser.add_argument('--payment-method', default=DEFAULT_PAYMENT_METHOD)
+
+    def handle(self, *args, **options):
+        report_file = open(options['exceptions'], 'w', newline='') if options['exceptions'] else sys.stderr
+        try:
+            report = csv.DictWriter(report_file, fieldnames=EXCEPTION_COLUMNS)
+            report.writeheader()
+            with open(options['statement'], newline='', encoding='utf-8-sig') as statement:
+                result = reconcile_statement(
+                    statement, report.writerow,
+                    institute=options['institute'], payment_method=options['payment_method'],
+                )
+        except (OSError, StatementError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if report_file is not sys.stderr:
+                report_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {result['lines']} lines: matched {result['matched']} "
+            f"({result['matched_by_transaction']} by transaction id, {result['matched_by_student']} by student), "
+            f"amount {result['amount_matched']}; {result['exceptions']} exceptions."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from hostel.rollup import refresh_payment_rollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly payment rollup for the months with changed payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every month.")
+
+    def handle(self, *args, **options):
+        result = refresh_payment_rollup(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {result['months']} months into {result['rows']} rows."
+        ))
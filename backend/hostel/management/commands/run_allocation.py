@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from director.models import Institute
+from hostel.allocation import run_allocation
+
+
+class Command(BaseCommand):
+    help = "Allocate beds to every approved, unallocated hostel application of an institute."
+
+    def add_arguments(self, parser):
+        parser.add_argument('institute_id', type=int)
+        parser.add_argument('--dry-run', action='store_true', help="Plan the allocation without writing it.")
+
+    def handle(self, *args, **options):
+        try:
+            institute = Institute.objects.get(pk=options['institute_id'])
+        except Institute.DoesNotExist:
+            raise CommandError(f"Institute {options['institute_id']} does not exist.")
+
+        result = run_allocation(institute, dry_run=options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if result['dry_run'] else ''}{institute.name}: "
+            f"placed {result['placed']}, unplaced {result['unplaced']}."
+        ))
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hostel.penalties import run_late_fees
+
+
+def month(value):
+    return date.fromisoformat(f"{value}-01")
+
+
+class Command(BaseCommand):
+    help = "Levy late fees on the charges of a billing month that are still unpaid."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', type=month, help="YYYY-MM, defaults to the current month.")
+        parser.add_argument('--as-of', type=date.fromisoformat, help="YYYY-MM-DD, defaults to today.")
+        parser.add_argument('--institute', type=int)
+        parser.add_argument('--hostel', type=int)
+        parser.add_argument('--dry-run', action='store_true', help="Only print the totals.")
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        result = run_late_fees(
+            options['period'] or today,
+            options['as_of'] or today,
+            institute=options['institute'],
+            hostel=options['hostel'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if result['dry_run'] else ''}Late fees for {result['period']:%B %Y} as of {result['as_of']}: "
+            f"{result['penalised']} of {result['overdue']} overdue charges, total {result['total_amount']}."
+        ))
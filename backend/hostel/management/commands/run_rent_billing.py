@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hostel.billing import run_rent_billing
+
+
+def month(value):
+    return date.fromisoformat(f"{value}-01")
+
+
+class Command(BaseCommand):
+    help = "Create the monthly rent charges of every allocation that held a bed during a month."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', type=month, help="YYYY-MM, defaults to the current month.")
+        parser.add_argument('--institute', type=int)
+        parser.add_argument('--hostel', type=int)
+        parser.add_argument('--due-date', type=date.fromisoformat, help="YYYY-MM-DD, defaults to HOSTEL_RENT_DUE_DAY of the month.")
+        parser.add_argument('--dry-run', action='store_true', help="Compute the charges without writing them.")
+
+    def handle(self, *args, **options):
+        result = run_rent_billing(
+            options['period'] or timezone.now().date(),
+            institute=options['institute'],
+            hostel=options['hostel'],
+            due_date=options['due_date'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if result['dry_run'] else ''}Rent for {result['period']:%B %Y}: "
+            f"billed {result['billed']} allocations ({result['prorated']} prorated), "
+            f"total {result['total_amount']}, due {result['due_date']}."
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['hostel', 'is_available', 'room_type'], name='room_vacancy_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('director', '0001_initial'),
+        ('hostel', '0003_waitlist_entry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hostelapplication',
+            index=models.Index(fields=['-submitted_at', 'id'], name='application_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hostelapplication',
+            index=models.Index(fields=['institute', '-submitted_at', 'id'], name='application_inst_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('director', '0001_initial'),
+        ('hostel', '0004_application_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='hostelapplication',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'approved', 'waitlisted'])), fields=('student',), name='one_active_application_per_student', violation_error_message='This student already has an active or approved hostel application.'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomallocation',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_date__isnull', True)), fields=('student',), name='one_open_allocation_per_student', violation_error_message='This student is already actively allocated to another room.'),
+        ),
+    ]
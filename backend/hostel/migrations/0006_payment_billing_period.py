@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0005_active_uniqueness_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='billing_period',
+            field=models.DateField(blank=True, help_text='First day of the month a recurring charge covers.', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(fields=('room_allocation', 'payment_type', 'billing_period'), name='one_charge_per_allocation_period'),
+        ),
+    ]
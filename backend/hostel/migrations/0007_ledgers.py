@@ -0,0 +1,87 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:10
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _totals():
+    def total(status=None):
+        return Coalesce(Sum('amount', filter=Q(status=status) if status else Q()), Value(Decimal('0.00')))
+    return {'billed': total(), 'paid': total('paid'), 'waived': total('waived'), 'refunded': total('refunded')}
+
+
+def backfill_ledgers(apps, schema_editor):
+    Payment = apps.get_model('hostel', 'Payment')
+    StudentLedger = apps.get_model('hostel', 'StudentLedger')
+    AllocationLedger = apps.get_model('hostel', 'AllocationLedger')
+
+    StudentLedger.objects.bulk_create(
+        [StudentLedger(**row) for row in Payment.objects.order_by().values('student_id').annotate(**_totals())],
+        batch_size=1000,
+    )
+    rows = (
+        Payment.objects.filter(room_allocation__isnull=False).order_by()
+        .values('room_allocation_id', 'room_allocation__student_id', 'room_allocation__room__hostel_id')
+        .annotate(**_totals())
+    )
+    AllocationLedger.objects.bulk_create(
+        [
+            AllocationLedger(
+                room_allocation_id=row.pop('room_allocation_id'),
+                student_id=row.pop('room_allocation__student_id'),
+                hostel_id=row.pop('room_allocation__room__hostel_id'),
+                **row,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0006_payment_billing_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllocationLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('waived', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hostel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocation_ledgers', to='hostel.hostel')),
+                ('room_allocation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='hostel.roomallocation')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocation_ledgers', to='hostel.student')),
+            ],
+            options={
+                'verbose_name': 'Allocation Ledger',
+                'verbose_name_plural': 'Allocation Ledgers',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('waived', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='hostel.student')),
+            ],
+            options={
+                'verbose_name': 'Student Ledger',
+                'verbose_name_plural': 'Student Ledgers',
+            },
+        ),
+        migrations.RunPython(backfill_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0008_payment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='penalty_for',
+            field=models.OneToOneField(blank=True, help_text='The overdue charge this late fee was levied on.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='penalty', to='hostel.payment'),
+        ),
+        migrations.CreateModel(
+            name='LateFeePolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grace_days', models.PositiveSmallIntegerField(default=0)),
+                ('slabs', models.JSONField(blank=True, default=list)),
+                ('max_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hostel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='late_fee_policy', to='hostel.hostel')),
+            ],
+            options={
+                'verbose_name': 'Late Fee Policy',
+                'verbose_name_plural': 'Late Fee Policies',
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0009_late_fees'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('waived', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('refunded', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('month', models.DateField(help_text='First day of the month the charges fall due in.')),
+                ('payment_type', models.CharField(choices=[('security_deposit', 'Security Deposit'), ('rent', 'Rent'), ('maintenance_fee', 'Maintenance Fee'), ('other', 'Other Fee')], max_length=20)),
+                ('payments', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Payment Rollup',
+                'verbose_name_plural': 'Payment Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentRollupDirtyMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['due_date'], name='payment_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='paymentrollup',
+            name='hostel',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_rollups', to='hostel.hostel'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrollup',
+            index=models.Index(fields=['month', 'hostel'], name='rollup_month_hostel_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentrollup',
+            constraint=models.UniqueConstraint(fields=('hostel', 'month', 'payment_type'), name='one_rollup_per_hostel_month_type'),
+        ),
+    ]
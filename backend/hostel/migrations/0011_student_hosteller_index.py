@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:34
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_hosteller_flags(apps, schema_editor):
+    Student = apps.get_model('hostel', 'Student')
+    RoomAllocation = apps.get_model('hostel', 'RoomAllocation')
+    Student.objects.filter(
+        Exists(RoomAllocation.objects.filter(student=OuterRef('pk'), end_date__isnull=True))
+    ).update(is_currently_hosteller=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0010_payment_rollup'),
+    ]
+
+    operations = [
+        # The column was shadowed by a Student property, so it was never created.
+        migrations.AddField(
+            model_name='student',
+            name='is_currently_hosteller',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(backfill_hosteller_flags, migrations.RunPython.noop),
+    ]
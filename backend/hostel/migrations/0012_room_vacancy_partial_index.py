@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel', '0011_student_hosteller_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='room',
+            name='room_vacancy_idx',
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['hostel', 'room_type'], name='room_vacancy_idx'),
+        ),
+    ]
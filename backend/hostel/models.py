@@ -115,9 +115,22 @@ class Room(models.Model):
     class Meta:
         unique_together = ('hostel', 'room_number')
         ordering = ['hostel', 'room_number']
+        indexes = [
+            # Partial, because SQLite renders ``is_available=True`` as a bare column,
+            # which a composite index cannot match.
+            models.Index(fields=['hostel', 'room_type'], condition=models.Q(is_available=True), name='room_vacancy_idx'),
+        ]
         verbose_name = "Room"
         verbose_name_plural = "Rooms"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the counter signals only recount hostels whose available rooms changed.
+        if 'hostel_id' in instance.__dict__ and 'is_available' in instance.__dict__:
+            instance._counted_state = (instance.hostel_id, instance.is_available)
+        return instance
+
     @property
     def available_beds(self):
         return max(0, self.capacity - self.current_occupancy)
@@ -204,7 +217,8 @@ class Student(models.Model):
     admission_date = models.DateField(null=True, blank=True)
     leaving_date = models.DateField(null=True, blank=True)
 
-    is_currently_hosteller = models.BooleanField(default=False) 
+    # Kept in step with the open RoomAllocations by the allocation signals and bulk paths.
+    is_currently_hosteller = models.BooleanField(default=False, db_index=True)
     is_active_student = models.BooleanField(default=True, verbose_name="Is Active Student in Institute")
 
     emergency_contact_name = models.CharField(max_length=100, null=True, blank=True)
@@ -226,11 +240,6 @@ class Student(models.Model):
     @property
     def full_name(self):
         return self.user.get_full_name() if hasattr(self.user, 'get_full_name') else self.user.email
-    
-    @property
-    def is_currently_hosteller(self):
-        """Checks if the student has an active room allocation."""
-        return self.room_allocations.filter(end_date__isnull=True).exists()
 
     class Meta:
         ordering = ['institute', 'enroll_number']
@@ -244,6 +253,11 @@ class ApplicationStatus(models.TextChoices):
     CANCELLED = 'cancelled', 'Cancelled by Student'
     WAITLISTED = 'waitlisted', 'Waitlisted'
 
+ACTIVE_APPLICATION_STATUSES = [ApplicationStatus.PENDING, ApplicationStatus.APPROVED, ApplicationStatus.WAITLISTED]
+ACTIVE_APPLICATION_CONSTRAINT = 'one_active_application_per_student'
+OPEN_ALLOCATION_CONSTRAINT = 'one_open_allocation_per_student'
+
+
 class HostelApplication(models.Model):
     PREFERRED_ROOM_TYPES = [
         ('single', 'Single Occupancy'),
@@ -277,6 +291,14 @@ class HostelApplication(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the waitlist signal only reacts to status changes.
+        if 'status' in instance.__dict__:
+            instance._loaded_status = instance.status
+        return instance
+
     def __str__(self):
         return f"Application by {self.student} - Status: {self.get_status_display()}"
 
@@ -285,20 +307,52 @@ class HostelApplication(models.Model):
         if self.student and self.institute != self.student.institute:
             raise ValidationError("Application institute must match student's institute.")
 
-        if self.status in [ApplicationStatus.PENDING, ApplicationStatus.APPROVED, ApplicationStatus.WAITLISTED]:
-            existing_active_apps = HostelApplication.objects.filter(
-                student=self.student,
-                status__in=[ApplicationStatus.PENDING, ApplicationStatus.APPROVED, ApplicationStatus.WAITLISTED]
-            ).exclude(pk=self.pk)
-            if existing_active_apps.exists():
-                raise ValidationError(f"Student {self.student} already has an active or approved hostel application.")
-    
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Keyset pagination of the application lists walks (-submitted_at, id).
+            models.Index(fields=['-submitted_at', 'id'], name='application_recent_idx'),
+            models.Index(fields=['institute', '-submitted_at', 'id'], name='application_inst_recent_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student'],
+                condition=models.Q(status__in=ACTIVE_APPLICATION_STATUSES),
+                name=ACTIVE_APPLICATION_CONSTRAINT,
+                violation_error_message="This student already has an active or approved hostel application.",
+            ),
+        ]
         verbose_name = "Hostel Application"
         verbose_name_plural = "Hostel Applications"
 
 
+class WaitlistEntry(models.Model):
+    """
+    Queue position of a waitlisted application. Each (institute, hostel, room_type)
+    triple is one queue; ``hostel`` is empty when the student will take any hostel.
+    Lower ``priority`` values are served first.
+    """
+    application = models.OneToOneField(HostelApplication, on_delete=models.CASCADE, related_name='waitlist_entry')
+    institute = models.ForeignKey(Institute, on_delete=models.CASCADE, related_name='waitlist_entries')
+    hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, null=True, blank=True, related_name='waitlist_entries')
+    room_type = models.CharField(max_length=20, choices=HostelApplication.PREFERRED_ROOM_TYPES, default='any')
+    priority = models.FloatField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['priority', 'id']
+        indexes = [
+            models.Index(fields=['institute', 'hostel', 'room_type', 'priority', 'id'], name='waitlist_queue_idx'),
+        ]
+        verbose_name = "Waitlist Entry"
+        verbose_name_plural = "Waitlist Entries"
+
+    def __str__(self):
+        return f"Waitlist entry for application #{self.application_id} ({self.room_type})"
+
+
 class RoomAllocation(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='room_allocations')
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='allocations')
@@ -316,6 +370,22 @@ class RoomAllocation(models.Model):
     class Meta:
         ordering = ['-start_date', 'student']
         unique_together = ('student', 'room', 'start_date')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student'],
+                condition=models.Q(end_date__isnull=True),
+                name=OPEN_ALLOCATION_CONSTRAINT,
+                violation_error_message="This student is already actively allocated to another room.",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the occupancy signals can tell starts, ends and moves apart.
+        if 'room_id' in instance.__dict__ and 'end_date' in instance.__dict__:
+            instance._occupancy_state = (instance.room_id, instance.end_date is None)
+        return instance
 
     def __str__(self):
         status = "Current" if self.is_active else f"Ended on {self.end_date.strftime('%Y-%m-%d') if self.end_date else 'N/A'}"
@@ -345,11 +415,11 @@ class RoomAllocation(models.Model):
                 if not (self.pk and RoomAllocation.objects.get(pk=self.pk).end_date is None and active_allocations_for_room < self.room.capacity):
                     raise ValidationError(f"Room {self.room.room_number} is already at full capacity ({self.room.capacity} occupants).")
 
-        other_active_allocations_for_student = RoomAllocation.objects.filter(
-            student=self.student, end_date__isnull=True
-        ).exclude(pk=self.pk if self.pk else None)
-        if self.is_active and other_active_allocations_for_student.exists():
-            raise ValidationError(f"Student {self.student} is already actively allocated to another room.")
+        # Opening an allocation, or moving an open one, claims a bed, which closed rooms refuse (see claim_bed).
+        before = getattr(self, '_occupancy_state', None)
+        claims_bed = self.end_date is None and (before is None or not before[1] or before[0] != self.room_id)
+        if claims_bed and not self.room.is_available:
+            raise ValidationError(f"Room {self.room.room_number} is closed to new allocations.")
 
 class Payment(models.Model):
     PAYMENT_TYPES = (
@@ -366,6 +436,8 @@ class Payment(models.Model):
         ('refunded', 'Refunded'),
         ('waived', 'Waived'),
     )
+    # Charges that are still owed; past their due date they are overdue.
+    PAYABLE_STATUSES = ('pending', 'failed')
     
     room_allocation = models.ForeignKey(RoomAllocation, on_delete=models.CASCADE, related_name='payments', null=True, blank=True)
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='payments')
@@ -376,6 +448,11 @@ class Payment(models.Model):
     
     due_date = models.DateField()
     payment_date = models.DateTimeField(null=True, blank=True)
+    billing_period = models.DateField(null=True, blank=True, help_text="First day of the month a recurring charge covers.")
+    penalty_for = models.OneToOneField(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name='penalty',
+        help_text="The overdue charge this late fee was levied on.",
+    )
 
     transaction_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
     payment_method = models.CharField(max_length=50, blank=True, null=True)
@@ -384,10 +461,146 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the ledger signals can post only the difference of a change.
+        if {'student_id', 'room_allocation_id', 'status', 'amount'} <= instance.__dict__.keys():
+            instance._ledger_state = (instance.student_id, instance.room_allocation_id, instance.status, instance.amount)
+        if 'due_date' in instance.__dict__:
+            instance._rollup_due_date = instance.due_date
+        return instance
+
     def __str__(self):
         return f"Payment for {self.student}: {self.amount} ({self.get_payment_type_display()}) - Status: {self.get_status_display()}"
 
     class Meta:
         ordering = ['-due_date', 'student']
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='payment_status_due_idx'),
+            models.Index(fields=['student', 'status'], name='payment_student_status_idx'),
+            # Month scans and the changed-since watermark of the payment rollup.
+            models.Index(fields=['due_date'], name='payment_due_idx'),
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room_allocation', 'payment_type', 'billing_period'],
+                name='one_charge_per_allocation_period',
+            ),
+        ]
         verbose_name = "Payment"
         verbose_name_plural = "Payments"
+
+
+class LateFeePolicy(models.Model):
+    """
+    Late fee slabs of a hostel; hostels without one use HOSTEL_LATE_FEE_POLICY.
+    ``slabs`` is a list of ``{"after_days": int, "percent": number, "flat": number}``.
+    A charge more than ``grace_days`` past due is in the highest slab whose
+    ``after_days`` it has exceeded, and pays that slab's percent of the charge
+    plus its flat fee, capped at ``max_fee`` when set.
+    """
+    hostel = models.OneToOneField(Hostel, on_delete=models.CASCADE, related_name='late_fee_policy')
+    grace_days = models.PositiveSmallIntegerField(default=0)
+    slabs = models.JSONField(default=list, blank=True)
+    max_fee = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Late fee policy of {self.hostel.name}"
+
+    def clean(self):
+        super().clean()
+        try:
+            for slab in self.slabs:
+                if int(slab['after_days']) < 0 or float(slab.get('percent', 0)) < 0 or float(slab.get('flat', 0)) < 0:
+                    raise ValueError
+        except (TypeError, KeyError, ValueError):
+            raise ValidationError({'slabs': 'Each slab needs a non-negative after_days, percent and flat fee.'})
+
+    class Meta:
+        verbose_name = "Late Fee Policy"
+        verbose_name_plural = "Late Fee Policies"
+
+
+class LedgerTotals(models.Model):
+    """
+    Running totals of the charges posted to a ledger, kept current by the Payment
+    signals. ``billed`` counts every charge; ``paid``, ``waived`` and ``refunded``
+    count the charges in that status, so what is still owed is the remainder.
+    """
+    billed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    waived = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refunded = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def outstanding(self):
+        return self.billed - self.paid - self.waived - self.refunded
+
+
+class StudentLedger(LedgerTotals):
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='ledger')
+
+    class Meta:
+        verbose_name = "Student Ledger"
+        verbose_name_plural = "Student Ledgers"
+
+    def __str__(self):
+        return f"Ledger of {self.student}: {self.outstanding} outstanding"
+
+
+class AllocationLedger(LedgerTotals):
+    """Totals of one room allocation; ``hostel`` is copied from the room so hostel dues are one indexed read."""
+    room_allocation = models.OneToOneField(RoomAllocation, on_delete=models.CASCADE, related_name='ledger')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='allocation_ledgers')
+    hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='allocation_ledgers')
+
+    class Meta:
+        verbose_name = "Allocation Ledger"
+        verbose_name_plural = "Allocation Ledgers"
+
+    def __str__(self):
+        return f"Ledger of allocation #{self.room_allocation_id}: {self.outstanding} outstanding"
+
+
+class PaymentRollup(LedgerTotals):
+    """
+    Totals of the charges of one hostel falling due in one month, per payment type.
+    Maintained by ``hostel.rollup.refresh_payment_rollup``; ``updated_at`` is the
+    time the month was last rolled up.
+    """
+    hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='payment_rollups')
+    month = models.DateField(help_text="First day of the month the charges fall due in.")
+    payment_type = models.CharField(max_length=20, choices=Payment.PAYMENT_TYPES)
+    payments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['month', 'hostel'], name='rollup_month_hostel_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['hostel', 'month', 'payment_type'], name='one_rollup_per_hostel_month_type'),
+        ]
+        verbose_name = "Payment Rollup"
+        verbose_name_plural = "Payment Rollups"
+
+    def __str__(self):
+        return f"{self.hostel_id} {self.month:%Y-%m} {self.payment_type}: {self.outstanding} outstanding"
+
+
+class PaymentRollupDirtyMonth(models.Model):
+    """A month whose rollup must be recomputed for a change the updated_at watermark cannot see, such as a delete."""
+    month = models.DateField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}"
@@ -0,0 +1,156 @@
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from hostel.models import Hostel, Room, RoomAllocation, Student
+
+OCCUPANCY_BATCH_SIZE = 1000
+
+
+class RoomFullError(Exception):
+    pass
+
+
+def claim_bed(room_id):
+    """
+    Takes one bed in the room with conditional F-expression UPDATEs. The WHERE
+    clauses re-check capacity inside the database, so concurrent claims can never
+    push ``current_occupancy`` past ``capacity``. Taking the last bed closes the
+    room and decrements its hostel's ``available_rooms``. A closed room
+    (``is_available`` False) gives out no beds.
+
+    Returns False when the room has no free bed or is closed.
+    """
+    rooms = Room.objects.filter(pk=room_id, is_available=True)
+    while rooms.filter(current_occupancy__lt=F('capacity')).exists():
+        if rooms.filter(current_occupancy__lt=F('capacity') - 1).update(
+            current_occupancy=F('current_occupancy') + 1, updated_at=timezone.now()
+        ):
+            return True
+        if rooms.filter(current_occupancy=F('capacity') - 1).update(
+            current_occupancy=F('current_occupancy') + 1, is_available=False, updated_at=timezone.now()
+        ):
+            Hostel.objects.filter(rooms=room_id, available_rooms__gt=0).update(
+                available_rooms=F('available_rooms') - 1, updated_at=timezone.now()
+            )
+            return True
+    return False
+
+
+def release_bed(room_id):
+    """
+    Frees one bed in the room. A room closed because it was full (occupancy at
+    capacity) is reopened and counted again in its hostel's ``available_rooms``;
+    one closed by hand with beds still free, or left over capacity by a
+    capacity cut, stays closed.
+    """
+    rooms = Room.objects.filter(pk=room_id, current_occupancy__gt=0)
+    if rooms.exclude(current_occupancy=F('capacity')).update(
+        current_occupancy=F('current_occupancy') - 1, updated_at=timezone.now()
+    ):
+        return
+    if rooms.filter(is_available=False).update(
+        current_occupancy=F('current_occupancy') - 1, is_available=True, updated_at=timezone.now()
+    ):
+        Hostel.objects.filter(rooms=room_id).update(
+            available_rooms=F('available_rooms') + 1, updated_at=timezone.now()
+        )
+        return
+    rooms.update(current_occupancy=F('current_occupancy') - 1, updated_at=timezone.now())
+
+
+def refresh_hostel_availability(hostel_ids):
+    """
+    Recounts ``total_rooms`` and ``available_rooms`` for the given hostels with
+    one GROUP BY query and writes back the ones that drifted. Returns that count.
+    """
+    hostel_ids = set(hostel_ids)
+    counts = {
+        row['hostel_id']: (row['total'], row['available'])
+        for row in Room.objects.filter(hostel_id__in=hostel_ids)
+        .values('hostel_id')
+        .annotate(total=Count('id'), available=Count('id', filter=Q(is_available=True)))
+    }
+    now = timezone.now()
+    drifted = []
+    for hostel in Hostel.objects.filter(pk__in=hostel_ids).values('id', 'total_rooms', 'available_rooms'):
+        total, available = counts.get(hostel['id'], (0, 0))
+        if (total, available) != (hostel['total_rooms'], hostel['available_rooms']):
+            drifted.append(Hostel(pk=hostel['id'], total_rooms=total, available_rooms=available, updated_at=now))
+    Hostel.objects.bulk_update(
+        drifted, ['total_rooms', 'available_rooms', 'updated_at'], batch_size=OCCUPANCY_BATCH_SIZE
+    )
+    return len(drifted)
+
+
+def sync_hosteller_flags(students=None, dry_run=False):
+    """
+    Sets ``Student.is_currently_hosteller`` from the open allocations for
+    ``students`` (a queryset, or ids) or everyone. Only students whose flag is
+    wrong are written, with two UPDATEs. Returns how many were (or would be) fixed.
+    """
+    students = Student.objects.all() if students is None else Student.objects.filter(pk__in=students)
+    housed = Exists(RoomAllocation.objects.filter(student=OuterRef('pk'), end_date__isnull=True))
+    gained = students.filter(housed, is_currently_hosteller=False)
+    lost = students.filter(~housed, is_currently_hosteller=True)
+    if dry_run:
+        return gained.count() + lost.count()
+    now = timezone.now()
+    return (
+        gained.update(is_currently_hosteller=True, updated_at=now)
+        + lost.update(is_currently_hosteller=False, updated_at=now)
+    )
+
+
+def reconcile_occupancy(rooms=None, dry_run=False):
+    """
+    Recomputes ``Room.current_occupancy`` / ``is_available`` from active
+    allocations with one GROUP BY query and fixes any drift, then recounts the
+    affected hostels and re-syncs the hosteller flag of the students ever
+    allocated to the rooms. ``rooms`` optionally narrows the room queryset.
+
+    Returns a report with the number of rooms checked and corrected.
+    """
+    students = None if rooms is None else Student.objects.filter(room_allocations__room__in=rooms)
+    rooms = Room.objects.all() if rooms is None else rooms
+    occupants = dict(
+        RoomAllocation.objects.filter(end_date__isnull=True, room__in=rooms)
+        .values('room_id').annotate(n=Count('id')).values_list('room_id', 'n')
+    )
+
+    now = timezone.now()
+    drifted = []
+    hostel_ids = set()
+    checked = 0
+    for room in rooms.order_by().values(
+        'id', 'hostel_id', 'capacity', 'current_occupancy', 'is_available'
+    ).iterator(chunk_size=OCCUPANCY_BATCH_SIZE):
+        checked += 1
+        hostel_ids.add(room['hostel_id'])
+        actual = occupants.get(room['id'], 0)
+        is_available = room['is_available']
+        if actual >= room['capacity']:
+            is_available = False
+        elif room['current_occupancy'] >= room['capacity']:
+            # Counter said full but beds are free; reopen the room.
+            is_available = True
+        if actual != room['current_occupancy'] or is_available != room['is_available']:
+            drifted.append(Room(
+                pk=room['id'], current_occupancy=actual, is_available=is_available, updated_at=now
+            ))
+
+    hostels_drifted = 0
+    if not dry_run:
+        Room.objects.bulk_update(
+            drifted, ['current_occupancy', 'is_available', 'updated_at'], batch_size=OCCUPANCY_BATCH_SIZE
+        )
+        hostels_drifted = refresh_hostel_availability(hostel_ids)
+    students_drifted = sync_hosteller_flags(students, dry_run=dry_run)
+
+    return {
+        'rooms_checked': checked,
+        'rooms_drifted': len(drifted),
+        'hostels_checked': len(hostel_ids),
+        'hostels_drifted': hostels_drifted,
+        'students_drifted': students_drifted,
+        'dry_run': dry_run,
+    }
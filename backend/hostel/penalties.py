@@ -0,0 +1,155 @@
+from decimal import Decimal
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from hostel.billing import billing_period
+from hostel.ledger import LedgerChanges
+from hostel.models import LateFeePolicy, Payment
+
+PENALTY_BATCH_SIZE = 5000
+CENTS = Decimal('0.01')
+NO_CAP = np.iinfo(np.int64).max
+
+
+def _cents(value):
+    return int((Decimal(value or 0) * 100).to_integral_value())
+
+
+class PolicyTable:
+    """
+    The late fee policies of a set of hostels as arrays indexed by a per-hostel
+    row: slab thresholds, rates (in basis points) and flat fees (in cents) are
+    padded to the longest slab list, so every charge can be looked up at once.
+    Hostels without a LateFeePolicy share the HOSTEL_LATE_FEE_POLICY row 0.
+    """
+    def __init__(self, hostel_ids):
+        default = getattr(settings, 'HOSTEL_LATE_FEE_POLICY', {})
+        policies = [(
+            default.get('grace_days', 0), default.get('slabs', []), default.get('max_fee'),
+        )]
+        self.rows = {}
+        for policy in LateFeePolicy.objects.filter(hostel_id__in=hostel_ids):
+            self.rows[policy.hostel_id] = len(policies)
+            policies.append((policy.grace_days, policy.slabs, policy.max_fee))
+
+        width = max(1, max(len(slabs) for _, slabs, _ in policies))
+        count = len(policies)
+        self.grace = np.zeros(count, dtype=np.int64)
+        self.cap = np.full(count, NO_CAP, dtype=np.int64)
+        # Unused slab positions never match: their threshold is past any overdue span.
+        self.after = np.full((count, width), NO_CAP, dtype=np.int64)
+        self.rate = np.zeros((count, width), dtype=np.int64)
+        self.flat = np.zeros((count, width), dtype=np.int64)
+        for row, (grace_days, slabs, max_fee) in enumerate(policies):
+            self.grace[row] = grace_days
+            if max_fee is not None:
+                self.cap[row] = _cents(max_fee)
+            for column, slab in enumerate(sorted(slabs, key=lambda slab: int(slab['after_days']))):
+                self.after[row, column] = int(slab['after_days'])
+                self.rate[row, column] = _cents(slab.get('percent', 0))
+                self.flat[row, column] = _cents(slab.get('flat', 0))
+
+    def row(self, hostel_id):
+        return self.rows.get(hostel_id, 0)
+
+
+def late_fees(amount_cents, due_days, policy_rows, policies, as_of_day):
+    """
+    Late fee in cents of every charge, given as columns: the charge in cents,
+    its due date as an ordinal day and its row in ``policies``. Returns the fees
+    and the days each charge is past due.
+    """
+    overdue = as_of_day - due_days
+    past_grace = overdue - policies.grace[policy_rows]
+    # Index of the highest slab reached; -1 when the charge is still within grace.
+    slab = (policies.after[policy_rows] < past_grace[:, None]).sum(axis=1) - 1
+    reached = slab >= 0
+    slab = np.maximum(slab, 0)
+    rate = np.take_along_axis(policies.rate[policy_rows], slab[:, None], axis=1)[:, 0]
+    flat = np.take_along_axis(policies.flat[policy_rows], slab[:, None], axis=1)[:, 0]
+    # Rates are basis points of the charge; rounded half up to the cent.
+    fees = (amount_cents * rate + 5000) // 10000 + flat
+    fees = np.minimum(fees, policies.cap[policy_rows])
+    return np.where(reached, fees, 0), overdue
+
+
+def overdue_charges(period, as_of, institute=None, hostel=None):
+    """Payable charges of ``period`` past due on ``as_of`` that have no late fee yet."""
+    charges = Payment.objects.filter(
+        billing_period=period,
+        status__in=Payment.PAYABLE_STATUSES,
+        due_date__lt=as_of,
+        penalty__isnull=True,
+    )
+    if institute is not None:
+        charges = charges.filter(student__institute=institute)
+    if hostel is not None:
+        charges = charges.filter(room_allocation__room__hostel=hostel)
+    return charges.order_by('id').values_list(
+        'id', 'student_id', 'room_allocation_id', 'room_allocation__room__hostel_id', 'amount', 'due_date'
+    )
+
+
+def run_late_fees(period, as_of, institute=None, hostel=None, dry_run=False):
+    """
+    Levies late fees on the charges of billing ``period`` still unpaid on
+    ``as_of``, under the slab policy of each charge's hostel.
+
+    Charges are read in chunks of PENALTY_BATCH_SIZE and turned into columns
+    (amount, due date, policy row); the fees of a whole chunk are computed with
+    array operations in integer cents and written as ``Payment(payment_type='other')``
+    rows with ``bulk_create``. Each fee points at its charge through
+    ``penalty_for``, so a charge is penalised at most once and reruns only
+    pick up charges that became overdue since. ``dry_run`` computes the totals
+    without writing anything.
+    """
+    period = billing_period(period)
+    as_of_day = as_of.toordinal()
+    summary = {'period': period, 'as_of': as_of, 'dry_run': dry_run,
+               'overdue': 0, 'penalised': 0, 'total_amount': Decimal('0.00')}
+
+    with transaction.atomic():
+        rows = overdue_charges(period, as_of, institute, hostel).iterator(chunk_size=PENALTY_BATCH_SIZE)
+        while True:
+            chunk = list(islice(rows, PENALTY_BATCH_SIZE))
+            if not chunk:
+                break
+            ids, student_ids, allocation_ids, hostel_ids, amounts, due_dates = zip(*chunk)
+            policies = PolicyTable(set(hostel_ids))
+            fees, overdue = late_fees(
+                np.fromiter((_cents(amount) for amount in amounts), dtype=np.int64, count=len(chunk)),
+                np.fromiter((day.toordinal() for day in due_dates), dtype=np.int64, count=len(chunk)),
+                np.fromiter((policies.row(hostel_id) for hostel_id in hostel_ids), dtype=np.int64, count=len(chunk)),
+                policies,
+                as_of_day,
+            )
+            charged = np.flatnonzero(fees > 0)
+            summary['overdue'] += len(chunk)
+            summary['penalised'] += len(charged)
+            summary['total_amount'] += Decimal(int(fees[charged].sum())) * CENTS
+            if dry_run or not len(charged):
+                continue
+
+            penalties = [
+                Payment(
+                    penalty_for_id=ids[i],
+                    student_id=student_ids[i],
+                    room_allocation_id=allocation_ids[i],
+                    payment_type='other',
+                    amount=Decimal(int(fees[i])) * CENTS,
+                    due_date=as_of,
+                    notes=f"Late fee on payment #{ids[i]} ({int(overdue[i])} days overdue)",
+                )
+                for i in charged
+            ]
+            Payment.objects.bulk_create(penalties, batch_size=PENALTY_BATCH_SIZE)
+            # bulk_create skips the Payment signals, so the ledgers are posted here.
+            ledgers = LedgerChanges()
+            for penalty in penalties:
+                ledgers.post_payment(penalty)
+            ledgers.save()
+
+    return summary
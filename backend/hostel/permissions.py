@@ -1,52 +1,52 @@
 from rest_framework.permissions import BasePermission
-from hostel.models import Hostel
 from rest_framework.permissions import IsAuthenticated
 
+from hostel.principal import get_principal
+
 class IsDirectorOrManagerOfHostel(BasePermission):
     """
     Only allow Directors or Managers of the specific hostel to modify room data.
     """
     def has_permission(self, request, view):
-        user = request.user
-        return hasattr(user, 'director') or hasattr(user, 'hostelmanager')
+        principal = get_principal(request)
+        return principal.is_director or principal.is_manager
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
+        principal = get_principal(request)
 
-        if hasattr(user, 'director'):
-            return obj.hostel.director == user.director
-        if hasattr(user, 'hostelmanager'):
-            return obj.hostel.manager == user.hostelmanager
+        if principal.is_director:
+            return obj.hostel.director_id == principal.director_id
+        if principal.is_manager:
+            return obj.hostel.manager_id == principal.manager_id
         return False
 
 
 class IsDirector(BasePermission):
     def has_permission(self, request, view):
-        return hasattr(request.user, 'director')
+        return get_principal(request).is_director
 
 
 class IsStudent(IsAuthenticated):
     """
     Allows access only to authenticated students.
-    Assumes a 'student_profile' OneToOneField on the User model.
     """
     def has_permission(self, request, view):
-        return super().has_permission(request, view) and hasattr(request.user, 'student_profile')
+        return super().has_permission(request, view) and get_principal(request).is_student
 
 class IsDirectorOrAdmin(IsAuthenticated):
     """
     Allows access only to authenticated Directors or staff/superusers.
-    Assumes a 'director_profile' OneToOneField on the User model.
     """
     def has_permission(self, request, view):
         return super().has_permission(request, view) and \
-               (request.user.is_staff or request.user.is_superuser or hasattr(request.user, 'director_profile'))
+               (request.user.is_staff or request.user.is_superuser or get_principal(request).is_director)
 
 class IsOwnerOrDirectorOrAdmin(IsAuthenticated):
     """
     Allows object access to the owner of the application, or to Directors/Admins.
     """
     def has_object_permission(self, request, view, obj):
-        if request.user.is_staff or request.user.is_superuser or hasattr(request.user, 'director_profile'):
+        principal = get_principal(request)
+        if request.user.is_staff or request.user.is_superuser or principal.is_director:
             return True
-        return obj.student.user == request.user
+        return principal.is_student and obj.student_id == principal.student_id
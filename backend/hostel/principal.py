@@ -0,0 +1,104 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from account.tokens import PROFILE_FIELDS, user_profile
+
+
+class Principal:
+    """
+    Who a request acts for: the user, whether they are a superuser, the id of
+    their role profile (a user is at most one of director, hostel manager or
+    student), its institute and, for a manager, the hostel they run. Only ids
+    are kept, so scoping a queryset or checking a hostel never needs the
+    profile rows themselves.
+    """
+    def __init__(self, user, director_id=None, manager_id=None, student_id=None, institute_id=None, hostel_id=None):
+        self.user = user
+        self.is_superuser = bool(user.is_authenticated and user.is_superuser)
+        self.director_id = director_id
+        self.manager_id = manager_id
+        self.student_id = student_id
+        self.institute_id = institute_id
+        self.hostel_id = hostel_id
+
+    @property
+    def is_director(self):
+        return self.director_id is not None
+
+    @property
+    def is_manager(self):
+        return self.manager_id is not None
+
+    @property
+    def is_student(self):
+        return self.student_id is not None
+
+    def manages(self, hostel):
+        """Whether ``hostel`` is run by this principal, as a superuser, its director or its manager."""
+        return self.is_superuser or (
+            (self.is_director and hostel.director_id == self.director_id)
+            or (self.is_manager and hostel.manager_id == self.manager_id)
+        )
+
+    def scope(self, queryset, institute=None, hostel=None, student=None):
+        """
+        ``queryset`` narrowed to what this principal may see. ``institute``,
+        ``hostel`` and ``student`` are the lookup paths from the queryset's model
+        to the institute id, hostel id and student id its rows belong to.
+        Superusers see everything; directors see their institute; managers see
+        their hostel, or their institute when no ``hostel`` path is given;
+        students see their own rows. A role without a path sees nothing.
+        """
+        if self.is_superuser:
+            return queryset
+        if self.is_director and institute:
+            return queryset.filter(**{institute: self.institute_id})
+        if self.is_manager and hostel:
+            return queryset.filter(**{hostel: self.hostel_id}) if self.hostel_id else queryset.none()
+        if self.is_manager and institute:
+            return queryset.filter(**{institute: self.institute_id})
+        if self.is_student and student:
+            return queryset.filter(**{student: self.student_id})
+        return queryset.none()
+
+
+def get_principal(request):
+    """
+    The Principal of ``request``, resolved on first use and kept on the request.
+    Reads authenticated by a token carrying the principal claims (see
+    ``account.tokens``) are resolved from the token, whose claims were read
+    when it was issued or last refreshed; other authenticated users cost one
+    query, joining their profiles and managed hostel.
+    """
+    principal = getattr(request, '_principal', None)
+    if principal is None:
+        principal = request._principal = _resolve(request)
+    return principal
+
+
+def _resolve(request):
+    user = request.user
+    # Superusers pass every check and see everything, so their profiles are not needed.
+    if not user.is_authenticated or user.is_superuser:
+        return Principal(user)
+    token = request.auth
+    if request.method in SAFE_METHODS and hasattr(token, 'payload') and all(
+        claim in token for claim in PROFILE_FIELDS
+    ):
+        return Principal(user, **{claim: token[claim] for claim in PROFILE_FIELDS})
+    return Principal(user, **user_profile(user.pk))
+
+
+class PrincipalScopedMixin:
+    """
+    For generic views: ``get_queryset`` returns ``queryset`` scoped to the
+    request's principal through the lookup paths in ``principal_scope``
+    (see ``Principal.scope``).
+    """
+    principal_scope = {}
+
+    @property
+    def principal(self):
+        return get_principal(self.request)
+
+    def get_queryset(self):
+        return self.principal.scope(super().get_queryset(), **self.principal_scope)
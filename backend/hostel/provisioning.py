@@ -0,0 +1,133 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from hostel.models import Hostel, Room
+
+PROVISION_BATCH_SIZE = 2000
+MAX_PROVISION_ROOMS = 20000
+CSV_COLUMNS = ('room_number', 'room_type', 'capacity', 'rent_per_bed')
+
+
+class ProvisioningError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def rooms_from_block(floors, rooms_per_floor, room_type, capacity, rent_per_bed, start_floor=1, prefix=''):
+    """
+    Expands a floors x rooms-per-floor block into room rows. Room numbers are
+    ``<prefix><floor><nn>``, e.g. floor 3 room 7 of a 40-room floor is ``307``.
+    """
+    width = max(2, len(str(rooms_per_floor)))
+    return [
+        {
+            'room_number': f"{prefix}{floor}{number:0{width}d}",
+            'room_type': room_type,
+            'capacity': capacity,
+            'rent_per_bed': rent_per_bed,
+        }
+        for floor in range(start_floor, start_floor + floors)
+        for number in range(1, rooms_per_floor + 1)
+    ]
+
+
+def rooms_from_csv(lines):
+    """
+    Parses CSV lines with a ``room_number,room_type,capacity,rent_per_bed`` header
+    into room rows. Raises ProvisioningError listing every invalid line.
+    """
+    reader = csv.DictReader(lines)
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ProvisioningError({'file': f"Missing CSV columns: {', '.join(missing)}."})
+
+    room_types = dict(Room.ROOM_TYPES)
+    rows, errors = [], {}
+    for line_number, record in enumerate(reader, start=2):
+        room_number = (record['room_number'] or '').strip()
+        room_type = (record['room_type'] or '').strip()
+        try:
+            capacity = int(record['capacity'])
+            rent_per_bed = Decimal(record['rent_per_bed'])
+        except (TypeError, ValueError, InvalidOperation):
+            errors[line_number] = "Capacity and rent_per_bed must be numbers."
+            continue
+        if not room_number:
+            errors[line_number] = "Room number cannot be empty."
+        elif room_type not in room_types:
+            errors[line_number] = f"Invalid room type '{room_type}'."
+        elif capacity <= 0:
+            errors[line_number] = "Capacity must be a positive integer."
+        elif rent_per_bed < 0:
+            errors[line_number] = "Rent per bed cannot be negative."
+        else:
+            rows.append({
+                'room_number': room_number,
+                'room_type': room_type,
+                'capacity': capacity,
+                'rent_per_bed': rent_per_bed,
+            })
+    if errors:
+        raise ProvisioningError({'file': errors})
+    return rows
+
+
+def provision_rooms(hostel, rows):
+    """
+    Creates all ``rows`` as rooms of ``hostel`` in one transaction.
+
+    Room numbers are checked case-insensitively against each other and against
+    the hostel's existing rooms with a single query, rooms are inserted with
+    ``bulk_create`` and the hostel's room counters are bumped once at the end.
+    """
+    if not rows:
+        raise ProvisioningError({'rooms': "No rooms to provision."})
+    if len(rows) > MAX_PROVISION_ROOMS:
+        raise ProvisioningError({'rooms': f"Cannot provision more than {MAX_PROVISION_ROOMS} rooms per request."})
+
+    try:
+        with transaction.atomic():
+            _check_room_numbers(hostel, rows)
+            # bulk_create skips the Room signals, so the hostel counters are bumped once below.
+            Room.objects.bulk_create(
+                [Room(hostel=hostel, current_occupancy=0, is_available=True, **row) for row in rows],
+                batch_size=PROVISION_BATCH_SIZE,
+            )
+            Hostel.objects.filter(pk=hostel.pk).update(
+                total_rooms=F('total_rooms') + len(rows),
+                available_rooms=F('available_rooms') + len(rows),
+                updated_at=timezone.now(),
+            )
+    except IntegrityError as exc:
+        # Rooms added by a concurrent request after the check; report them like the check does.
+        _check_room_numbers(hostel, rows)
+        raise ProvisioningError({'rooms': "The rooms conflict with data saved meanwhile; please try again."}) from exc
+
+    return {'hostel': hostel.pk, 'created': len(rows)}
+
+
+def _check_room_numbers(hostel, rows):
+    """
+    Raises ProvisioningError when room numbers of ``rows`` repeat, or exist in
+    ``hostel`` already, compared case-insensitively with a single query.
+    """
+    taken = {
+        number.lower()
+        for number in Room.objects.filter(hostel=hostel).values_list('room_number', flat=True)
+    }
+    duplicates = []
+    for row in rows:
+        key = row['room_number'].lower()
+        if key in taken:
+            duplicates.append(row['room_number'])
+        taken.add(key)
+    if duplicates:
+        raise ProvisioningError({
+            'room_number': f"{len(duplicates)} room numbers are repeated or already exist in {hostel.name}: "
+                           f"{', '.join(duplicates[:20])}{'...' if len(duplicates) > 20 else ''}"
+        })
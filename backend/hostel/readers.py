@@ -0,0 +1,359 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from django.utils import timezone
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from hostel.models import (
+    ApplicationStatus, Hostel, HostelApplication, HostelImage, Room, Student
+)
+
+
+# Renderers that match the DRF fields the serializers use, for non-null values.
+
+def datetime_renderer():
+    """DateTimeField output in the current time zone, which is looked up once rather than per value."""
+    output_format = api_settings.DATETIME_FORMAT
+    current = timezone.get_current_timezone()
+
+    def render(value):
+        if output_format is None or isinstance(value, str):
+            return value
+        value = value.astimezone(current) if value.utcoffset() is not None else value
+        if output_format.lower() != ISO_8601:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return render
+
+
+def render_date(value):
+    output_format = api_settings.DATE_FORMAT
+    if output_format is None or isinstance(value, str):
+        return value
+    return value.isoformat() if output_format.lower() == ISO_8601 else value.strftime(output_format)
+
+
+def render_decimal(value):
+    # The model decimals are read back already quantized to their decimal places.
+    return f'{value:f}' if api_settings.COERCE_DECIMAL_TO_STRING else float(value)
+
+
+def render_choice(choices):
+    labels = {key: str(label) for key, label in choices}
+    return lambda value: labels.get(value, value)
+
+
+class Column:
+    """One ``.values()`` column, passed through ``render`` unless it is null."""
+    def __init__(self, path, render=None):
+        self.path = path
+        self.render = render
+
+    def bind(self, reader, prefix):
+        column = prefix + self.path
+        render = self.render
+        if render is None:
+            return (column,), itemgetter(column)
+
+        def get(row):
+            value = row[column]
+            return None if value is None else render(value)
+        return (column,), get
+
+
+class DateTimeColumn(Column):
+    """A DateTimeField column, rendered in the time zone current when the reader is built."""
+    def bind(self, reader, prefix):
+        return Column(self.path, datetime_renderer()).bind(reader, prefix)
+
+
+class Computed:
+    """A value computed from several columns, e.g. a model property."""
+    def __init__(self, paths, compute):
+        self.paths = paths
+        self.compute = compute
+
+    def bind(self, reader, prefix):
+        columns = tuple(prefix + path for path in self.paths)
+        compute = self.compute
+        return columns, lambda row: compute(*[row[column] for column in columns])
+
+
+class Nested:
+    """A to-one relation rendered by another reader, from the same row."""
+    def __init__(self, reader_class, path):
+        self.reader_class = reader_class
+        self.path = path
+
+    def bind(self, reader, prefix):
+        child = self.reader_class(reader.context, prefix + self.path)
+        present = f'{prefix}{self.path}id'
+        row = child.row
+        return child.columns, lambda values: None if values[present] is None else row(values)
+
+
+class FileColumn(Column):
+    """A file field column rendered as its URL, absolute when the context has a request."""
+    def bind(self, reader, prefix):
+        storage = reader.model._meta.get_field(self.path).storage
+        request = reader.context.get('request')
+
+        def render(name):
+            if not api_settings.UPLOADED_FILES_USE_URL:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        column = prefix + self.path
+        return (column,), lambda row: render(row[column]) if row[column] else None
+
+
+class Many:
+    """
+    A to-many relation rendered by another reader. The related rows of a whole
+    page are read with one query, like ``prefetch_related``.
+    """
+    def __init__(self, reader_class, foreign_key):
+        self.reader_class = reader_class
+        self.foreign_key = foreign_key
+
+    def bind(self, reader, prefix):
+        child = self.reader_class(reader.context)
+        owner_column = child.model._meta.get_field(self.foreign_key).attname
+        column = prefix + 'id'
+        related = {}
+
+        def prepare(rows):
+            related.clear()
+            queryset = child.model._default_manager.filter(
+                **{f'{owner_column}__in': {row[column] for row in rows}}
+            )
+            grouped = defaultdict(list)
+            for values in child.values(queryset, owner_column):
+                grouped[values[owner_column]].append(values)
+            related.update((owner, child.rows(values)) for owner, values in grouped.items())
+
+        reader.preparers.append(prepare)
+        return (column,), lambda row: related.get(row[column], [])
+
+
+class Reader:
+    """
+    Builds the same representation as a ModelSerializer straight from
+    ``.values()`` rows, skipping model instances and the per-field machinery.
+    ``fields`` lists (key, spec) pairs in the serializer's field order, so the
+    rendered JSON is byte-for-byte the same. ``keys`` limits the reader, and the
+    columns it reads, to some of the fields.
+    """
+    model = None
+    fields = ()
+
+    def __init__(self, context=None, prefix='', keys=None):
+        self.context = context or {}
+        self.preparers = []
+        columns, self.getters = {}, []
+        for key, spec in self.fields:
+            if keys is not None and key not in keys:
+                continue
+            spec_columns, getter = spec.bind(self, prefix)
+            columns.update(dict.fromkeys(spec_columns))
+            self.getters.append((key, getter))
+        self.columns = tuple(columns)
+
+    @property
+    def keys(self):
+        return [key for key, _ in self.getters]
+
+    def values(self, queryset, *extra):
+        """``queryset`` as dict rows carrying every column this reader needs, plus ``extra``."""
+        queryset = queryset.prefetch_related(None)
+        return queryset.values(*dict.fromkeys(self.columns + extra))
+
+    def row(self, values):
+        return {key: get(values) for key, get in self.getters}
+
+    def rows(self, rows):
+        rows = list(rows)
+        for prepare in self.preparers:
+            prepare(rows)
+        return [self.row(values) for values in rows]
+
+
+def _director_info(director_id, email, institute_name):
+    # Director.__str__; User.get_full_name() is the email.
+    return None if director_id is None else f"{email} ({institute_name})"
+
+
+def _occupancy_rate(total_rooms, available_rooms):
+    # Hostel.occupancy_rate
+    if total_rooms == 0:
+        return 0.0
+    return round((max(0, total_rooms - available_rooms) / total_rooms) * 100, 2)
+
+
+class StudentReader(Reader):
+    """StudentProfileSerializer"""
+    model = Student
+    fields = (
+        ('id', Column('id')),
+        ('user', Column('user_id')),
+        ('user_email', Column('user__email')),
+        # Student.full_name is User.get_full_name(), which is the email.
+        ('full_name', Column('user__email')),
+        ('institute', Column('institute_id')),
+        ('institute_name', Column('institute__name')),
+        ('course', Column('course_id')),
+        ('course_name', Column('course__name')),
+        ('branch', Column('branch_id')),
+        ('branch_name', Column('branch__name')),
+        ('enroll_number', Column('enroll_number')),
+        ('registration_number', Column('registration_number')),
+        ('date_of_birth', Column('date_of_birth', render_date)),
+        ('gender', Column('gender')),
+        ('phone_number', Column('phone_number', str)),
+        ('year_of_study', Column('year_of_study')),
+        ('admission_year', Column('admission_year')),
+        ('admission_date', Column('admission_date', render_date)),
+        ('leaving_date', Column('leaving_date', render_date)),
+        ('is_active_student', Column('is_active_student')),
+        ('is_currently_hosteller', Column('is_currently_hosteller')),
+        ('emergency_contact_name', Column('emergency_contact_name')),
+        ('emergency_contact_phone', Column('emergency_contact_phone', str)),
+        ('address_line1', Column('address_line1')),
+        ('address_line2', Column('address_line2')),
+        ('city', Column('city')),
+        ('state', Column('state')),
+        ('pincode', Column('pincode')),
+        ('created_at', DateTimeColumn('created_at')),
+        ('updated_at', DateTimeColumn('updated_at')),
+    )
+
+
+class HostelApplicationReader(Reader):
+    """HostelApplicationSerializer"""
+    model = HostelApplication
+    fields = (
+        ('id', Column('id')),
+        ('student', Column('student_id')),
+        ('student_info', Nested(StudentReader, 'student__')),
+        ('institute', Column('institute_id')),
+        ('institute_name', Column('institute__name')),
+        ('course_at_application', Column('course_at_application_id')),
+        ('branch_at_application', Column('branch_at_application_id')),
+        ('preferred_hostel', Column('preferred_hostel_id')),
+        ('preferred_hostel_name', Column('preferred_hostel__name')),
+        ('preferred_room_type', Column('preferred_room_type')),
+        ('reason_for_hostel', Column('reason_for_hostel')),
+        ('status', Column('status')),
+        ('status_display', Column('status', render_choice(ApplicationStatus.choices))),
+        ('reviewed_by', Column('reviewed_by_id')),
+        ('reviewed_by_email', Column('reviewed_by__email')),
+        ('remarks_by_reviewer', Column('remarks_by_reviewer')),
+        ('submitted_at', DateTimeColumn('submitted_at')),
+        ('reviewed_at', DateTimeColumn('reviewed_at')),
+        ('created_at', DateTimeColumn('created_at')),
+        ('updated_at', DateTimeColumn('updated_at')),
+    )
+
+
+class RoomReader(Reader):
+    """RoomSerializer"""
+    model = Room
+    fields = (
+        ('id', Column('id')),
+        ('hostel', Column('hostel_id')),
+        ('hostel_name', Column('hostel__name')),
+        ('room_number', Column('room_number')),
+        ('room_type', Column('room_type')),
+        ('room_type_display', Column('room_type', render_choice(Room.ROOM_TYPES))),
+        ('capacity', Column('capacity')),
+        ('current_occupancy', Column('current_occupancy')),
+        ('rent_per_bed', Column('rent_per_bed', render_decimal)),
+        ('is_available', Column('is_available')),
+        ('available_beds', Computed(('capacity', 'current_occupancy'), lambda capacity, occupancy: max(0, capacity - occupancy))),
+        ('created_at', DateTimeColumn('created_at')),
+        ('updated_at', DateTimeColumn('updated_at')),
+    )
+
+
+class HostelImageReader(Reader):
+    """HostelImageSerializer"""
+    model = HostelImage
+    fields = (
+        ('id', Column('id')),
+        ('hostel', Column('hostel_id')),
+        ('image', FileColumn('image')),
+        ('caption', Column('caption')),
+        ('is_primary', Column('is_primary')),
+        ('created_at', DateTimeColumn('created_at')),
+    )
+
+
+class HostelReader(Reader):
+    """HostelSerializer"""
+    model = Hostel
+    fields = (
+        ('id', Column('id')),
+        ('name', Column('name')),
+        ('institute', Column('institute_id')),
+        ('institute_name', Column('institute__name')),
+        ('director', Column('director_id')),
+        ('director_info', Computed(('director_id', 'director__user__email', 'director__institute__name'), _director_info)),
+        ('manager', Column('manager_id')),
+        ('manager_info', Column('manager__user__email')),
+        ('images', Many(HostelImageReader, 'hostel')),
+        ('address_line1', Column('address_line1')),
+        ('address_line2', Column('address_line2')),
+        ('city', Column('city')),
+        ('state', Column('state')),
+        ('pincode', Column('pincode')),
+        ('hostel_type', Column('hostel_type')),
+        ('hostel_type_display', Column('hostel_type', render_choice(Hostel.HOSTEL_TYPES))),
+        ('total_rooms', Column('total_rooms')),
+        ('available_rooms', Column('available_rooms')),
+        ('rent_per_month', Column('rent_per_month', render_decimal)),
+        ('security_deposit', Column('security_deposit', render_decimal)),
+        ('contact_email', Column('contact_email')),
+        ('contact_number', Column('contact_number', str)),
+        ('facilities', Column('facilities')),
+        ('wifi', Column('wifi')),
+        ('laundry', Column('laundry')),
+        ('mess', Column('mess')),
+        ('gym', Column('gym')),
+        ('parking', Column('parking')),
+        ('ac_rooms_available', Column('ac_rooms_available')),
+        ('occupancy_rate', Computed(('total_rooms', 'available_rooms'), _occupancy_rate)),
+        ('is_active', Column('is_active')),
+        ('created_at', DateTimeColumn('created_at')),
+        ('updated_at', DateTimeColumn('updated_at')),
+    )
+
+
+class ReaderListMixin:
+    """
+    Serves a generic view's list action through ``list_reader`` instead of its
+    serializer. The output is the same, including sparse fieldsets when the view
+    has ``SparseFieldsMixin``; ``?layout=columns`` returns the page as
+    ``{"columns": [...], "rows": [[...], ...]}`` instead, for bulk consumers.
+    """
+    list_reader = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_reader is None:
+            return super().list(request, *args, **kwargs)
+        keys = self.get_requested_fields() if hasattr(self, 'get_requested_fields') else None
+        reader = self.list_reader(self.get_serializer_context(), keys=keys)
+        ordering = tuple(field.lstrip('-') for field in getattr(self, 'ordering', None) or ())
+        rows = reader.values(self.filter_queryset(self.get_queryset()), *ordering, 'id')
+
+        page = self.paginate_queryset(rows)
+        data = reader.rows(page if page is not None else rows)
+        if request.query_params.get('layout') == 'columns':
+            keys = reader.keys
+            data = {'columns': keys, 'rows': [[row[key] for key in keys] for row in data]}
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
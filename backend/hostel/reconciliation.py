@@ -0,0 +1,199 @@
+import csv
+from collections import defaultdict, deque
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from hostel.ledger import LedgerChanges
+from hostel.models import Payment
+
+RECONCILE_BATCH_SIZE = 2000
+# Exception lines returned by the reconcile endpoint; the rest are only counted.
+RECONCILE_EXCEPTION_LIMIT = 100
+DEFAULT_PAYMENT_METHOD = 'bank_transfer'
+STATEMENT_COLUMNS = ('transaction_id', 'amount', 'paid_at', 'enroll_number', 'payment_method')
+EXCEPTION_COLUMNS = ('line', 'transaction_id', 'amount', 'paid_at', 'enroll_number', 'reason')
+
+
+class StatementError(Exception):
+    pass
+
+
+def _parse_paid_at(value, default):
+    if not value:
+        return default
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_lines(reader, start_line, now):
+    """Yields (line, error) for each statement line; ``error`` is None for a readable line."""
+    for line_number, record in enumerate(reader, start=start_line):
+        line = {column: (record.get(column) or '').strip() for column in STATEMENT_COLUMNS}
+        line['line'] = line_number
+        try:
+            line['amount'] = Decimal(line['amount']).quantize(Decimal('0.01'))
+            line['paid_at'] = _parse_paid_at(line['paid_at'], now)
+        except (InvalidOperation, ValueError):
+            yield line, "Unreadable amount or paid_at."
+            continue
+        if not (line['transaction_id'] or line['enroll_number']):
+            yield line, "Line has neither a transaction_id nor an enroll_number."
+            continue
+        yield line, None
+
+
+def reconcile_statement(lines, report, institute=None, payment_method=DEFAULT_PAYMENT_METHOD):
+    """
+    Matches a bank or gateway statement to payable (pending or failed) Payments
+    and marks the matches paid.
+
+    ``lines`` is any iterable of CSV text lines with a header naming at least
+    ``amount`` and one of ``transaction_id`` / ``enroll_number``; ``paid_at``
+    and ``payment_method`` are optional. The statement is streamed in batches of
+    RECONCILE_BATCH_SIZE lines, each batch in its own transaction:
+
+    * lines are matched on the unique ``transaction_id`` index with one query;
+    * the rest fall back to the student's oldest payable charge with the same
+      amount and no transaction id, looked up with one query per batch;
+    * matches are written with one prepared UPDATE and posted to the ledgers.
+
+    A transaction id repeated within a batch is reported as a duplicate; one
+    repeated in a later batch finds its payment already paid through the
+    unique index, so memory stays bounded by the batch size however long the
+    statement is. Every line that is not matched is passed to ``report`` (e.g.
+    a ``csv.DictWriter.writerow``) with a ``reason``. Returns a summary.
+    """
+    reader = csv.DictReader(lines)
+    columns = set(reader.fieldnames or [])
+    if 'amount' not in columns or not columns & {'transaction_id', 'enroll_number'}:
+        raise StatementError("The statement needs an amount column and a transaction_id or enroll_number column.")
+
+    summary = {'lines': 0, 'matched': 0, 'matched_by_transaction': 0, 'matched_by_student': 0,
+               'exceptions': 0, 'amount_matched': Decimal('0.00')}
+
+    def exception(line, reason):
+        summary['exceptions'] += 1
+        report({**{column: line.get(column, '') for column in EXCEPTION_COLUMNS}, 'reason': reason})
+
+    parsed = _parse_lines(reader, 2, timezone.now())
+    while True:
+        batch = list(islice(parsed, RECONCILE_BATCH_SIZE))
+        if not batch:
+            break
+        summary['lines'] += len(batch)
+        lines_ok, seen_transactions = [], set()
+        for line, error in batch:
+            if error:
+                exception(line, error)
+            elif line['transaction_id'] and line['transaction_id'] in seen_transactions:
+                exception(line, "Transaction appears more than once in the statement.")
+            else:
+                if line['transaction_id']:
+                    seen_transactions.add(line['transaction_id'])
+                lines_ok.append(line)
+        with transaction.atomic():
+            _reconcile_batch(lines_ok, institute, payment_method, summary, exception)
+
+    return summary
+
+
+def _reconcile_batch(lines, institute, payment_method, summary, exception):
+    payments = Payment.objects.select_for_update(of=('self',))
+    fields = ('id', 'transaction_id', 'student_id', 'room_allocation_id', 'status', 'amount')
+
+    by_transaction = {
+        row['transaction_id']: row
+        for row in payments.filter(
+            transaction_id__in=[line['transaction_id'] for line in lines if line['transaction_id']]
+        ).values(*fields, 'student__institute_id')
+    }
+
+    matches, leftovers = [], []
+    for line in lines:
+        payment = by_transaction.get(line['transaction_id']) if line['transaction_id'] else None
+        if payment is None:
+            leftovers.append(line)
+        elif institute is not None and payment['student__institute_id'] != getattr(institute, 'pk', institute):
+            exception(line, "Payment belongs to another institute.")
+        elif payment['status'] not in Payment.PAYABLE_STATUSES:
+            exception(line, f"Payment is already {payment['status']}.")
+        elif payment['amount'] != line['amount']:
+            exception(line, f"Amount differs from the payment's {payment['amount']}.")
+        else:
+            matches.append((payment, line))
+            summary['matched_by_transaction'] += 1
+
+    # Fallback: the student's oldest payable charge of the same amount.
+    candidates = defaultdict(deque)
+    enroll_numbers = {line['enroll_number'] for line in leftovers if line['enroll_number']}
+    if institute is not None:
+        payments = payments.filter(student__institute=institute)
+    if enroll_numbers:
+        for row in payments.filter(
+            student__enroll_number__in=enroll_numbers, status__in=Payment.PAYABLE_STATUSES, transaction_id__isnull=True
+        ).order_by('due_date', 'id').values(*fields, 'student__enroll_number'):
+            candidates[(row['student__enroll_number'], row['amount'])].append(row)
+    for line in leftovers:
+        queue = candidates.get((line['enroll_number'], line['amount']))
+        if queue:
+            matches.append((queue.popleft(), line))
+            summary['matched_by_student'] += 1
+        else:
+            exception(line, "No payable charge matches this line.")
+
+    updated = []
+    ledgers = LedgerChanges()
+    for payment, line in matches:
+        updated.append((
+            payment['id'],
+            line['paid_at'],
+            line['payment_method'] or payment_method,
+            payment['transaction_id'] or line['transaction_id'] or None,
+        ))
+        ledgers.reverse(payment['student_id'], payment['room_allocation_id'], payment['status'], payment['amount'])
+        ledgers.post(payment['student_id'], payment['room_allocation_id'], 'paid', payment['amount'])
+        summary['amount_matched'] += payment['amount']
+    _mark_paid(updated)
+    # The raw update skips the Payment signals, so the ledgers are posted explicitly.
+    ledgers.save()
+    summary['matched'] += len(updated)
+
+
+def _mark_paid(rows):
+    """
+    Marks (payment_id, paid_at, method, transaction_id) rows paid with a single
+    prepared UPDATE run through ``executemany``. Every row carries its own date
+    and transaction id, which bulk_update would turn into one large CASE
+    expression per column; a prepared statement keeps the per-row cost flat.
+    """
+    if not rows:
+        return
+    ops = connection.ops
+    meta = Payment._meta
+    columns = [
+        ops.quote_name(meta.get_field(name).column)
+        for name in ('status', 'payment_date', 'payment_method', 'transaction_id', 'updated_at')
+    ]
+    sql = (
+        f"UPDATE {ops.quote_name(meta.db_table)} SET {', '.join(f'{column} = %s' for column in columns)} "
+        f"WHERE {ops.quote_name(meta.pk.column)} = %s"
+    )
+    now = ops.adapt_datetimefield_value(timezone.now())
+    params = [
+        ('paid', ops.adapt_datetimefield_value(paid_at), method, transaction_id, now, payment_id)
+        for payment_id, paid_at, method, transaction_id in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
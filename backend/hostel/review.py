@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.utils import timezone
+
+from hostel.models import HostelApplication, ApplicationStatus
+from hostel import waitlist
+
+REVIEW_BATCH_SIZE = 500
+
+# Target statuses a reviewer may move an application to, keyed by its current status.
+REVIEW_TRANSITIONS = {
+    ApplicationStatus.PENDING: {ApplicationStatus.APPROVED, ApplicationStatus.REJECTED, ApplicationStatus.WAITLISTED},
+    ApplicationStatus.WAITLISTED: {ApplicationStatus.APPROVED, ApplicationStatus.REJECTED},
+}
+
+
+def bulk_review(applications, ids, status, reviewer, remarks=None):
+    """
+    Applies one review decision to many applications. ``applications`` is the
+    queryset the reviewer may act on; the rows are fetched once, transitions are
+    checked in memory and the accepted ones are written with ``bulk_update``.
+    The rows are locked while they are checked, and the status changes and
+    waitlist updates commit together or not at all. ``remarks`` replaces each
+    application's reviewer remarks; None leaves them as they are.
+
+    Returns a compact per-id result list and the number of updated rows.
+    """
+    with transaction.atomic():
+        rows = applications.filter(pk__in=ids).select_related(None).select_for_update().only(
+            'id', 'status', 'institute_id', 'preferred_hostel_id', 'preferred_room_type',
+            'submitted_at', 'student_id',
+        )
+        fetched = {application.pk: application for application in rows}
+
+        now = timezone.now()
+        fields = ['status', 'reviewed_by', 'reviewed_at', 'updated_at']
+        if remarks is not None:
+            fields.append('remarks_by_reviewer')
+        results, updated, left_waitlist = [], [], []
+        for application_id in dict.fromkeys(ids):
+            application = fetched.get(application_id)
+            if application is None:
+                results.append({'id': application_id, 'error': "Application not found."})
+                continue
+            if status not in REVIEW_TRANSITIONS.get(application.status, ()):
+                results.append({
+                    'id': application_id,
+                    'error': f"Cannot change status from '{application.status}' to '{status}'.",
+                })
+                continue
+            if application.status == ApplicationStatus.WAITLISTED:
+                left_waitlist.append(application.pk)
+            application.status = status
+            application.reviewed_by = reviewer
+            application.reviewed_at = now
+            if remarks is not None:
+                application.remarks_by_reviewer = remarks
+            application.updated_at = now
+            updated.append(application)
+            results.append({'id': application_id, 'status': status})
+
+        HostelApplication.objects.bulk_update(updated, fields, batch_size=REVIEW_BATCH_SIZE)
+        # bulk_update skips the waitlist signal, so keep the queues in step here.
+        if left_waitlist:
+            waitlist.dequeue_many(left_waitlist)
+        if status == ApplicationStatus.WAITLISTED and updated:
+            waitlist.enqueue_many(updated)
+
+    return {'updated': len(updated), 'results': results}
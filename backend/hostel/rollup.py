@@ -0,0 +1,139 @@
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from hostel.billing import period_end
+from hostel.ledger import CENTS, LEDGER_AGGREGATES, LEDGER_FIELDS
+from hostel.models import Payment, PaymentRollup, PaymentRollupDirtyMonth
+
+ROLLUP_BATCH_MONTHS = 12
+ROLLUP_CACHE_TIMEOUT = 15 * 60
+ROLLUP_CACHE_VERSION_KEY = 'hostel:rollup:version'
+# Payments saved just before a refresh may commit after it; re-reading this much
+# history on every run makes sure they are still picked up.
+ROLLUP_WATERMARK_LAG = timedelta(minutes=5)
+
+
+def rollup_month(day):
+    return day.replace(day=1)
+
+
+def mark_months_dirty(days):
+    """Queues the months of ``days`` for the next refresh."""
+    months = {rollup_month(day) for day in days if day is not None}
+    PaymentRollupDirtyMonth.objects.bulk_create(
+        [PaymentRollupDirtyMonth(month=month) for month in months], ignore_conflicts=True
+    )
+
+
+def refresh_payment_rollup(full=False):
+    """
+    Brings the payment rollup up to date. Only months with a payment updated
+    since the last refresh (read from the ``updated_at`` index) or queued by
+    ``mark_months_dirty`` are recomputed, ROLLUP_BATCH_MONTHS at a time with one
+    GROUP BY query each. ``full`` recomputes every month. The report cache is
+    invalidated when anything was recomputed.
+    """
+    with transaction.atomic():
+        since = None if full else PaymentRollup.objects.aggregate(Max('updated_at'))['updated_at__max']
+        payments = Payment.objects.all()
+        if since is not None:
+            payments = payments.filter(updated_at__gt=since - ROLLUP_WATERMARK_LAG)
+        dirty = list(PaymentRollupDirtyMonth.objects.values_list('id', 'month'))
+        months = sorted(set(payments.dates('due_date', 'month')) | {month for _, month in dirty})
+
+        if full:
+            PaymentRollup.objects.all().delete()
+        rows = 0
+        for start in range(0, len(months), ROLLUP_BATCH_MONTHS):
+            rows += _rollup_months(months[start:start + ROLLUP_BATCH_MONTHS])
+        PaymentRollupDirtyMonth.objects.filter(pk__in=[pk for pk, _ in dirty]).delete()
+
+    if months:
+        invalidate_rollup_cache()
+    return {'months': len(months), 'rows': rows}
+
+
+def _rollup_months(months):
+    """Replaces the rollup rows of ``months``. Charges without an allocation have no hostel and are left out."""
+    due_in_months = reduce(or_, (Q(due_date__gte=month, due_date__lte=period_end(month)) for month in months))
+    totals = (
+        Payment.objects.filter(due_in_months, room_allocation__isnull=False)
+        .annotate(month=TruncMonth('due_date'))
+        .order_by()
+        .values('room_allocation__room__hostel_id', 'month', 'payment_type')
+        .annotate(payments=Count('id'), **LEDGER_AGGREGATES)
+    )
+    PaymentRollup.objects.filter(month__in=months).delete()
+    return len(PaymentRollup.objects.bulk_create(
+        PaymentRollup(hostel_id=row.pop('room_allocation__room__hostel_id'), **row) for row in totals
+    ))
+
+
+def invalidate_rollup_cache():
+    """Moves the report cache to a new version; entries of older versions are never read again."""
+    try:
+        cache.incr(ROLLUP_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(ROLLUP_CACHE_VERSION_KEY, 1, None)
+
+
+def _sum(field, condition=None):
+    return Coalesce(Sum(field, filter=condition), Value(Decimal('0.00')))
+
+
+def payment_rollup_report(first_month, last_month, institute_id=None, hostel_id=None):
+    """
+    Billed, collected, waived, refunded and outstanding amounts and the security
+    deposits collected, refunded and still held, per hostel and month from
+    ``first_month`` to ``last_month``. A refund moves a deposit from paid to
+    refunded, so the deposits collected are both and those held are the
+    collected ones net of refunds. Read from the rollup table and cached until
+    the next refresh.
+    """
+    version = cache.get(ROLLUP_CACHE_VERSION_KEY, 0)
+    key = f"hostel:rollup:{version}:{first_month:%Y-%m}:{last_month:%Y-%m}:{institute_id}:{hostel_id}"
+    report = cache.get(key)
+    if report is not None:
+        return report
+
+    rollups = PaymentRollup.objects.filter(month__gte=rollup_month(first_month), month__lte=rollup_month(last_month))
+    if institute_id is not None:
+        rollups = rollups.filter(hostel__institute_id=institute_id)
+    if hostel_id is not None:
+        rollups = rollups.filter(hostel_id=hostel_id)
+    rows = (
+        rollups.order_by('hostel_id', 'month')
+        .values('hostel_id', 'hostel__name', 'month')
+        .annotate(
+            payments_count=Sum('payments'),
+            deposits_paid=_sum('paid', Q(payment_type='security_deposit')),
+            deposits_refunded=_sum('refunded', Q(payment_type='security_deposit')),
+            **{f'total_{field}': _sum(field) for field in LEDGER_FIELDS},
+        )
+    )
+    report = []
+    for row in rows:
+        entry = {
+            'hostel': row['hostel_id'],
+            'hostel_name': row['hostel__name'],
+            'month': row['month'],
+            'payments': row['payments_count'],
+            'billed': row['total_billed'].quantize(CENTS),
+            'collected': row['total_paid'].quantize(CENTS),
+            'waived': row['total_waived'].quantize(CENTS),
+            'refunded': row['total_refunded'].quantize(CENTS),
+            'deposits_refunded': row['deposits_refunded'].quantize(CENTS),
+        }
+        entry['deposits_collected'] = row['deposits_paid'].quantize(CENTS) + entry['deposits_refunded']
+        entry['deposits_held'] = entry['deposits_collected'] - entry['deposits_refunded']
+        entry['outstanding'] = entry['billed'] - entry['collected'] - entry['waived'] - entry['refunded']
+        report.append(entry)
+    cache.set(key, report, ROLLUP_CACHE_TIMEOUT)
+    return report
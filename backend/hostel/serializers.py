@@ -1,11 +1,22 @@
+import io
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from hostel.models import ( 
     Hostel, Room, HostelManager, HostelApplication, Student, HostelImage,
-    ApplicationStatus, RoomAllocation, Payment
+    ApplicationStatus, RoomAllocation, Payment, StudentLedger,
+    ACTIVE_APPLICATION_CONSTRAINT, OPEN_ALLOCATION_CONSTRAINT
 )
 from director.models import Institute, Course, Branch, Director
 from account.models import User, UserRole
+from hostel.allocation import reserve_bed
+from hostel.fieldsets import SparseFieldsSerializerMixin
+from hostel.integrity import violates_constraint
+from hostel.occupancy import RoomFullError
+from hostel.principal import get_principal
+from hostel.provisioning import rooms_from_block, rooms_from_csv
 
 
 class HostelImageSerializer(serializers.ModelSerializer):
@@ -14,7 +25,7 @@ class HostelImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'hostel', 'image', 'caption', 'is_primary', 'created_at']
         read_only_fields = ['id', 'created_at']
 
-class HostelSerializer(serializers.ModelSerializer):
+class HostelSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     institute_name = serializers.CharField(source='institute.name', read_only=True)
     director_info = serializers.StringRelatedField(source='director', read_only=True) 
     manager_info = serializers.StringRelatedField(source='manager.user.email', read_only=True, allow_null=True)
@@ -43,6 +54,13 @@ class HostelSerializer(serializers.ModelSerializer):
             'id', 'institute_name', 'director_info', 'manager_info', 'hostel_type_display',
             'occupancy_rate', 'images', 'created_at', 'updated_at'
         ]
+        expandable_fields = ['images', 'director_info']
+        # Columns read by the fields that are not plain sources; see hostel.fieldsets.
+        field_paths = {
+            'director_info': ['director__user__email', 'director__institute__name'],
+            'hostel_type_display': ['hostel_type'],
+            'occupancy_rate': ['total_rooms', 'available_rooms'],
+        }
 
     def validate_available_rooms(self, value):
         total_rooms_data = self.initial_data.get('total_rooms')
@@ -185,6 +203,12 @@ class RoomSerializer(serializers.ModelSerializer):
                 "capacity": "Capacity cannot be less than current occupancy."
             })
         
+        if instance is not None and 'is_available' not in attrs and capacity is not None:
+            # A capacity change closes a room it fills and reopens one that was only closed for being full.
+            if current_occupancy >= capacity:
+                attrs['is_available'] = False
+            elif not instance.is_available and instance.current_occupancy >= instance.capacity:
+                attrs['is_available'] = True
         is_available = attrs.get('is_available', getattr(instance, 'is_available', True))
         effective_capacity = capacity if capacity is not None else (instance.capacity if instance else 0)
         effective_occupancy = current_occupancy
@@ -196,6 +220,69 @@ class RoomSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class RoomBlockSerializer(serializers.Serializer):
+    floors = serializers.IntegerField(min_value=1)
+    rooms_per_floor = serializers.IntegerField(min_value=1)
+    room_type = serializers.ChoiceField(choices=Room.ROOM_TYPES)
+    capacity = serializers.IntegerField(min_value=1)
+    rent_per_bed = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0)
+    start_floor = serializers.IntegerField(min_value=0, default=1)
+    prefix = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+
+
+class RoomProvisionSerializer(serializers.Serializer):
+    blocks = RoomBlockSerializer(many=True, required=False)
+    file = serializers.FileField(required=False, help_text="CSV with room_number,room_type,capacity,rent_per_bed columns.")
+
+    def validate(self, attrs):
+        if not attrs.get('blocks') and not attrs.get('file'):
+            raise serializers.ValidationError("Provide floor-plan blocks or a CSV file.")
+        return attrs
+
+    def get_rows(self):
+        """Expands the validated blocks and CSV file into room rows."""
+        rows = []
+        for block in self.validated_data.get('blocks', []):
+            rows.extend(rooms_from_block(**block))
+        upload = self.validated_data.get('file')
+        if upload:
+            rows.extend(rooms_from_csv(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')))
+        return rows
+
+
+class VacancySearchSerializer(serializers.Serializer):
+    institute = serializers.IntegerField(required=False)
+    hostel = serializers.IntegerField(required=False)
+    room_type = serializers.ChoiceField(choices=Room.ROOM_TYPES, required=False)
+    min_rent = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
+    max_rent = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
+    min_beds = serializers.IntegerField(min_value=1, default=1)
+    wifi = serializers.BooleanField(required=False, allow_null=True, default=None)
+    laundry = serializers.BooleanField(required=False, allow_null=True, default=None)
+    mess = serializers.BooleanField(required=False, allow_null=True, default=None)
+    gym = serializers.BooleanField(required=False, allow_null=True, default=None)
+    parking = serializers.BooleanField(required=False, allow_null=True, default=None)
+    ac_rooms_available = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+    FACILITY_FIELDS = ('wifi', 'laundry', 'mess', 'gym', 'parking', 'ac_rooms_available')
+
+    def validate(self, attrs):
+        if attrs.get('min_rent') is not None and attrs.get('max_rent') is not None \
+                and attrs['min_rent'] > attrs['max_rent']:
+            raise serializers.ValidationError({"min_rent": "Minimum rent cannot exceed maximum rent."})
+        return attrs
+
+
+class RoomVacancySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    hostel = serializers.IntegerField(source='hostel_id')
+    hostel_name = serializers.CharField(source='hostel__name')
+    room_number = serializers.CharField()
+    room_type = serializers.CharField()
+    rent_per_bed = serializers.DecimalField(max_digits=8, decimal_places=2)
+    available_beds = serializers.IntegerField(source='free_beds')
+
+
 class HostelManagerSerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     hostel_name = serializers.CharField(source='managed_hostel.name', read_only=True, allow_null=True)
@@ -230,9 +317,10 @@ class HostelManagerSerializer(serializers.ModelSerializer):
         institute = attrs.get('institute')
 
         if acting_user and not acting_user.is_superuser:
-            if not hasattr(acting_user, 'director_profile'):
+            principal = get_principal(request)
+            if not principal.is_director:
                 raise serializers.ValidationError("You must be a Director to manage Hostel Managers.")
-            if institute and acting_user.director_profile.institute != institute:
+            if institute and principal.institute_id != institute.pk:
                 raise serializers.ValidationError("You can only assign managers within your own institute.")
         return attrs
     
@@ -258,8 +346,11 @@ class StudentProfileSerializer(serializers.ModelSerializer):
             'id', 'user_email', 'full_name', 'institute_name', 'course_name', 'branch_name',
             'is_currently_hosteller', 'created_at', 'updated_at'
         )
+        field_paths = {
+            'full_name': ['user__email'],
+        }
 
-class HostelApplicationSerializer(serializers.ModelSerializer):
+class HostelApplicationSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     student_info = StudentProfileSerializer(source='student', read_only=True)
     institute_name = serializers.CharField(source='institute.name', read_only=True)
     preferred_hostel_name = serializers.CharField(source='preferred_hostel.name', read_only=True, allow_null=True)
@@ -285,11 +376,15 @@ class HostelApplicationSerializer(serializers.ModelSerializer):
             'status_display', 'reviewed_by', 'reviewed_by_email', 
             'submitted_at', 'reviewed_at', 'created_at', 'updated_at'
         ]
+        expandable_fields = ['student_info']
+        field_paths = {
+            'status_display': ['status'],
+        }
 
     def validate_student(self, value):
         request = self.context.get('request')
-        if request and hasattr(request.user, 'student_profile'):
-            if value != request.user.student_profile:
+        if request and get_principal(request).is_student:
+            if value.pk != get_principal(request).student_id:
                 raise serializers.ValidationError("You can only submit an application for yourself.")
         return value
 
@@ -300,26 +395,25 @@ class HostelApplicationSerializer(serializers.ModelSerializer):
         is_creating = self.instance is None
 
         if is_creating:
-            if not user or not hasattr(user, 'student_profile'):
+            if not user or not get_principal(request).is_student:
                 raise serializers.ValidationError("Only authenticated students can submit hostel applications.")
             
-            student_profile = user.student_profile
+            student_profile = Student.objects.select_related('course', 'branch').get(
+                pk=get_principal(request).student_id
+            )
             data['student'] = student_profile
 
-            if HostelApplication.objects.filter(
-                student=student_profile,
-                status__in=[ApplicationStatus.PENDING, ApplicationStatus.APPROVED, ApplicationStatus.WAITLISTED]
-            ).exists():
-                raise serializers.ValidationError("You already have an active or approved hostel application.")
-            
-            if data.get('institute') != student_profile.institute:
+            # One active application per student is enforced by a partial unique
+            # constraint; see save_or_translate().
+            if data.get('institute') is None or data['institute'].pk != student_profile.institute_id:
                 raise serializers.ValidationError("Application institute must match your registered institute.")
             
             data['course_at_application'] = student_profile.course
             data['branch_at_application'] = student_profile.branch
 
         if not is_creating and 'status' in data and data['status'] != self.instance.status:
-            if not user or not (user.is_superuser or hasattr(user, 'director_profile') or hasattr(user, 'hostelmanager_profile')):
+            principal = get_principal(request) if user else None
+            if not principal or not (principal.is_superuser or principal.is_director or principal.is_manager):
                 raise serializers.ValidationError({"status": "You do not have permission to change the application status."})
             
             data['reviewed_by'] = user
@@ -340,7 +434,21 @@ class HostelApplicationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['status'] = ApplicationStatus.PENDING
         validated_data['submitted_at'] = timezone.now()
-        return super().create(validated_data)
+        return self.save_or_translate(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self.save_or_translate(super().update, instance, validated_data)
+
+    def save_or_translate(self, save, *args):
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as exc:
+            if violates_constraint(exc, HostelApplication, ACTIVE_APPLICATION_CONSTRAINT):
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: ["You already have an active or approved hostel application."]
+                })
+            raise
     
 class RoomAllocationSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.full_name', read_only=True)
@@ -379,7 +487,8 @@ class RoomAllocationSerializer(serializers.ModelSerializer):
 
         is_currently_active_allocation = (end_date is None or end_date >= timezone.now().date())
 
-        if is_currently_active_allocation and room:
+        # New allocations are capacity-checked atomically by reserve_bed() in create().
+        if is_currently_active_allocation and room and not is_creating:
             query = RoomAllocation.objects.filter(room=room, end_date__isnull=True)
             if instance:
                 query = query.exclude(pk=instance.pk)
@@ -393,14 +502,6 @@ class RoomAllocationSerializer(serializers.ModelSerializer):
                         {"room": f"Room {room.room_number} is already at full capacity ({room.capacity} occupants)."}
                     )
 
-        if is_currently_active_allocation and student:
-            query = RoomAllocation.objects.filter(student=student, end_date__isnull=True)
-            if instance: 
-                query = query.exclude(pk=instance.pk)
-            if query.exists():
-                 raise serializers.ValidationError(
-                    {"student": f"Student {student} is already actively allocated to another room."}
-                )
         application = attrs.get('application')
         if application:
             if application.status != ApplicationStatus.APPROVED:
@@ -412,6 +513,37 @@ class RoomAllocationSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def create(self, validated_data):
+        try:
+            return reserve_bed(
+                validated_data['room'],
+                validated_data['student'],
+                application=validated_data.get('application'),
+                start_date=validated_data.get('start_date'),
+                notes=validated_data.get('notes'),
+            )
+        except RoomFullError as exc:
+            raise serializers.ValidationError({"room": str(exc)})
+        except IntegrityError as exc:
+            self.translate_integrity_error(exc, validated_data['student'])
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except RoomFullError as exc:
+            raise serializers.ValidationError({"room": str(exc)})
+        except IntegrityError as exc:
+            self.translate_integrity_error(exc, validated_data.get('student', instance.student))
+
+    def translate_integrity_error(self, exc, student):
+        # One open allocation per student is enforced by a partial unique constraint.
+        if violates_constraint(exc, RoomAllocation, OPEN_ALLOCATION_CONSTRAINT):
+            raise serializers.ValidationError(
+                {"student": f"Student {student} is already actively allocated to another room."}
+            )
+        raise exc
+
 class PaymentSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.full_name', read_only=True)
     payment_type_display = serializers.CharField(source='get_payment_type_display', read_only=True)
@@ -442,3 +574,107 @@ class PaymentSerializer(serializers.ModelSerializer):
                 {"room_allocation": "Room allocation does not belong to the selected student."}
             )
         return attrs
+
+class PaymentFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Payment.PAYMENT_STATUS, required=False)
+    payment_type = serializers.ChoiceField(choices=Payment.PAYMENT_TYPES, required=False)
+    due_from = serializers.DateField(required=False)
+    due_to = serializers.DateField(required=False)
+    hostel = serializers.IntegerField(required=False)
+    student = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('due_from') and attrs.get('due_to') and attrs['due_from'] > attrs['due_to']:
+            raise serializers.ValidationError({"due_to": "due_to cannot be before due_from."})
+        return attrs
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=['csv', 'jsonl'], default='csv')
+    hostel = serializers.IntegerField(required=False)
+    current = serializers.BooleanField(default=False, help_text="Only current hostellers / open allocations.")
+
+
+class PaymentExportQuerySerializer(PaymentFilterSerializer):
+    export_format = serializers.ChoiceField(choices=['csv', 'jsonl'], default='csv')
+
+
+class OverdueQuerySerializer(serializers.Serializer):
+    as_of = serializers.DateField(required=False, help_text="Charges due before this date count as overdue; defaults to today.")
+    institute = serializers.IntegerField(required=False)
+
+
+class PaymentRollupQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(input_formats=['%Y-%m', 'iso-8601'], required=False, help_text="YYYY-MM; defaults to 11 months before end.")
+    end = serializers.DateField(input_formats=['%Y-%m', 'iso-8601'], required=False, help_text="YYYY-MM; defaults to the current month.")
+    institute = serializers.IntegerField(required=False)
+    hostel = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        end = (attrs.get('end') or timezone.now().date()).replace(day=1)
+        start = attrs.get('start')
+        if start is None:
+            months = end.year * 12 + end.month - 1 - 11
+            start = end.replace(year=months // 12, month=months % 12 + 1)
+        start = start.replace(day=1)
+        if start > end:
+            raise serializers.ValidationError({"end": "end cannot be before start."})
+        attrs.update(start=start, end=end)
+        return attrs
+
+
+class StudentLedgerSerializer(serializers.ModelSerializer):
+    outstanding = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = StudentLedger
+        fields = ['student', 'billed', 'paid', 'waived', 'refunded', 'outstanding', 'updated_at']
+        read_only_fields = fields
+
+
+class AllocationRunSerializer(serializers.Serializer):
+    institute = serializers.PrimaryKeyRelatedField(queryset=Institute.objects.all(), required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+
+class RentBillingSerializer(serializers.Serializer):
+    period = serializers.DateField(help_text="Any day of the month to bill; defaults to the current month.", required=False)
+    institute = serializers.PrimaryKeyRelatedField(queryset=Institute.objects.all(), required=False)
+    hostel = serializers.PrimaryKeyRelatedField(queryset=Hostel.objects.all(), required=False)
+    due_date = serializers.DateField(required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+
+class StatementReconcileSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="CSV with amount and transaction_id and/or enroll_number columns; paid_at and payment_method are optional.")
+    institute = serializers.PrimaryKeyRelatedField(queryset=Institute.objects.all(), required=False)
+    payment_method = serializers.CharField(max_length=50, default='bank_transfer')
+
+    def get_lines(self):
+        return io.TextIOWrapper(self.validated_data['file'].file, encoding='utf-8-sig', newline='')
+
+
+class BulkCheckoutSerializer(serializers.Serializer):
+    institute = serializers.PrimaryKeyRelatedField(queryset=Institute.objects.all(), required=False)
+    hostel = serializers.PrimaryKeyRelatedField(queryset=Hostel.objects.all(), required=False)
+    room_type = serializers.ChoiceField(choices=Room.ROOM_TYPES, required=False)
+    year_of_study = serializers.IntegerField(min_value=1, required=False)
+    students = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    end_date = serializers.DateField(required=False)
+    promote_waitlist = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if not any(attrs.get(key) for key in ('institute', 'hostel', 'students')):
+            raise serializers.ValidationError("Specify an institute, a hostel or a list of students to check out.")
+        hostel = attrs.get('hostel')
+        if hostel and attrs.get('institute') and hostel.institute_id != attrs['institute'].pk:
+            raise serializers.ValidationError({"hostel": "Hostel does not belong to the selected institute."})
+        return attrs
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=5000)
+    status = serializers.ChoiceField(choices=[
+        ApplicationStatus.APPROVED, ApplicationStatus.REJECTED, ApplicationStatus.WAITLISTED
+    ])
+    remarks = serializers.CharField(required=False, allow_blank=True, allow_null=True)
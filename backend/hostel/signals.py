@@ -0,0 +1,128 @@
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from hostel.models import (
+    Hostel, Room, RoomAllocation, HostelApplication, ApplicationStatus, Payment, AllocationLedger
+)
+from hostel.ledger import LedgerChanges
+from hostel.rollup import mark_months_dirty
+from hostel.occupancy import (
+    claim_bed, refresh_hostel_availability, release_bed, sync_hosteller_flags, RoomFullError
+)
+from hostel import waitlist
+
+
+def _occupancy_state(instance):
+    """(room_id, is_open) of the allocation as last loaded from or saved to the DB."""
+    return getattr(instance, '_occupancy_state', None)
+
+
+@receiver(pre_save, sender=RoomAllocation)
+def claim_bed_for_allocation(sender, instance, raw=False, **kwargs):
+    if raw or instance.end_date is not None:
+        return
+    before = _occupancy_state(instance)
+    if before is None or not before[1] or before[0] != instance.room_id:
+        if not claim_bed(instance.room_id):
+            raise RoomFullError(
+                f"Room {instance.room.room_number} has no free bed: it is full ({instance.room.capacity} occupants) "
+                f"or closed to new allocations."
+            )
+
+
+@receiver(post_save, sender=RoomAllocation)
+def release_bed_for_allocation(sender, instance, raw=False, **kwargs):
+    before = _occupancy_state(instance)
+    after = (instance.room_id, instance.end_date is None)
+    if not raw and before is not None and before[1] and (not after[1] or before[0] != after[0]):
+        release_bed(before[0])
+        waitlist.promote_waitlist_on_commit(before[0])
+    if not raw and before is not None and before[0] != after[0]:
+        AllocationLedger.objects.filter(room_allocation=instance).update(
+            hostel_id=Room.objects.filter(pk=instance.room_id).values('hostel_id')[:1]
+        )
+        # The allocation's charges now roll up under another hostel.
+        mark_months_dirty(Payment.objects.filter(room_allocation=instance).dates('due_date', 'month'))
+    if not raw and (before is None or before[1] != after[1]):
+        sync_hosteller_flags([instance.student_id])
+    instance._occupancy_state = after
+
+
+@receiver(post_delete, sender=RoomAllocation)
+def release_bed_for_deleted_allocation(sender, instance, **kwargs):
+    room_id, is_open = _occupancy_state(instance) or (instance.room_id, instance.end_date is None)
+    if is_open:
+        release_bed(room_id)
+        waitlist.promote_waitlist_on_commit(room_id)
+        sync_hosteller_flags([instance.student_id])
+
+
+@receiver(post_save, sender=HostelApplication)
+def sync_waitlist_entry(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_loaded_status', None)
+    if instance.status == ApplicationStatus.WAITLISTED and (created or before != ApplicationStatus.WAITLISTED):
+        waitlist.enqueue(instance)
+    elif before == ApplicationStatus.WAITLISTED and instance.status != ApplicationStatus.WAITLISTED:
+        waitlist.dequeue(instance.pk)
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Room)
+def count_saved_room(sender, instance, created, raw=False, **kwargs):
+    before = getattr(instance, '_counted_state', None)
+    after = (instance.hostel_id, instance.is_available)
+    if created and not raw:
+        Hostel.objects.filter(pk=instance.hostel_id).update(
+            total_rooms=F('total_rooms') + 1,
+            available_rooms=F('available_rooms') + (1 if instance.is_available else 0),
+            updated_at=timezone.now(),
+        )
+    elif not raw and before != after:
+        # Opened, closed or moved to another hostel.
+        refresh_hostel_availability({after[0]} | ({before[0]} if before else set()))
+    instance._counted_state = after
+
+
+@receiver(post_delete, sender=Room)
+def uncount_deleted_room(sender, instance, **kwargs):
+    Hostel.objects.filter(pk=instance.hostel_id, total_rooms__gt=0).update(
+        total_rooms=F('total_rooms') - 1,
+        available_rooms=Greatest(F('available_rooms') - (1 if instance.is_available else 0), 0),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Payment)
+def post_payment_to_ledgers(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    after = (instance.student_id, instance.room_allocation_id, instance.status, instance.amount)
+    before = getattr(instance, '_ledger_state', None)
+    if before != after:
+        changes = LedgerChanges()
+        if before is not None:
+            changes.reverse(*before)
+        changes.post(*after)
+        changes.save()
+    instance._ledger_state = after
+    # A charge moved to another month leaves its old month, which the rollup watermark would miss.
+    before_due = getattr(instance, '_rollup_due_date', None)
+    if before_due is not None and (before_due.year, before_due.month) != (instance.due_date.year, instance.due_date.month):
+        mark_months_dirty([before_due])
+    instance._rollup_due_date = instance.due_date
+
+
+@receiver(post_delete, sender=Payment)
+def reverse_deleted_payment(sender, instance, **kwargs):
+    changes = LedgerChanges()
+    changes.reverse(*getattr(instance, '_ledger_state', None) or (
+        instance.student_id, instance.room_allocation_id, instance.status, instance.amount
+    ))
+    changes.save(create_missing=False)
+    mark_months_dirty([getattr(instance, '_rollup_due_date', None) or instance.due_date])
@@ -1,3 +1,954 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from account.models import User, UserRole
+from account.tokens import get_tokens_for_user
+from director.models import Branch, Course, Director, Institute
+from hostel.allocation import reserve_bed
+from hostel.billing import run_rent_billing
+from hostel.checkout import bulk_checkout
+from hostel.ledger import hostel_dues, rebuild_ledgers
+from hostel.reconciliation import reconcile_statement
+from hostel.penalties import run_late_fees
+from hostel.rollup import payment_rollup_report, refresh_payment_rollup
+from hostel.occupancy import reconcile_occupancy, RoomFullError
+from hostel.permissions import IsDirectorOrManagerOfHostel
+from hostel.principal import get_principal
+from hostel.provisioning import ProvisioningError, provision_rooms
+from hostel.review import bulk_review
+from hostel.views import RoomVacancySearchView
+from hostel.serializers import HostelApplicationSerializer, HostelSerializer, RoomAllocationSerializer, RoomSerializer
+from hostel import waitlist
+from hostel.models import (
+    AllocationLedger, ApplicationStatus, Hostel, HostelApplication, HostelImage, HostelManager, LateFeePolicy,
+    Payment, Room, RoomAllocation, Student, StudentLedger, WaitlistEntry
+)
+
+
+def create_institute(name):
+    return Institute.objects.create(name=name, address="Address", city="City", state="State", pincode="000000")
+
+
+def create_hostel(institute, name, **fields):
+    fields = {'hostel_type': 'mixed', 'rent_per_month': 5000, 'security_deposit': 1000, **fields}
+    return Hostel.objects.create(
+        name=name, institute=institute, address_line1="Address", city="City", state="State", pincode="000000",
+        **fields,
+    )
+
+
+def create_student(institute, enroll_number, **fields):
+    user = User.objects.create_user(email=f"{enroll_number.lower()}@example.com", role=UserRole.STUDENT)
+    return Student.objects.create(user=user, institute=institute, enroll_number=enroll_number, **fields)
+
+
+class ReserveBedConcurrencyTests(TransactionTestCase):
+    THREADS = 16
+
+    def setUp(self):
+        institute = create_institute("Test Institute")
+        hostel = create_hostel(institute, "Test Hostel")
+        self.room = Room.objects.create(
+            hostel=hostel, room_number="101", room_type='triple', capacity=3, rent_per_bed=2000
+        )
+        self.students = [create_student(institute, f"ENR{i:04d}") for i in range(self.THREADS)]
+
+    def test_concurrent_reservations_never_exceed_capacity(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+
+        def reserve(student):
+            try:
+                barrier.wait()
+                reserve_bed(self.room, student, max_attempts=20)
+                outcomes.append('placed')
+            except RoomFullError:
+                outcomes.append('full')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve, args=(student,)) for student in self.students]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.room.refresh_from_db()
+        self.assertEqual(outcomes.count('placed'), self.room.capacity)
+        self.assertEqual(outcomes.count('full'), self.THREADS - self.room.capacity)
+        self.assertEqual(self.room.current_occupancy, self.room.capacity)
+        self.assertFalse(self.room.is_available)
+        self.assertEqual(RoomAllocation.objects.filter(room=self.room).count(), self.room.capacity)
+
+    def test_reserve_full_room_raises(self):
+        for student in self.students[:self.room.capacity]:
+            reserve_bed(self.room, student)
+        with self.assertRaises(RoomFullError):
+            reserve_bed(self.room, self.students[-1])
+
+
+class SingleStudentTestCase(TestCase):
+    """A hostel with a single and a double room, and one student of its institute."""
+    def setUp(self):
+        institute = create_institute("Counter Institute")
+        self.hostel = create_hostel(institute, "Counter Hostel")
+        self.single = Room.objects.create(
+            hostel=self.hostel, room_number="1", room_type='single', capacity=1, rent_per_bed=3000
+        )
+        self.double = Room.objects.create(
+            hostel=self.hostel, room_number="2", room_type='double', capacity=2, rent_per_bed=2000
+        )
+        self.student = create_student(institute, "CNT0001")
+
+    def assertCounters(self, single, double, available_rooms):
+        self.single.refresh_from_db()
+        self.double.refresh_from_db()
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.single.current_occupancy, single)
+        self.assertEqual(self.double.current_occupancy, double)
+        self.assertEqual(self.hostel.total_rooms, 2)
+        self.assertEqual(self.hostel.available_rooms, available_rooms)
+
+
+class OccupancyCounterTests(SingleStudentTestCase):
+    def test_counters_follow_allocation_lifecycle(self):
+        self.assertCounters(0, 0, 2)
+
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.single)
+        self.assertCounters(1, 0, 1)
+
+        allocation = RoomAllocation.objects.get(pk=allocation.pk)
+        allocation.room = self.double
+        allocation.save()
+        self.assertCounters(0, 1, 2)
+
+        allocation.end_date = allocation.start_date
+        allocation.save()
+        self.assertCounters(0, 0, 2)
+
+        allocation.end_date = None
+        allocation.save()
+        self.assertCounters(0, 1, 2)
+
+        RoomAllocation.objects.filter(pk=allocation.pk).delete()
+        self.assertCounters(0, 0, 2)
+
+    def test_hosteller_flag_follows_allocations(self):
+        def is_hosteller():
+            return Student.objects.get(pk=self.student.pk).is_currently_hosteller
+
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.single)
+        self.assertTrue(is_hosteller())
+        self.assertEqual(Student.objects.filter(is_currently_hosteller=True).count(), 1)
+
+        allocation.end_date = allocation.start_date
+        allocation.save()
+        self.assertFalse(is_hosteller())
+
+        allocation.end_date = None
+        allocation.save()
+        self.assertTrue(is_hosteller())
+
+        bulk_checkout(RoomAllocation.objects.filter(student=self.student), promote=False)
+        self.assertFalse(is_hosteller())
+
+        Student.objects.filter(pk=self.student.pk).update(is_currently_hosteller=True)
+        self.assertEqual(reconcile_occupancy()['students_drifted'], 1)
+        self.assertFalse(is_hosteller())
+
+    def test_reconcile_fixes_drift(self):
+        RoomAllocation.objects.create(student=self.student, room=self.single)
+        Room.objects.filter(pk=self.single.pk).update(current_occupancy=0, is_available=True)
+        Hostel.objects.filter(pk=self.hostel.pk).update(total_rooms=7, available_rooms=2)
+
+        report = reconcile_occupancy()
+
+        self.assertEqual(report['rooms_drifted'], 1)
+        self.assertEqual(report['hostels_drifted'], 1)
+        self.assertCounters(1, 0, 1)
+
+
+class UniquenessConstraintTests(SingleStudentTestCase):
+    def test_second_open_allocation_is_rejected(self):
+        RoomAllocation.objects.create(student=self.student, room=self.single)
+
+        serializer = RoomAllocationSerializer(data={'student': self.student.pk, 'room': self.double.pk})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(ValidationError) as raised:
+            serializer.save()
+        self.assertIn('student', raised.exception.detail)
+        self.assertCounters(1, 0, 1)
+
+    def test_one_active_application_per_student(self):
+        HostelApplication.objects.create(student=self.student, institute=self.hostel.institute)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            HostelApplication.objects.create(
+                student=self.student, institute=self.hostel.institute, status=ApplicationStatus.WAITLISTED
+            )
+        HostelApplication.objects.create(
+            student=self.student, institute=self.hostel.institute, status=ApplicationStatus.REJECTED
+        )
+
+
+class RentBillingTests(SingleStudentTestCase):
+    def test_rent_billing_prorates_and_is_idempotent(self):
+        RoomAllocation.objects.create(student=self.student, room=self.double, start_date=date(2026, 9, 21))
+
+        first = run_rent_billing(date(2026, 9, 1))
+        again = run_rent_billing(date(2026, 9, 15))
+
+        self.assertEqual((first['billed'], first['prorated']), (1, 1))
+        self.assertEqual(again['billed'], 0)
+        payment = Payment.objects.get()
+        self.assertEqual(payment.amount, Decimal('666.67'))
+        self.assertEqual(payment.billing_period, date(2026, 9, 1))
+        self.assertEqual(payment.due_date, date(2026, 9, 10))
+
+
+class LedgerTests(SingleStudentTestCase):
+    def test_ledgers_follow_payments(self):
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.double, start_date=date(2026, 9, 1))
+        run_rent_billing(date(2026, 9, 1))
+        deposit = Payment.objects.create(
+            student=self.student, payment_type='security_deposit', amount=1000, due_date=date(2026, 9, 1)
+        )
+        rent = Payment.objects.get(payment_type='rent')
+        rent.status = 'paid'
+        rent.save()
+        deposit.delete()
+
+        ledger = StudentLedger.objects.get(student=self.student)
+        self.assertEqual((ledger.billed, ledger.paid, ledger.outstanding), (Decimal('2000'), Decimal('2000'), 0))
+        self.assertEqual(AllocationLedger.objects.get(room_allocation=allocation).hostel, self.hostel)
+        self.assertEqual(hostel_dues(self.hostel.pk)['paid'], Decimal('2000.00'))
+
+        incremental = list(StudentLedger.objects.values_list('student', 'billed', 'paid', 'waived', 'refunded'))
+        rebuild_ledgers()
+        self.assertEqual(list(StudentLedger.objects.values_list('student', 'billed', 'paid', 'waived', 'refunded')), incremental)
+
+
+class StatementReconciliationTests(SingleStudentTestCase):
+    def test_statement_reconciliation(self):
+        by_transaction = Payment.objects.create(
+            student=self.student, payment_type='rent', amount=2000, due_date=date(2026, 9, 10), transaction_id="TX1"
+        )
+        by_student = Payment.objects.create(
+            student=self.student, payment_type='rent', amount=2000, due_date=date(2026, 10, 10)
+        )
+        statement = [
+            "transaction_id,amount,paid_at,enroll_number,payment_method",
+            "TX1,2000.00,2026-10-01,,",
+            "BANK7,2000,2026-10-02T09:30:00,CNT0001,upi",
+            "TX1,2000.00,2026-10-01,,",
+            "TX9,15,,,",
+        ]
+        exceptions = []
+
+        result = reconcile_statement(statement, exceptions.append)
+
+        self.assertEqual((result['matched_by_transaction'], result['matched_by_student']), (1, 1))
+        self.assertEqual([line['line'] for line in exceptions], [4, 5])
+        self.assertEqual(exceptions[0]['reason'], "Transaction appears more than once in the statement.")
+        by_transaction.refresh_from_db()
+        by_student.refresh_from_db()
+        self.assertEqual((by_transaction.status, by_transaction.payment_date.date()), ('paid', date(2026, 10, 1)))
+        self.assertEqual((by_student.status, by_student.transaction_id, by_student.payment_method), ('paid', "BANK7", 'upi'))
+        self.assertEqual(StudentLedger.objects.get(student=self.student).outstanding, 0)
+
+        # Across batches a repeat is caught by its payment already being paid, not by a growing set.
+        Payment.objects.create(
+            student=self.student, payment_type='rent', amount=2000, due_date=date(2026, 11, 10), transaction_id="TX2"
+        )
+        exceptions = []
+        with mock.patch('hostel.reconciliation.RECONCILE_BATCH_SIZE', 1):
+            result = reconcile_statement([statement[0], "TX2,2000,,,", "TX2,2000,,,"], exceptions.append)
+        self.assertEqual((result['matched'], [line['reason'] for line in exceptions]), (1, ["Payment is already paid."]))
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(email="reconcile@example.com", password="pw"))
+        upload = io.BytesIO("\n".join(statement[:1] + [f"TX40{n},1,,," for n in range(5)]).encode())
+        upload.name = 'statement.csv'
+        with mock.patch('hostel.views.RECONCILE_EXCEPTION_LIMIT', 2):
+            response = client.post('/api/hostel/payments/reconcile/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['exceptions'], 5)
+        self.assertEqual([line['line'] for line in response.data['exception_lines']], [2, 3])
+        self.assertTrue(response.data['exception_lines_truncated'])
+
+
+class PaymentApiTests(SingleStudentTestCase):
+    def test_payment_filters_and_overdue(self):
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.single)
+        for amount, due, status in ((3000, date(2026, 8, 10), 'pending'), (3000, date(2026, 9, 10), 'failed'),
+                                    (3000, date(2026, 7, 10), 'paid'), (500, date(2026, 12, 1), 'pending')):
+            Payment.objects.create(
+                student=self.student, room_allocation=allocation, payment_type='rent',
+                amount=amount, due_date=due, status=status,
+            )
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(email="payments@example.com", password="pw"))
+
+        listed = client.get('/api/hostel/payments/', {'status': 'pending', 'hostel': self.hostel.pk})
+        self.assertEqual([row['due_date'] for row in listed.data['results']], ['2026-12-01', '2026-08-10'])
+        overdue = client.get('/api/hostel/payments/overdue/', {'as_of': '2026-10-01'})
+        self.assertEqual(overdue.status_code, 200)
+        [row] = overdue.data['hostels']
+        self.assertEqual((row['hostel'], row['payments'], row['students'], row['amount']), (self.hostel.pk, 2, 1, 6000))
+        self.assertEqual(row['oldest_due_date'], date(2026, 8, 10))
+
+
+class LateFeeTests(SingleStudentTestCase):
+    def test_late_fees_follow_slabs(self):
+        LateFeePolicy.objects.create(
+            hostel=self.hostel, grace_days=5, max_fee=250,
+            slabs=[{'after_days': 0, 'percent': 2, 'flat': 0}, {'after_days': 20, 'percent': 5, 'flat': 50}],
+        )
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.single)
+        rent = Payment.objects.create(
+            student=self.student, room_allocation=allocation, payment_type='rent',
+            billing_period=date(2026, 9, 1), amount=Decimal('3000.50'), due_date=date(2026, 9, 10),
+        )
+
+        self.assertEqual(run_late_fees(date(2026, 9, 1), date(2026, 9, 15))['penalised'], 0)
+        dry = run_late_fees(date(2026, 9, 1), date(2026, 9, 20), dry_run=True)
+        self.assertEqual((dry['penalised'], dry['total_amount']), (1, Decimal('60.01')))
+        self.assertFalse(Payment.objects.filter(penalty_for=rent).exists())
+
+        run_late_fees(date(2026, 9, 1), date(2026, 10, 10))
+        run_late_fees(date(2026, 9, 1), date(2026, 10, 11))
+        penalty = Payment.objects.get(penalty_for=rent)
+        self.assertEqual((penalty.payment_type, penalty.amount), ('other', Decimal('200.03')))
+        self.assertEqual(StudentLedger.objects.get(student=self.student).billed, Decimal('3200.53'))
+
+
+class PaymentRollupTests(SingleStudentTestCase):
+    def test_payment_rollup_refreshes_changed_months(self):
+        allocation = RoomAllocation.objects.create(student=self.student, room=self.single)
+        september = Payment.objects.create(
+            student=self.student, room_allocation=allocation, payment_type='rent', amount=3000, due_date=date(2026, 9, 10)
+        )
+        Payment.objects.create(
+            student=self.student, room_allocation=allocation, payment_type='security_deposit',
+            amount=1000, due_date=date(2026, 9, 1), status='paid',
+        )
+        october = Payment.objects.create(
+            student=self.student, room_allocation=allocation, payment_type='rent', amount=3000, due_date=date(2026, 10, 10)
+        )
+        self.assertEqual(refresh_payment_rollup()['months'], 2)
+        report = payment_rollup_report(date(2026, 9, 1), date(2026, 10, 1), hostel_id=self.hostel.pk)
+        self.assertEqual(
+            [(row['month'], row['billed'], row['collected'], row['outstanding'], row['deposits_held']) for row in report],
+            [(date(2026, 9, 1), 4000, 1000, 3000, 1000), (date(2026, 10, 1), 3000, 0, 3000, 0)],
+        )
+
+        september.status = 'paid'
+        september.save()
+        october.delete()
+        deposit = Payment.objects.get(payment_type='security_deposit')
+        deposit.status = 'refunded'
+        deposit.save()
+        self.assertEqual(refresh_payment_rollup()['months'], 2)
+        report = payment_rollup_report(date(2026, 9, 1), date(2026, 10, 1), hostel_id=self.hostel.pk)
+        self.assertEqual(
+            [(row['month'], row['outstanding'], row['deposits_collected'], row['deposits_refunded'], row['deposits_held'])
+             for row in report],
+            [(date(2026, 9, 1), 0, 1000, 1000, 0)],
+        )
+
+
+class WaitlistPromotionTests(TestCase):
+    def setUp(self):
+        self.institute = create_institute("Waitlist Institute")
+        self.hostel = create_hostel(self.institute, "Waitlist Hostel")
+        self.room = Room.objects.create(
+            hostel=self.hostel, room_number="1", room_type='single', capacity=1, rent_per_bed=3000
+        )
+        self.students = [create_student(self.institute, f"WL{i:04d}") for i in range(3)]
+
+    def apply(self, student, status, **kwargs):
+        return HostelApplication.objects.create(
+            student=student, institute=self.institute, status=status, **kwargs
+        )
+
+    def test_freed_bed_goes_to_head_of_queue(self):
+        resident = RoomAllocation.objects.create(student=self.students[0], room=self.room)
+        later = self.apply(self.students[1], ApplicationStatus.WAITLISTED, preferred_room_type='any')
+        earlier = self.apply(
+            self.students[2], ApplicationStatus.WAITLISTED, preferred_hostel=self.hostel,
+            preferred_room_type='single', submitted_at=later.submitted_at - timedelta(days=1),
+        )
+
+        self.assertEqual(waitlist.position(earlier.waitlist_entry), 1)
+        self.assertEqual(waitlist.position(later.waitlist_entry), 1)
+
+        resident.end_date = resident.start_date
+        with self.captureOnCommitCallbacks(execute=True):
+            resident.save()
+
+        earlier.refresh_from_db()
+        self.assertEqual(earlier.status, ApplicationStatus.APPROVED)
+        self.assertTrue(RoomAllocation.objects.filter(student=self.students[2], room=self.room, end_date__isnull=True).exists())
+        self.assertFalse(WaitlistEntry.objects.filter(application=earlier).exists())
+        self.assertTrue(WaitlistEntry.objects.filter(application=later).exists())
+
+    def test_promotion_skips_students_already_housed(self):
+        other = Room.objects.create(
+            hostel=self.hostel, room_number="2", room_type='single', capacity=1, rent_per_bed=3000
+        )
+        RoomAllocation.objects.create(student=self.students[0], room=other)
+        housed = self.apply(self.students[0], ApplicationStatus.WAITLISTED)
+        self.assertEqual(waitlist.promote_waitlist(self.room.pk), 0)
+        housed.refresh_from_db()
+        self.assertEqual(housed.status, ApplicationStatus.WAITLISTED)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertEqual(RoomAllocation.objects.filter(student=self.students[0]).count(), 1)
+
+        # Any other constraint violation is not swallowed.
+        linked = self.apply(self.students[1], ApplicationStatus.WAITLISTED)
+        RoomAllocation.objects.create(student=self.students[1], room=other, application=linked, end_date=date.today())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            waitlist.promote_waitlist(self.room.pk)
+        self.assertTrue(WaitlistEntry.objects.filter(application=linked).exists())
+
+    def test_failed_promotion_does_not_fail_the_release(self):
+        resident = RoomAllocation.objects.create(student=self.students[0], room=self.room)
+        resident.end_date = date.today()
+        with mock.patch('hostel.waitlist.promote_waitlist', side_effect=IntegrityError), \
+                self.assertLogs('hostel.waitlist', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            resident.save()
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 0)
+
+    def test_leaving_waitlist_removes_entry(self):
+        application = self.apply(self.students[1], ApplicationStatus.WAITLISTED)
+        application = HostelApplication.objects.get(pk=application.pk)
+        application.status = ApplicationStatus.CANCELLED
+        application.save()
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class RoomOperationTests(TestCase):
+    def setUp(self):
+        self.institute = create_institute("Operations Institute")
+        self.hostel = create_hostel(self.institute, "Operations Hostel")
+        self.double = Room.objects.create(
+            hostel=self.hostel, room_number="1", room_type='double', capacity=2, rent_per_bed=2000
+        )
+        self.single = Room.objects.create(
+            hostel=self.hostel, room_number="2", room_type='single', capacity=1, rent_per_bed=3000
+        )
+        self.closed = Room.objects.create(
+            hostel=self.hostel, room_number="3", room_type='double', capacity=2, rent_per_bed=2000,
+            is_available=False,
+        )
+        self.students = [
+            create_student(self.institute, f"OP{i:04d}", year_of_study=1 + i % 2) for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(email="operations@example.com", password="pw"))
+
+    def apply(self, student, status=ApplicationStatus.APPROVED, **kwargs):
+        return HostelApplication.objects.create(student=student, institute=self.institute, status=status, **kwargs)
+
+    def test_allocation_run_fills_open_rooms_once(self):
+        for day, student in enumerate(self.students):
+            self.apply(student, submitted_at=datetime(2024, 1, 1 + day, tzinfo=dt_timezone.utc))
+
+        response = self.client.post(
+            '/api/hostel/allocation-run/', {'institute': self.institute.pk, 'dry_run': True}, format='json'
+        )
+        self.assertEqual((response.data['placed'], response.data['unplaced']), (3, 2))
+        self.assertFalse(RoomAllocation.objects.exists())
+
+        response = self.client.post('/api/hostel/allocation-run/', {'institute': self.institute.pk}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['placed'], 3)
+        self.assertEqual(
+            sorted(RoomAllocation.objects.values_list('room__room_number', 'student__enroll_number')),
+            [('1', 'OP0000'), ('1', 'OP0001'), ('2', 'OP0002')],
+        )
+        for room, occupancy in ((self.double, 2), (self.single, 1), (self.closed, 0)):
+            room.refresh_from_db()
+            self.assertEqual((room.current_occupancy, room.is_available), (occupancy, False))
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.available_rooms, 0)
+        self.assertEqual(Student.objects.filter(is_currently_hosteller=True).count(), 3)
+
+        out = io.StringIO()
+        call_command('run_allocation', self.institute.pk, stdout=out)
+        self.assertIn("placed 0, unplaced 2", out.getvalue())
+        self.assertEqual(RoomAllocation.objects.count(), 3)
+
+    def test_closed_rooms_refuse_beds(self):
+        with self.assertRaises(RoomFullError):
+            reserve_bed(self.closed, self.students[0])
+        with self.assertRaises(DjangoValidationError):
+            RoomAllocation(student=self.students[0], room=self.closed).full_clean()
+
+        allocation = RoomAllocation.objects.create(student=self.students[0], room=self.double)
+        serializer = RoomAllocationSerializer(allocation, data={'room': self.closed.pk}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(ValidationError) as raised:
+            serializer.save()
+        self.assertIn('room', raised.exception.detail)
+        self.closed.refresh_from_db()
+        allocation.refresh_from_db()
+        self.assertEqual((self.closed.current_occupancy, allocation.room_id), (0, self.double.pk))
+
+    def test_room_edits_keep_counters(self):
+        def counts():
+            self.hostel.refresh_from_db()
+            return self.hostel.total_rooms, self.hostel.available_rooms
+
+        self.assertEqual(counts(), (3, 2))
+        # Closed by hand with an occupant: a checkout leaves it closed.
+        allocation = RoomAllocation.objects.create(student=self.students[0], room=self.double)
+        response = self.client.patch(f'/api/hostel/room/{self.double.pk}/', {'is_available': False}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(counts(), (3, 1))
+        allocation.end_date = date.today()
+        allocation.save()
+        self.double.refresh_from_db()
+        self.assertEqual((self.double.current_occupancy, self.double.is_available), (0, False))
+
+        # Full, then given another bed: the room reopens without being told to.
+        RoomAllocation.objects.create(student=self.students[1], room=self.single)
+        self.assertEqual(counts(), (3, 0))
+        response = self.client.patch(f'/api/hostel/room/{self.single.pk}/', {'capacity': 2}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(response.data['is_available'])
+        self.assertEqual(counts(), (3, 1))
+        response = self.client.patch(f'/api/hostel/room/{self.single.pk}/', {'capacity': 1}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(response.data['is_available'])
+        self.assertEqual(counts(), (3, 0))
+
+    def test_vacancy_search(self):
+        wired = Hostel.objects.create(
+            name="Wired Hostel", institute=self.institute, address_line1="Address", city="City",
+            state="State", pincode="000000", hostel_type='mixed', rent_per_month=4000, security_deposit=0, wifi=True,
+        )
+        triple = Room.objects.create(hostel=wired, room_number="1", room_type='triple', capacity=3, rent_per_bed=1500)
+        shut = Hostel.objects.create(
+            name="Shut Hostel", institute=self.institute, address_line1="Address", city="City",
+            state="State", pincode="000000", hostel_type='mixed', rent_per_month=4000, security_deposit=0,
+            is_active=False,
+        )
+        Room.objects.create(hostel=shut, room_number="1", room_type='double', capacity=2, rent_per_bed=1000)
+        RoomAllocation.objects.create(student=self.students[0], room=self.single)
+
+        def search(**params):
+            response = self.client.get('/api/hostel/rooms/vacancies/', params)
+            self.assertEqual(response.status_code, 200, response.data)
+            return [(row['id'], row['available_beds']) for row in response.data['results']]
+
+        # Full and closed rooms and inactive hostels are left out; most free beds first.
+        self.assertEqual(search(), [(triple.pk, 3), (self.double.pk, 2)])
+        self.assertEqual(search(room_type='double'), [(self.double.pk, 2)])
+        self.assertEqual(search(hostel=self.hostel.pk), [(self.double.pk, 2)])
+        self.assertEqual(search(wifi='true'), [(triple.pk, 3)])
+        self.assertEqual(search(max_rent='1800'), [(triple.pk, 3)])
+        self.assertEqual(search(min_rent='1800', min_beds=2), [(self.double.pk, 2)])
+        self.assertEqual(search(min_beds=3), [(triple.pk, 3)])
+        self.assertEqual(self.client.get('/api/hostel/rooms/vacancies/', {'min_rent': 9, 'max_rent': 1}).status_code, 400)
+
+        request = Request(RequestFactory().get('/', {'hostel': self.hostel.pk, 'room_type': 'double'}))
+        request.user = User.objects.get(email="operations@example.com")
+        view = RoomVacancySearchView(request=request, kwargs={})
+        if connection.vendor == 'sqlite':
+            self.assertIn('room_vacancy_idx', view.get_queryset().explain())
+
+    def test_provision_rooms(self):
+        url = f'/api/hostel/hostel/{self.hostel.pk}/provision-rooms/'
+        block = {'floors': 2, 'rooms_per_floor': 3, 'room_type': 'double', 'capacity': 2, 'rent_per_bed': '2000'}
+        response = self.client.post(url, {'blocks': [block]}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 6)
+        self.hostel.refresh_from_db()
+        self.assertEqual((self.hostel.total_rooms, self.hostel.available_rooms), (9, 8))
+        self.assertTrue(Room.objects.filter(hostel=self.hostel, room_number='203').exists())
+
+        response = self.client.post(url, {'blocks': [dict(block, floors=1, start_floor=2, prefix='B')]}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        response = self.client.post(url, {'blocks': [dict(block, floors=1, start_floor=2)]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("3 room numbers", response.data['room_number'])
+
+        upload = io.BytesIO(b"room_number,room_type,capacity,rent_per_bed\nC1,single,1,100\nc1,single,1,100\n")
+        upload.name = 'rooms.csv'
+        response = self.client.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("c1", response.data['room_number'])
+
+        upload = io.BytesIO(b"room_number,room_type,capacity,rent_per_bed\nC1,suite,1,100\nC2,single,two,100\nC3,single,1,100\n")
+        upload.name = 'rooms.csv'
+        response = self.client.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.data['file']), [2, 3])
+        self.assertFalse(Room.objects.filter(room_number__startswith='C').exists())
+        self.hostel.refresh_from_db()
+        self.assertEqual((self.hostel.total_rooms, self.hostel.available_rooms), (12, 11))
+
+        # A room added by another request between the check and the insert.
+        row = {'room_number': '1', 'room_type': 'single', 'capacity': 1, 'rent_per_bed': Decimal('100')}
+        with mock.patch('hostel.provisioning._check_room_numbers', side_effect=[None, ProvisioningError({})]):
+            with self.assertRaises(ProvisioningError):
+                provision_rooms(self.hostel, [row])
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.total_rooms, 12)
+        # Any other constraint violation is reported as a validation error too.
+        with mock.patch('hostel.provisioning.Room.objects.bulk_create', side_effect=IntegrityError):
+            response = self.client.post(url, {'blocks': [dict(block, prefix='D')]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rooms', response.data)
+
+    def test_bulk_checkout(self):
+        for student, room in zip(self.students, (self.double, self.double, self.single)):
+            RoomAllocation.objects.create(student=student, room=room, start_date=date(2024, 1, 1))
+        waiting = self.apply(self.students[3], ApplicationStatus.WAITLISTED, preferred_hostel=self.hostel)
+        url = '/api/hostel/allocations/checkout/'
+
+        def assertRoom(room, occupancy, is_available):
+            room.refresh_from_db()
+            self.assertEqual((room.current_occupancy, room.is_available), (occupancy, is_available))
+
+        self.assertEqual(self.client.post(url, {'room_type': 'single'}, format='json').status_code, 400)
+        response = self.client.post(url, {
+            'hostel': self.hostel.pk, 'room_type': 'single', 'end_date': '2024-06-30', 'promote_waitlist': False,
+        }, format='json')
+        self.assertEqual((response.data['closed'], response.data['promoted_from_waitlist']), (1, 0))
+        self.assertEqual(RoomAllocation.objects.get(student=self.students[2]).end_date, date(2024, 6, 30))
+        assertRoom(self.single, 0, True)
+        assertRoom(self.double, 2, False)
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.available_rooms, 1)
+        self.assertFalse(Student.objects.get(pk=self.students[2].pk).is_currently_hosteller)
+
+        # Year 2 leaves the double; the freed beds go to the waitlist, double first.
+        response = self.client.post(url, {'institute': self.institute.pk, 'year_of_study': 2}, format='json')
+        self.assertEqual((response.data['closed'], response.data['promoted_from_waitlist']), (1, 1))
+        self.assertIsNotNone(RoomAllocation.objects.get(student=self.students[1]).end_date)
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, ApplicationStatus.APPROVED)
+        self.assertEqual(RoomAllocation.objects.get(student=self.students[3]).room_id, self.double.pk)
+        assertRoom(self.double, 2, False)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+        response = self.client.post(url, {'students': [self.students[0].pk], 'promote_waitlist': False}, format='json')
+        self.assertEqual((response.data['closed'], response.data['students']), (1, 1))
+        assertRoom(self.double, 1, True)
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.available_rooms, 2)
+        self.assertEqual(self.client.post(url, {'students': [self.students[0].pk]}, format='json').data['closed'], 0)
+
+    def test_bulk_review(self):
+        pending = [self.apply(student, ApplicationStatus.PENDING) for student in self.students[:2]]
+        approved = self.apply(self.students[2])
+        waitlisted = self.apply(self.students[3], ApplicationStatus.WAITLISTED)
+        url = '/api/hostel/applications/bulk-review/'
+
+        ids = [pending[0].pk, pending[1].pk, pending[0].pk, approved.pk, 999999]
+        response = self.client.post(url, {'ids': ids, 'status': 'waitlisted', 'remarks': "Full"}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual([row['id'] for row in response.data['results']], ids[:2] + ids[3:])
+        self.assertEqual(response.data['results'][2]['error'], "Cannot change status from 'approved' to 'waitlisted'.")
+        self.assertEqual(response.data['results'][3]['error'], "Application not found.")
+        self.assertEqual(
+            set(WaitlistEntry.objects.values_list('application_id', flat=True)),
+            {pending[0].pk, pending[1].pk, waitlisted.pk},
+        )
+        pending[0].refresh_from_db()
+        self.assertEqual((pending[0].status, pending[0].remarks_by_reviewer), (ApplicationStatus.WAITLISTED, "Full"))
+
+        response = self.client.post(url, {'ids': [pending[0].pk, waitlisted.pk], 'status': 'approved'}, format='json')
+        self.assertEqual(response.data['updated'], 2)
+        pending[0].refresh_from_db()
+        self.assertEqual((pending[0].status, pending[0].remarks_by_reviewer), (ApplicationStatus.APPROVED, "Full"))
+        self.assertEqual(list(WaitlistEntry.objects.values_list('application_id', flat=True)), [pending[1].pk])
+
+        # A failed queue write rolls the status changes back with it.
+        with mock.patch('hostel.review.waitlist.dequeue_many', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                bulk_review(HostelApplication.objects.all(), [pending[1].pk], ApplicationStatus.REJECTED, reviewer=None)
+        pending[1].refresh_from_db()
+        self.assertEqual(pending[1].status, ApplicationStatus.WAITLISTED)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        hostel = create_hostel(create_institute("Paging Institute"), "Paging Hostel")
+        for number in ("105", "101", "104", "102", "103"):
+            Room.objects.create(hostel=hostel, room_number=number, room_type='single', capacity=1, rent_per_bed=3000)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(email="admin@example.com", password="pw"))
+
+    def room_numbers(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [room['room_number'] for room in response.data['results']]
+
+    def test_walks_pages_forward_and_back(self):
+        first = self.client.get('/api/hostel/create-room/', {'page_size': 2})
+        self.assertEqual(self.room_numbers(first), ["101", "102"])
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(self.room_numbers(second), ["103", "104"])
+        third = self.client.get(second.data['next'])
+        self.assertEqual(self.room_numbers(third), ["105"])
+        self.assertIsNone(third.data['next'])
+
+        back = self.client.get(third.data['previous'])
+        self.assertEqual(self.room_numbers(back), ["103", "104"])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/hostel/create-room/', {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 404)
+
+
+class InstituteDataTestCase(TestCase):
+    """
+    An institute with a director, a manager running "Reader Hostel", a second
+    hostel without staff, and two students: one approved and housed, one pending.
+    """
+    def setUp(self):
+        institute = create_institute("Reader Institute")
+        course = Course.objects.create(name="B.Tech", code="BT", institute=institute)
+        branch = Branch.objects.create(name="CSE", code="CS", course=course)
+        director = Director.objects.create(
+            user=User.objects.create_user(email="reader-director@example.com", role=UserRole.DIRECTOR),
+            institute=institute, first_name="Dee", last_name="Rector",
+        )
+        manager = HostelManager.objects.create(
+            user=User.objects.create_user(email="reader-manager@example.com", role=UserRole.MANAGER),
+            institute=institute,
+        )
+        self.hostel = create_hostel(
+            institute, "Reader Hostel", director=director, manager=manager, hostel_type='girls',
+            security_deposit=Decimal('1000.50'), contact_number="+919876543210", total_rooms=4, available_rooms=1,
+        )
+        create_hostel(institute, "Bare Hostel", rent_per_month=4000, security_deposit=0)
+        HostelImage.objects.create(hostel=self.hostel, image="hostel_images/front.jpg", caption="Front", is_primary=True)
+        HostelImage.objects.create(hostel=self.hostel, image="hostel_images/back.jpg")
+        room = Room.objects.create(hostel=self.hostel, room_number="1", room_type='double', capacity=2, rent_per_bed=2500)
+        for i, phone in enumerate(("+919812345678", None)):
+            student = create_student(
+                institute, f"RD{i:04d}", course=course if phone else None, branch=branch if phone else None,
+                phone_number=phone, date_of_birth=date(2004, 5, 6) if phone else None,
+            )
+            HostelApplication.objects.create(
+                student=student, institute=institute, preferred_hostel=self.hostel if phone else None,
+                status=ApplicationStatus.APPROVED if phone else ApplicationStatus.PENDING,
+                reviewed_by=director.user if phone else None, reason_for_hostel="Far from home",
+            )
+            if phone:
+                RoomAllocation.objects.create(student=student, room=room)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(email="reader-admin@example.com", password="pw"))
+
+
+class ListReaderTests(InstituteDataTestCase):
+    def assertSameJSON(self, url, serializer_class, queryset):
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), queryset.count())
+        request = response.wsgi_request
+        expected = serializer_class(queryset, many=True, context={'request': Request(request)}).data
+        self.assertEqual(
+            JSONRenderer().render(response.data['results']), JSONRenderer().render(expected)
+        )
+
+    def test_list_readers_match_serializers(self):
+        self.assertSameJSON(
+            '/api/hostel/applications/', HostelApplicationSerializer,
+            HostelApplication.objects.order_by('-submitted_at', 'id'),
+        )
+        self.assertSameJSON('/api/hostel/create-room/', RoomSerializer, Room.objects.order_by('hostel_id', 'room_number', 'id'))
+        self.assertSameJSON('/api/director/create-hostel/', HostelSerializer, Hostel.objects.order_by('name', 'id'))
+
+    def test_columns_layout(self):
+        response = self.client.get('/api/hostel/create-room/', {'layout': 'columns'})
+        self.assertEqual(response.data['results']['columns'][:3], ['id', 'hostel', 'hostel_name'])
+        self.assertEqual(response.data['results']['rows'][0][2], "Reader Hostel")
+
+
+class SparseFieldsetTests(InstituteDataTestCase):
+    def test_sparse_fieldsets_prune_payload_and_queries(self):
+        url = f'/api/director/hostel/{self.hostel.pk}/'
+        # Each read also runs the conditional GET freshness aggregate.
+        with self.assertNumQueries(5):
+            full = self.client.get(url)
+        self.assertEqual(len(full.data['images']), 2)
+        with self.assertNumQueries(2):
+            sparse = self.client.get(url, {'fields': 'id,name,city,institute_name,occupancy_rate'})
+        self.assertEqual(list(sparse.data), ['id', 'name', 'institute_name', 'city', 'occupancy_rate'])
+        self.assertEqual(sparse.data['occupancy_rate'], full.data['occupancy_rate'])
+        expanded = self.client.get(url, {'fields': 'id', 'expand': 'director_info'})
+        self.assertEqual(expanded.data, {'id': self.hostel.pk, 'director_info': full.data['director_info']})
+
+        listed = self.client.get('/api/hostel/applications/', {'expand': ''})
+        self.assertNotIn('student_info', listed.data['results'][0])
+        self.assertIn('status_display', listed.data['results'][0])
+        listed = self.client.get('/api/hostel/applications/', {'fields': 'id,status', 'expand': 'student_info'})
+        self.assertEqual(list(listed.data['results'][0]), ['id', 'student_info', 'status'])
+        self.assertEqual(self.client.get(url, {'fields': 'secret'}).status_code, 400)
+
+
+class ConditionalGetTests(InstituteDataTestCase):
+    def test_conditional_get(self):
+        # A detail still looks its object up first, for the 404 and permission checks.
+        # A list reads its page's ids, then aggregates only those rows.
+        for url, queries in (('/api/hostel/applications/', 2), (f'/api/director/hostel/{self.hostel.pk}/', 2)):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertIn('no-cache', first['Cache-Control'])
+            with self.assertNumQueries(queries):
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(cached['ETag'], first['ETag'])
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+        url = f'/api/director/hostel/{self.hostel.pk}/'
+        etag = self.client.get(url)['ETag']
+        HostelImage.objects.filter(hostel=self.hostel, is_primary=False).delete()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+        etag = self.client.get('/api/hostel/applications/')['ETag']
+        student = Student.objects.get(enroll_number="RD0001")
+        student.city = "Elsewhere"
+        student.save()
+        self.assertEqual(self.client.get('/api/hostel/applications/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_conditional_get_covers_only_the_page(self):
+        first = self.client.get('/api/hostel/applications/', {'page_size': 1})
+        second_url = first.data['next']
+        second = self.client.get(second_url)
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(second_url, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        window, aggregate = (query['sql'] for query in queries.captured_queries)
+        self.assertIn('LIMIT 2', window)
+        self.assertIn(f'IN ({second.data["results"][0]["id"]})', aggregate)
+
+        # The look-ahead row decides the next link, so removing it changes the first page's validator.
+        self.assertEqual(
+            self.client.get('/api/hostel/applications/', {'page_size': 1}, HTTP_IF_NONE_MATCH=first['ETag']).status_code,
+            304,
+        )
+        HostelApplication.objects.filter(pk=second.data['results'][0]['id']).delete()
+        self.assertEqual(
+            self.client.get('/api/hostel/applications/', {'page_size': 1}, HTTP_IF_NONE_MATCH=first['ETag']).status_code,
+            200,
+        )
+
+
+class ExportTests(InstituteDataTestCase):
+    def test_exports_stream_rosters(self):
+        RoomAllocation.objects.update(notes="=HYPERLINK(\"http://x\")")
+        response = self.client.get('/api/hostel/exports/allocations/', HTTP_ACCEPT='text/csv')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:6], ['id', 'student', 'enroll_number', 'email', 'hostel', 'room_number'])
+        self.assertEqual(rows[1][4:6], ['Reader Hostel', '1'])
+        self.assertEqual(rows[1][-1], "'=HYPERLINK(\"http://x\")")
+
+        response = self.client.get('/api/hostel/exports/students/', {'export_format': 'jsonl', 'current': 'true'})
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+        student = json.loads(lines[0])
+        self.assertEqual((student['enroll_number'], student['phone_number']), ("RD0000", "+919812345678"))
+        self.assertEqual(self.client.get('/api/hostel/exports/payments/', {'export_format': 'xml'}).status_code, 400)
+
+
+class PrincipalTests(InstituteDataTestCase):
+    def test_principal_resolves_once_and_scopes_by_role(self):
+        director, manager = Director.objects.get(), HostelManager.objects.get()
+        factory = RequestFactory()
+
+        request = Request(factory.post('/'))
+        request.user = manager.user
+        with self.assertNumQueries(1):
+            principal = get_principal(request)
+            self.assertIs(get_principal(request), principal)
+            self.assertTrue(IsDirectorOrManagerOfHostel().has_permission(request, None))
+            self.assertTrue(principal.manages(self.hostel))
+        self.assertEqual(
+            (principal.manager_id, principal.institute_id, principal.hostel_id),
+            (manager.pk, self.hostel.institute_id, self.hostel.pk),
+        )
+        self.assertEqual(principal.scope(Room.objects.all(), hostel='hostel_id').count(), 1)
+        self.assertFalse(principal.scope(Student.objects.all()).exists())
+
+        request = Request(factory.get('/'))
+        request.user = director.user
+        request.auth = AccessToken(get_tokens_for_user(director.user)['access'])
+        with self.assertNumQueries(0):
+            principal = get_principal(request)
+        self.assertEqual((principal.director_id, principal.institute_id), (director.pk, director.institute_id))
+        self.assertEqual(principal.scope(HostelApplication.objects.all(), institute='institute_id').count(), 2)
+
+        student = Student.objects.get(enroll_number="RD0001")
+        HostelApplication.objects.filter(student=student).delete()
+        client = APIClient()
+        client.force_authenticate(student.user)
+        response = client.post('/api/hostel/applications/', {'institute': student.institute_id}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['student'], student.pk)
+        self.assertEqual(client.get('/api/hostel/applications/').data['results'][0]['id'], response.data['id'])
+
+    def test_managers_see_only_their_hostel(self):
+        director, manager = Director.objects.get(), HostelManager.objects.get()
+        bare = Hostel.objects.get(name="Bare Hostel")
+        Room.objects.create(hostel=bare, room_number="9", room_type='single', capacity=1, rent_per_bed=4000)
+        client = APIClient()
+        for user, applications, hostels in (
+            (director.user, 2, {self.hostel.pk, bare.pk}),
+            (manager.user, 1, {self.hostel.pk}),
+        ):
+            client.force_authenticate(user)
+            self.assertEqual(len(client.get('/api/hostel/applications/').data['results']), applications)
+            response = client.get('/api/hostel/rooms/vacancies/')
+            self.assertEqual({room['hostel'] for room in response.data['results']}, hostels)
+
+    def test_refreshed_token_rescopes_reads(self):
+        manager = HostelManager.objects.get()
+        User.objects.filter(pk=manager.user_id).update(is_active=True)
+        manager.user.refresh_from_db()
+        other = Hostel.objects.get(name="Bare Hostel")
+        Room.objects.create(hostel=other, room_number="9", room_type='single', capacity=1, rent_per_bed=4000)
+        tokens = get_tokens_for_user(manager.user)
+        client = APIClient()
+
+        def listed_hostels(access):
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+            response = client.get('/api/hostel/create-room/')
+            self.assertEqual(response.status_code, 200, response.data)
+            return {room['hostel'] for room in response.data['results']}
+
+        self.assertEqual(listed_hostels(tokens['access']), {self.hostel.pk})
+
+        # The manager moves to the other hostel; reads follow once the token is refreshed.
+        Hostel.objects.filter(pk=self.hostel.pk).update(manager=None)
+        Hostel.objects.filter(pk=other.pk).update(manager=manager)
+        client.credentials()
+        response = client.post('/api/user/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(listed_hostels(response.data['access']), {other.pk})
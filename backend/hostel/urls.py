@@ -4,9 +4,25 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     RoomListCreateView,
     RoomDetailView,
+    RoomReserveView,
+    RoomVacancySearchView,
+    HostelRoomProvisionView,
     HostelManagerListCreateView,
     HostelManagerDetailView,
     HostelApplicationViewSet,
+    AllocationRunView,
+    BulkCheckoutView,
+    RentBillingRunView,
+    HostelDuesView,
+    StudentLedgerView,
+    StatementReconcileView,
+    PaymentListCreateView,
+    PaymentDetailView,
+    OverduePaymentsView,
+    PaymentRollupReportView,
+    StudentExportView,
+    AllocationExportView,
+    PaymentExportView,
 )
 
 router = DefaultRouter()
@@ -16,11 +32,33 @@ urlpatterns = [
     # Room's Url
     path('create-room/', RoomListCreateView.as_view(), name='room-list-create'),
     path('room/<int:pk>/', RoomDetailView.as_view(), name='room-detail'),
+    path('room/<int:pk>/reserve/', RoomReserveView.as_view(), name='room-reserve'),
+    path('rooms/vacancies/', RoomVacancySearchView.as_view(), name='room-vacancy-search'),
+    path('hostel/<int:pk>/provision-rooms/', HostelRoomProvisionView.as_view(), name='hostel-provision-rooms'),
 
     # Manager's Url
     path('create-manager/', HostelManagerListCreateView.as_view(), name='hostelmanager-list-create'),
     path('manager/<int:pk>/', HostelManagerDetailView.as_view(), name='hostelmanager-detail'),
 
+    # Allocation's Url
+    path('allocation-run/', AllocationRunView.as_view(), name='allocation-run'),
+    path('allocations/checkout/', BulkCheckoutView.as_view(), name='allocation-bulk-checkout'),
+
+    # Payment's Url
+    path('payments/', PaymentListCreateView.as_view(), name='payment-list-create'),
+    path('payments/<int:pk>/', PaymentDetailView.as_view(), name='payment-detail'),
+    path('payments/overdue/', OverduePaymentsView.as_view(), name='payment-overdue'),
+    path('payments/report/', PaymentRollupReportView.as_view(), name='payment-report'),
+    path('payments/billing-run/', RentBillingRunView.as_view(), name='payment-billing-run'),
+    path('payments/reconcile/', StatementReconcileView.as_view(), name='payment-reconcile'),
+    path('hostel/<int:pk>/dues/', HostelDuesView.as_view(), name='hostel-dues'),
+    path('student/<int:pk>/ledger/', StudentLedgerView.as_view(), name='student-ledger'),
+
+    # Export's Url
+    path('exports/students/', StudentExportView.as_view(), name='export-students'),
+    path('exports/allocations/', AllocationExportView.as_view(), name='export-allocations'),
+    path('exports/payments/', PaymentExportView.as_view(), name='export-payments'),
+
     # Hostel Application's Url
     path('', include(router.urls)),
     
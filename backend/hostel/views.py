@@ -1,52 +1,69 @@
 from django.utils import timezone
+from django.db import IntegrityError
+from django.db.models import Count, F, Min, Sum
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 
+from director.models import Institute
 from hostel.models import ( 
-    Room, Hostel, HostelApplication, HostelManager, Student, ApplicationStatus
+    Room, Hostel, HostelApplication, HostelManager, Student, ApplicationStatus, WaitlistEntry,
+    StudentLedger, Payment, RoomAllocation
 )
 from hostel.serializers import (
-    RoomSerializer, HostelManagerSerializer, HostelApplicationSerializer
+    RoomSerializer, HostelManagerSerializer, HostelApplicationSerializer,
+    AllocationRunSerializer, RoomAllocationSerializer, VacancySearchSerializer,
+    RoomVacancySerializer, RoomProvisionSerializer, BulkCheckoutSerializer,
+    BulkReviewSerializer, RentBillingSerializer, StudentLedgerSerializer,
+    StatementReconcileSerializer, PaymentSerializer, PaymentFilterSerializer, OverdueQuerySerializer,
+    PaymentRollupQuerySerializer, ExportQuerySerializer, PaymentExportQuerySerializer
 )
+from hostel.permissions import IsDirectorOrManagerOfHostel
+from hostel.allocation import run_allocation
+from hostel.billing import run_rent_billing
+from hostel.checkout import bulk_checkout, filter_allocations
+from hostel.conditional import ConditionalGetMixin
+from hostel.exports import ALLOCATION_EXPORT, PAYMENT_EXPORT, STUDENT_EXPORT, ExportContentNegotiation
+from hostel.ledger import hostel_dues
+from hostel.principal import PrincipalScopedMixin, get_principal
+from hostel.fieldsets import SparseFieldsMixin
+from hostel.readers import HostelApplicationReader, ReaderListMixin, RoomReader
+from hostel.provisioning import provision_rooms, ProvisioningError
+from hostel.reconciliation import RECONCILE_EXCEPTION_LIMIT, reconcile_statement, StatementError
+from hostel.review import bulk_review
+from hostel.rollup import payment_rollup_report
+from hostel.waitlist import position as waitlist_position
 
-class RoomListCreateView(generics.ListCreateAPIView):
+class RoomListCreateView(PrincipalScopedMixin, ReaderListMixin, generics.ListCreateAPIView):
+    queryset = Room.objects.all().select_related('hostel')
     serializer_class = RoomSerializer
+    list_reader = RoomReader
+    ordering = ('hostel_id', 'room_number', 'id')
+    principal_scope = {'institute': 'hostel__institute_id', 'hostel': 'hostel_id'}
     # permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
         hostel_id = self.request.query_params.get('hostel_id')
         
         if hostel_id:
             try:
-                hostel = Hostel.objects.get(pk=hostel_id)
-                if not (user.is_superuser or 
-                        (hasattr(user, 'director_profile') and hostel.director == user.director_profile) or
-                        (hasattr(user, 'hostelmanager_profile') and hostel.manager == user.hostelmanager_profile)):
+                hostel = Hostel.objects.only('director_id', 'manager_id').get(pk=hostel_id)
+                if not self.principal.manages(hostel):
                     raise PermissionDenied("You cannot view rooms for this hostel.")
-                return Room.objects.filter(hostel=hostel).select_related('hostel')
-            except Hostel.DoesNotExist:
+                return self.queryset.filter(hostel=hostel)
+            except (Hostel.DoesNotExist, ValueError):
                 return Room.objects.none() # Or raise NotFound
-        
-        if user.is_superuser:
-            return Room.objects.all().select_related('hostel')
-        if hasattr(user, 'director_profile'):
-            return Room.objects.filter(hostel__institute=user.director_profile.institute).select_related('hostel')
-        if hasattr(user, 'hostelmanager_profile') and user.hostelmanager_profile.managed_hostel:
-             return Room.objects.filter(hostel=user.hostelmanager_profile.managed_hostel).select_related('hostel')
-        return Room.objects.none()
+        return super().get_queryset()
 
 
     def perform_create(self, serializer):
-        user = self.request.user
         hostel = serializer.validated_data['hostel']
 
-        if not (user.is_superuser or
-                (hasattr(user, 'director_profile') and hostel.director == user.director_profile) or
-                (hasattr(user, 'hostelmanager_profile') and hostel.manager == user.hostelmanager_profile)):
+        if not self.principal.manages(hostel):
             raise PermissionDenied("You are not authorized to add rooms to this hostel.")
         
         serializer.save()
@@ -56,9 +73,10 @@ class RoomListCreateView(generics.ListCreateAPIView):
         context['request'] = self.request
         return context
 
-class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RoomDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Room.objects.all().select_related('hostel')
     serializer_class = RoomSerializer
+    freshness_fields = ('updated_at', 'hostel__updated_at')
     # permission_classes = [IsAuthenticated, IsDirectorOrManagerForHostelObject]
 
     def get_serializer_context(self):
@@ -66,29 +84,99 @@ class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
         context['request'] = self.request
         return context
     
-class HostelManagerListCreateView(generics.ListCreateAPIView):
+class HostelRoomProvisionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        hostel = get_object_or_404(Hostel, pk=pk)
+        if not get_principal(request).manages(hostel):
+            raise PermissionDenied("You are not authorized to add rooms to this hostel.")
+
+        serializer = RoomProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = provision_rooms(hostel, serializer.get_rows())
+        except ProvisioningError as exc:
+            raise ValidationError(exc.errors)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class RoomVacancySearchView(generics.ListAPIView):
+    serializer_class = RoomVacancySerializer
+    ordering = ('-free_beds', 'rent_per_bed', 'id')
+
+    def get_queryset(self):
+        params = VacancySearchSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        principal = get_principal(self.request)
+
+        rooms = Room.objects.filter(is_available=True, hostel__is_active=True)
+        if principal.is_student:
+            # Students look for a bed anywhere in their institute.
+            rooms = rooms.filter(hostel__institute_id=principal.institute_id)
+        else:
+            rooms = principal.scope(rooms, institute='hostel__institute_id', hostel='hostel_id')
+        if filters.get('institute'):
+            rooms = rooms.filter(hostel__institute_id=filters['institute'])
+        if filters.get('hostel'):
+            rooms = rooms.filter(hostel_id=filters['hostel'])
+        if filters.get('room_type'):
+            rooms = rooms.filter(room_type=filters['room_type'])
+        if filters.get('min_rent') is not None:
+            rooms = rooms.filter(rent_per_bed__gte=filters['min_rent'])
+        if filters.get('max_rent') is not None:
+            rooms = rooms.filter(rent_per_bed__lte=filters['max_rent'])
+        for facility in VacancySearchSerializer.FACILITY_FIELDS:
+            if filters.get(facility) is not None:
+                rooms = rooms.filter(**{f'hostel__{facility}': filters[facility]})
+
+        return (
+            rooms.annotate(free_beds=F('capacity') - F('current_occupancy'))
+            .filter(free_beds__gte=filters['min_beds'])
+            .order_by(*self.ordering)
+            .values('id', 'hostel_id', 'hostel__name', 'room_number', 'room_type', 'rent_per_bed', 'free_beds')
+        )
+
+
+class RoomReserveView(generics.CreateAPIView):
+    serializer_class = RoomAllocationSerializer
+    permission_classes = [IsAuthenticated, IsDirectorOrManagerOfHostel]
+
+    def create(self, request, *args, **kwargs):
+        room = get_object_or_404(Room.objects.select_related('hostel'), pk=kwargs['pk'])
+        self.check_object_permissions(request, room)
+
+        data = request.data.copy()
+        data['room'] = room.pk
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        allocation = serializer.save()
+        return Response(self.get_serializer(allocation).data, status=status.HTTP_201_CREATED)
+
+class HostelManagerListCreateView(PrincipalScopedMixin, generics.ListCreateAPIView):
+    queryset = HostelManager.objects.all().select_related('user', 'institute', 'managed_hostel')
     serializer_class = HostelManagerSerializer
     permission_classes = [IsAuthenticated] 
+    ordering = ('user__email', 'id')
+    principal_scope = {'institute': 'institute_id'}
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return HostelManager.objects.all().select_related('user', 'institute', 'managed_hostel')
-        if hasattr(user, 'director_profile'):
-            return HostelManager.objects.filter(institute=user.director_profile.institute).select_related('user', 'institute', 'managed_hostel')
-        return HostelManager.objects.none()
+        if self.principal.is_manager:
+            return HostelManager.objects.none()
+        return super().get_queryset()
 
     def perform_create(self, serializer):
-        user = self.request.user 
+        principal = self.principal
 
         manager_user_instance = serializer.validated_data['user'] 
         institute_instance = serializer.validated_data['institute']
 
-        if not hasattr(user, 'director_profile') and not user.is_superuser:
+        if not principal.is_director and not principal.is_superuser:
             raise PermissionDenied("Only Directors or Superusers can assign Hostel Managers.")
 
-        if hasattr(user, 'director_profile'):
-            if user.director_profile.institute != institute_instance:
+        if principal.is_director:
+            if principal.institute_id != institute_instance.pk:
                 raise PermissionDenied("You can only assign managers within your own institute.")
         
         serializer.save()
@@ -105,11 +193,11 @@ class HostelManagerDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_object(self):
         obj = super().get_object()
-        user = self.request.user
-        if not user.is_superuser and hasattr(user, 'director_profile'):
-            if obj.institute != user.director_profile.institute:
+        principal = get_principal(self.request)
+        if not principal.is_superuser and principal.is_director:
+            if obj.institute_id != principal.institute_id:
                 raise PermissionDenied("You do not have permission to manage this Hostel Manager.")
-        elif not user.is_superuser:
+        elif not principal.is_superuser:
             raise PermissionDenied("Permission denied.")
         return obj
     
@@ -126,12 +214,22 @@ class HostelManagerDetailView(generics.RetrieveUpdateDestroyAPIView):
         return context
 
 
-class HostelApplicationViewSet(viewsets.ModelViewSet):
+class HostelApplicationViewSet(
+    ConditionalGetMixin, PrincipalScopedMixin, ReaderListMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     queryset = HostelApplication.objects.all().select_related(
         'student__user', 'institute', 'preferred_hostel', 'reviewed_by'
     )
     serializer_class = HostelApplicationSerializer
+    list_reader = HostelApplicationReader
     # permission_classes = [IsAuthenticated]
+    ordering = ('-submitted_at', 'id')
+    freshness_fields = (
+        'updated_at', 'student__updated_at', 'student__user__updated_at', 'institute__updated_at',
+        'preferred_hostel__updated_at', 'reviewed_by__updated_at',
+    )
+    # Managers see the applications that prefer their hostel, not their whole institute.
+    principal_scope = {'institute': 'institute_id', 'hostel': 'preferred_hostel_id', 'student': 'student_id'}
 
     # def get_permissions(self):
     #     if self.action == 'create':
@@ -147,31 +245,14 @@ class HostelApplicationViewSet(viewsets.ModelViewSet):
     #         self.permission_classes = [IsAuthenticated] # Default
     #     return [permission() for permission in self.permission_classes]
 
-    def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return HostelApplication.objects.none()
-
-        if user.is_superuser or hasattr(user, 'director_profile'):
-            if hasattr(user, 'director_profile'):
-                return self.queryset.filter(institute=user.director_profile.institute)
-            return self.queryset 
-        
-        if hasattr(user, 'hostelmanager_profile') and user.hostelmanager_profile.managed_hostel:
-            return self.queryset.filter(preferred_hostel__institute=user.hostelmanager_profile.institute)
-
-        if hasattr(user, 'student_profile'):
-            return self.queryset.filter(student=user.student_profile)
-        
-        return HostelApplication.objects.none()
-
     def perform_create(self, serializer):
-        user = self.request.user 
+        # HostelApplicationSerializer.validate has loaded the applicant's profile.
+        student = serializer.validated_data['student']
         serializer.save(
-            student=user.student_profile, 
-            institute=user.student_profile.institute,
-            course_at_application=user.student_profile.course,
-            branch_at_application=user.student_profile.branch,
+            student=student, 
+            institute_id=student.institute_id,
+            course_at_application=student.course,
+            branch_at_application=student.branch,
             status=ApplicationStatus.PENDING,
             submitted_at=timezone.now()
         )
@@ -179,7 +260,385 @@ class HostelApplicationViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save()
 
+    @action(detail=False, methods=['post'], url_path='bulk-review')
+    def bulk_review(self, request):
+        serializer = BulkReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+        principal = get_principal(request)
+
+        if not (principal.is_superuser or principal.is_director or principal.is_manager):
+            raise PermissionDenied("You do not have permission to review applications.")
+        applications = principal.scope(HostelApplication.objects.all(), **self.principal_scope)
+
+        result = bulk_review(
+            applications,
+            serializer.validated_data['ids'],
+            serializer.validated_data['status'],
+            reviewer=user,
+            remarks=serializer.validated_data.get('remarks'),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='waitlist-position')
+    def waitlist_position(self, request, pk=None):
+        application = self.get_object()
+        entry = WaitlistEntry.objects.filter(application=application).first()
+        if entry is None:
+            raise ValidationError({"status": "This application is not on the waitlist."})
+        return Response({
+            'application': application.pk,
+            'hostel': entry.hostel_id,
+            'room_type': entry.room_type,
+            'position': waitlist_position(entry),
+        }, status=status.HTTP_200_OK)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
-        return context
\ No newline at end of file
+        return context
+
+
+class AllocationRunView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = AllocationRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        principal = get_principal(request)
+
+        if principal.is_director:
+            institute = Institute.objects.get(pk=principal.institute_id)
+        elif principal.is_superuser:
+            institute = serializer.validated_data.get('institute')
+            if institute is None:
+                raise ValidationError({"institute": "Institute is required for superuser."})
+        else:
+            raise PermissionDenied("Only Directors or Superusers can run room allocation.")
+
+        try:
+            result = run_allocation(institute, dry_run=serializer.validated_data['dry_run'])
+        except IntegrityError:
+            # A student was placed by another request while the run was computing.
+            raise ValidationError({"detail": "Allocations changed while the run was in progress. Please retry."})
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class BulkCheckoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkCheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        end_date = filters.pop('end_date', None)
+        promote = filters.pop('promote_waitlist')
+        principal = get_principal(request)
+
+        if principal.is_director:
+            if filters.get('institute') and filters['institute'].pk != principal.institute_id:
+                raise PermissionDenied("You can only check out students of your own institute.")
+            filters['institute'] = principal.institute_id
+        elif principal.is_manager:
+            if principal.hostel_id is None or (filters.get('hostel') and filters['hostel'].pk != principal.hostel_id):
+                raise PermissionDenied("You can only check out students of the hostel you manage.")
+            filters['hostel'] = principal.hostel_id
+        elif not principal.is_superuser:
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can check out students.")
+
+        result = bulk_checkout(filter_allocations(**filters), end_date=end_date, promote=promote)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class RentBillingRunView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = RentBillingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+        institute, hostel = filters.get('institute'), filters.get('hostel')
+        principal = get_principal(request)
+
+        if principal.is_director:
+            if (institute and institute.pk != principal.institute_id) or \
+                    (hostel and hostel.institute_id != principal.institute_id):
+                raise PermissionDenied("You can only bill residents of your own institute.")
+            institute = principal.institute_id
+        elif principal.is_manager:
+            if principal.hostel_id is None or (hostel and hostel.pk != principal.hostel_id):
+                raise PermissionDenied("You can only bill residents of the hostel you manage.")
+            hostel = principal.hostel_id
+        elif not principal.is_superuser:
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can run rent billing.")
+
+        result = run_rent_billing(
+            filters.get('period') or timezone.now().date(),
+            institute=institute,
+            hostel=hostel,
+            due_date=filters.get('due_date'),
+            dry_run=filters['dry_run'],
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class HostelDuesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        hostel = get_object_or_404(Hostel, pk=pk)
+        principal = get_principal(request)
+        if not (principal.is_superuser or
+                (principal.is_director and hostel.institute_id == principal.institute_id) or
+                (principal.is_manager and hostel.manager_id == principal.manager_id)):
+            raise PermissionDenied("You are not authorized to view the dues of this hostel.")
+        return Response(hostel_dues(hostel.pk), status=status.HTTP_200_OK)
+
+
+class StudentLedgerView(generics.RetrieveAPIView):
+    serializer_class = StudentLedgerSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        student = get_object_or_404(Student, pk=self.kwargs['pk'])
+        principal = get_principal(self.request)
+        if not (principal.is_superuser or
+                (principal.is_student and principal.student_id == student.pk) or
+                ((principal.is_director or principal.is_manager) and principal.institute_id == student.institute_id)):
+            raise PermissionDenied("You are not authorized to view this ledger.")
+        return StudentLedger.objects.filter(student=student).first() or StudentLedger(student=student)
+
+
+class StatementReconcileView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = StatementReconcileSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        institute = serializer.validated_data.get('institute')
+        principal = get_principal(request)
+
+        if principal.is_director:
+            if institute and institute.pk != principal.institute_id:
+                raise PermissionDenied("You can only reconcile payments of your own institute.")
+            institute = principal.institute_id
+        elif not principal.is_superuser:
+            raise PermissionDenied("Only Directors or Superusers can reconcile bank statements.")
+
+        exceptions = []
+
+        def report(line):
+            if len(exceptions) < RECONCILE_EXCEPTION_LIMIT:
+                exceptions.append(line)
+
+        try:
+            result = reconcile_statement(
+                serializer.get_lines(),
+                report,
+                institute=institute,
+                payment_method=serializer.validated_data['payment_method'],
+            )
+        except StatementError as exc:
+            raise ValidationError({"file": str(exc)})
+        # The summary counts every exception; only the first RECONCILE_EXCEPTION_LIMIT are listed.
+        result['exception_lines'] = exceptions
+        result['exception_lines_truncated'] = result['exceptions'] > len(exceptions)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+def _payments_visible_to(principal):
+    return principal.scope(
+        Payment.objects.all(),
+        institute='student__institute_id', hostel='room_allocation__room__hostel_id', student='student_id',
+    )
+
+
+def _filter_payments(payments, filters):
+    """``payments`` narrowed by validated PaymentFilterSerializer ``filters``."""
+    if filters.get('status'):
+        payments = payments.filter(status=filters['status'])
+    if filters.get('payment_type'):
+        payments = payments.filter(payment_type=filters['payment_type'])
+    if filters.get('due_from'):
+        payments = payments.filter(due_date__gte=filters['due_from'])
+    if filters.get('due_to'):
+        payments = payments.filter(due_date__lte=filters['due_to'])
+    if filters.get('hostel'):
+        payments = payments.filter(room_allocation__room__hostel_id=filters['hostel'])
+    if filters.get('student'):
+        payments = payments.filter(student_id=filters['student'])
+    return payments
+
+
+class PaymentListCreateView(generics.ListCreateAPIView):
+    serializer_class = PaymentSerializer
+    permission_classes = [IsAuthenticated]
+    ordering = ('-due_date', 'id')
+
+    def get_queryset(self):
+        params = PaymentFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        payments = _filter_payments(_payments_visible_to(get_principal(self.request)), filters)
+        return payments.select_related(
+            'student__user', 'room_allocation__student__user', 'room_allocation__room__hostel'
+        )
+
+    def perform_create(self, serializer):
+        principal = get_principal(self.request)
+        student = serializer.validated_data['student']
+        room_allocation = serializer.validated_data.get('room_allocation')
+
+        if principal.is_superuser:
+            pass
+        elif principal.is_director:
+            if student.institute_id != principal.institute_id:
+                raise PermissionDenied("You can only add payments for students of your own institute.")
+        elif principal.is_manager:
+            if room_allocation is None or room_allocation.room.hostel_id != principal.hostel_id:
+                raise PermissionDenied("You can only add payments for allocations in the hostel you manage.")
+        else:
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can add payments.")
+        serializer.save()
+
+
+class PaymentDetailView(generics.RetrieveUpdateAPIView):
+    serializer_class = PaymentSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return _payments_visible_to(get_principal(self.request)).select_related(
+            'student__user', 'room_allocation__student__user', 'room_allocation__room__hostel'
+        )
+
+    def perform_update(self, serializer):
+        principal = get_principal(self.request)
+        if principal.is_student and not principal.is_superuser:
+            raise PermissionDenied("Students cannot change payments.")
+        serializer.save()
+
+
+class OverduePaymentsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = OverdueQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        as_of = params.validated_data.get('as_of') or timezone.now().date()
+        principal = get_principal(request)
+        if not (principal.is_superuser or principal.is_director or principal.is_manager):
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can view overdue payments.")
+
+        payments = _payments_visible_to(principal)
+        if params.validated_data.get('institute'):
+            payments = payments.filter(student__institute_id=params.validated_data['institute'])
+
+        # Served by the (status, due_date) index; grouped and summed in the database.
+        hostels = list(
+            payments.filter(status__in=Payment.PAYABLE_STATUSES, due_date__lt=as_of)
+            .values(hostel=F('room_allocation__room__hostel_id'), hostel_name=F('room_allocation__room__hostel__name'))
+            .annotate(
+                payments=Count('id'),
+                students=Count('student_id', distinct=True),
+                amount=Sum('amount'),
+                oldest_due_date=Min('due_date'),
+            )
+            .order_by('-amount')
+        )
+        return Response({
+            'as_of': as_of,
+            'payments': sum(row['payments'] for row in hostels),
+            'amount': sum((row['amount'] for row in hostels), 0),
+            'hostels': hostels,
+        }, status=status.HTTP_200_OK)
+
+
+class PaymentRollupReportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = PaymentRollupQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        institute_id = params.validated_data.get('institute')
+        hostel_id = params.validated_data.get('hostel')
+        principal = get_principal(request)
+
+        if principal.is_superuser:
+            pass
+        elif principal.is_director:
+            institute_id = principal.institute_id
+        elif principal.is_manager:
+            if not principal.hostel_id:
+                raise PermissionDenied("You are not assigned to any hostel.")
+            hostel_id = principal.hostel_id
+        else:
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can view payment reports.")
+
+        rows = payment_rollup_report(
+            params.validated_data['start'], params.validated_data['end'], institute_id=institute_id, hostel_id=hostel_id
+        )
+        return Response({
+            'start': params.validated_data['start'],
+            'end': params.validated_data['end'],
+            'rows': rows,
+        }, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """
+    Streams a roster as CSV or JSON Lines (``?export_format=csv|jsonl``) for
+    Directors, Hostel Managers and Superusers, scoped like the list endpoints.
+    """
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        principal = get_principal(request)
+        if not (principal.is_superuser or principal.is_director or principal.is_manager):
+            raise PermissionDenied("Only Directors, Hostel Managers or Superusers can export rosters.")
+
+
+class StudentExportView(ExportView):
+    def get(self, request):
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        principal = get_principal(request)
+
+        if principal.is_manager:
+            housed = principal.scope(RoomAllocation.objects.all(), hostel='room__hostel_id')
+            students = Student.objects.filter(pk__in=housed.values('student_id'))
+        else:
+            students = principal.scope(Student.objects.all(), institute='institute_id')
+        if params.validated_data['current']:
+            students = students.filter(is_currently_hosteller=True)
+        if params.validated_data.get('hostel'):
+            housed = RoomAllocation.objects.filter(room__hostel_id=params.validated_data['hostel'])
+            if params.validated_data['current']:
+                housed = housed.filter(end_date__isnull=True)
+            students = students.filter(pk__in=housed.values('student_id'))
+        return STUDENT_EXPORT.response(students, params.validated_data['export_format'])
+
+
+class AllocationExportView(ExportView):
+    def get(self, request):
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        allocations = get_principal(request).scope(
+            RoomAllocation.objects.all(), institute='room__hostel__institute_id', hostel='room__hostel_id'
+        )
+        if params.validated_data['current']:
+            allocations = allocations.filter(end_date__isnull=True)
+        if params.validated_data.get('hostel'):
+            allocations = allocations.filter(room__hostel_id=params.validated_data['hostel'])
+        return ALLOCATION_EXPORT.response(allocations, params.validated_data['export_format'])
+
+
+class PaymentExportView(ExportView):
+    def get(self, request):
+        params = PaymentExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        payments = _filter_payments(_payments_visible_to(get_principal(request)), params.validated_data)
+        return PAYMENT_EXPORT.response(payments, params.validated_data['export_format'])
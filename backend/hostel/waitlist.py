@@ -0,0 +1,196 @@
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from hostel.allocation import reserve_bed
+from hostel.integrity import violates_constraint
+from hostel.models import (
+    Room, HostelApplication, RoomAllocation, WaitlistEntry, ApplicationStatus, OPEN_ALLOCATION_CONSTRAINT
+)
+from hostel.occupancy import RoomFullError
+
+WAITLIST_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def priority_for(application):
+    """
+    Queue priority of an application: its submission timestamp, moved earlier by
+    ``settings.HOSTEL_WAITLIST_WEIGHTS``. Each weight maps a lookup path on the
+    application (e.g. ``'student__year_of_study'``) to the seconds of head start
+    granted per unit of that value.
+    """
+    score = application.submitted_at.timestamp()
+    for path, weight in getattr(settings, 'HOSTEL_WAITLIST_WEIGHTS', {}).items():
+        value = application
+        for attribute in path.split('__'):
+            value = getattr(value, attribute, None)
+            if value is None:
+                break
+        if value is not None:
+            score -= weight * float(value)
+    return score
+
+
+def _entry_for(application):
+    return WaitlistEntry(
+        application=application,
+        institute_id=application.institute_id,
+        hostel_id=application.preferred_hostel_id,
+        room_type=application.preferred_room_type,
+        priority=priority_for(application),
+    )
+
+
+def enqueue(application):
+    entry = _entry_for(application)
+    WaitlistEntry.objects.update_or_create(
+        application=application,
+        defaults={
+            'institute_id': entry.institute_id,
+            'hostel_id': entry.hostel_id,
+            'room_type': entry.room_type,
+            'priority': entry.priority,
+        },
+    )
+
+
+def dequeue(application_id):
+    WaitlistEntry.objects.filter(application_id=application_id).delete()
+
+
+def enqueue_many(applications):
+    """Queues several applications at once; used by bulk paths that skip the save signals."""
+    applications = list(applications)
+    WaitlistEntry.objects.filter(application__in=applications).delete()
+    return WaitlistEntry.objects.bulk_create(
+        [_entry_for(application) for application in applications], batch_size=WAITLIST_BATCH_SIZE
+    )
+
+
+def dequeue_many(application_ids):
+    return WaitlistEntry.objects.filter(application_id__in=application_ids).delete()[0]
+
+
+def rebuild_waitlist(institute=None):
+    """Recreates the queue entries of every waitlisted application, e.g. after the weights change."""
+    applications = HostelApplication.objects.filter(status=ApplicationStatus.WAITLISTED).select_related('student')
+    entries = WaitlistEntry.objects.all()
+    if institute is not None:
+        applications = applications.filter(institute=institute)
+        entries = entries.filter(institute=institute)
+
+    with transaction.atomic():
+        entries.delete()
+        batch, created = [], 0
+        for application in applications.iterator(chunk_size=WAITLIST_BATCH_SIZE):
+            batch.append(_entry_for(application))
+            if len(batch) >= WAITLIST_BATCH_SIZE:
+                created += len(WaitlistEntry.objects.bulk_create(batch))
+                batch = []
+        created += len(WaitlistEntry.objects.bulk_create(batch))
+    return created
+
+
+def _queue(institute_id, hostel_id, room_type):
+    return WaitlistEntry.objects.filter(institute_id=institute_id, hostel_id=hostel_id, room_type=room_type)
+
+
+def position(entry):
+    """
+    1-based place of ``entry`` in its queue: a COUNT of the entries ahead of it,
+    read from ``waitlist_queue_idx`` alone, so it costs O(position) index
+    entries and never touches the table.
+    """
+    ahead = _queue(entry.institute_id, entry.hostel_id, entry.room_type).filter(
+        Q(priority__lt=entry.priority) | Q(priority=entry.priority, id__lt=entry.id)
+    ).count()
+    return ahead + 1
+
+
+def next_in_line(room):
+    """
+    Best-placed entry that would accept a bed in ``room``. Looks at the head of the
+    four queues that match the room (this hostel or any hostel, this room type or
+    any type); each head is a single index seek.
+    """
+    institute_id = room.hostel.institute_id
+    heads = [
+        _queue(institute_id, hostel_id, room_type)
+        .select_related('application__student').order_by('priority', 'id').first()
+        for hostel_id in (room.hostel_id, None)
+        for room_type in (room.room_type, 'any')
+    ]
+    heads = [head for head in heads if head is not None]
+    return min(heads, key=lambda head: (head.priority, head.id)) if heads else None
+
+
+def promote_waitlist(room_id):
+    """
+    Moves waitlisted applications into ``room`` while it has free beds. Each
+    promoted application is approved, allocated and taken off the waitlist; an
+    entry whose student already holds a bed is dropped from the queue and its
+    application left as it is. Returns the number of students promoted.
+    """
+    room = Room.objects.select_related('hostel').filter(pk=room_id).first()
+    if room is None:
+        return 0
+
+    promoted = 0
+    while room.current_occupancy < room.capacity:
+        entry = next_in_line(room)
+        if entry is None:
+            break
+        application = entry.application
+        try:
+            with transaction.atomic():
+                reserve_bed(room, application.student, application=application)
+                now = timezone.now()
+                HostelApplication.objects.filter(pk=application.pk).update(
+                    status=ApplicationStatus.APPROVED, reviewed_at=now, updated_at=now
+                )
+                entry.delete()
+        except RoomFullError:
+            break
+        except IntegrityError as exc:
+            if not violates_constraint(exc, RoomAllocation, OPEN_ALLOCATION_CONSTRAINT):
+                raise
+            # The student already holds a bed, so this application must not get another.
+            entry.delete()
+            continue
+        promoted += 1
+        room.refresh_from_db(fields=['current_occupancy'])
+    return promoted
+
+
+def promote_waitlist_on_commit(room_id):
+    """
+    Runs ``promote_waitlist`` for the room once the current transaction commits.
+    The request that freed the bed has committed by then, so a failed promotion
+    is logged rather than raised; the bed is filled by the next release or
+    ``bulk_checkout``.
+    """
+    def promote():
+        try:
+            promote_waitlist(room_id)
+        except Exception:
+            logger.exception("Waitlist promotion into room %s failed.", room_id)
+
+    transaction.on_commit(promote)
+
+
+def promote_waitlist_for_hostels(hostel_ids):
+    """Fills free beds of the given hostels from the waitlist, stopping once no queue can be served."""
+    promoted = 0
+    rooms = Room.objects.filter(hostel_id__in=hostel_ids, is_available=True).order_by('hostel_id', 'room_number')
+    for room_id in rooms.values_list('id', flat=True).iterator(chunk_size=WAITLIST_BATCH_SIZE):
+        if not WaitlistEntry.objects.filter(
+            Q(hostel_id__in=hostel_ids) | Q(hostel__isnull=True, institute__hostels__in=hostel_ids)
+        ).exists():
+            break
+        promoted += promote_waitlist(room_id)
+    return promoted